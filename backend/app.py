@@ -1,23 +1,217 @@
-from flask import Flask, request, jsonify, send_from_directory, render_template_string
+from flask import Flask, request, jsonify, send_from_directory, render_template_string, g, Response
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
+from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity, verify_jwt_in_request
 from flask_cors import CORS
+from functools import wraps
+from sqlalchemy import event, exists, literal, null, select, union
+from sqlalchemy.exc import IntegrityError
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
+import hashlib
+import json
 import os
+import atexit
+import itertools
+import threading
+import time
 
-# Initialize Flask app
-app = Flask(__name__, static_folder='../kunsthaus-canvas-bids', static_url_path='')
+from rate_limit import RateLimiter, AdmissionController, create_bucket_store
+from bid_journal import BidJournal, BidRejected
+from images import ImagePipeline
+from static_assets import StaticAssets
+from facets import FacetCache, PRICE_BANDS, empty_facets, add_row
+from order_book import OrderBook
+from db_routing import RoutingSession, ReplicaSet
+from bid_archive import BidArchive
+from job_queue import JobQueue
+from notifications import NotificationHub, InboxChannel, EmailChannel, WebhookChannel
+from profiler import SamplingProfiler
+from suggest import SuggestIndex
+from similar import SimilarIndex
+from read_path import ArtworkRow, AuctionRow, ArtistRow, BidRow, FieldSet, fetch, paginate
+from coalesce import SingleFlight, FlightBusy
+from bid_watch import BidWatch
+from lot_actors import LotActors, SUPPORTED as LOT_ACTORS_SUPPORTED
+
+# Initialize Flask app (the frontend is served from memory by StaticAssets below)
+app = Flask(__name__, static_folder=None)
+FRONTEND_FOLDER = os.path.normpath(os.path.join(app.root_path, '..', 'kunsthaus-canvas-bids'))
 
 # Configuration
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///kunsthaus.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///kunsthaus.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Optional read replicas (comma separated URLs) for read-only routes
+app.config['SQLALCHEMY_REPLICA_URIS'] = [url for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url]
+app.config['SQLALCHEMY_BINDS'] = {
+    f'replica_{i}': url for i, url in enumerate(app.config['SQLALCHEMY_REPLICA_URIS'])
+}
+app.config['REPLICA_MAX_LAG_SECONDS'] = 5
+app.config['REPLICA_HEARTBEAT_SECONDS'] = 1
+# After a write, the same client reads from the primary for this long
+app.config['REPLICA_PIN_SECONDS'] = 5
 app.config['JWT_SECRET_KEY'] = 'jwt-secret-string-change-in-production'
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 
+# Rate limiting: (tokens per second, burst) per endpoint, keyed by user id or IP
+app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+app.config['RATELIMIT_STORAGE_URL'] = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+app.config['RATELIMIT_DEFAULT'] = (20, 40)
+app.config['RATELIMIT_BUDGETS'] = {
+    'search': (5, 10),
+    'search_suggest': (10, 30),  # One request per keystroke
+    'place_bid': (2, 5),
+    'create_artwork': (1, 5),
+    'create_artworks_bulk': (0.1, 2),
+    'login': (1, 5),
+    'register': (0.2, 3),
+    'create_sample_data': (0.1, 1),
+}
+# Admission control: requests allowed in flight at once. Kept at or below the
+# SQLAlchemy pool size + overflow (5 + 10 by default) so excess load gets a 503
+# instead of queueing on the connection pool.
+app.config['MAX_IN_FLIGHT_REQUESTS'] = int(os.environ.get('MAX_IN_FLIGHT_REQUESTS', 15))
+
+# Write-behind bid ingestion: bids are acknowledged once fsynced to a local
+# journal and applied to the bid table in batches. Intended for a single worker
+# process, since accepted-bid validation state lives in that process.
+app.config['BID_JOURNAL_ENABLED'] = os.environ.get('BID_JOURNAL_ENABLED', '0') == '1'
+app.config['BID_JOURNAL_PATH'] = os.environ.get('BID_JOURNAL_PATH', os.path.join(app.instance_path, 'bids.journal'))
+app.config['BID_JOURNAL_FLUSH_MS'] = 5
+
+# Artwork image uploads: originals and resized variants are stored on disk
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', os.path.join(app.instance_path, 'uploads', 'artworks'))
+app.config['MAX_CONTENT_LENGTH'] = 20 * 1024 * 1024
+app.config['IMAGE_WIDTHS'] = (320, 640, 1280)
+app.config['IMAGE_WORKERS'] = 2
+
+# Bulk artwork import: most artworks per request and per insert transaction.
+# Remote image URLs are downloaded and processed by background jobs
+app.config['BULK_ARTWORKS_MAX_ITEMS'] = 1000
+app.config['BULK_ARTWORKS_BATCH_SIZE'] = 200
+
+# Facet counts are cached per filter and patched on writes; the TTL bounds
+# drift from writes made by other worker processes, and at most
+# FACET_CACHE_MAX_ENTRIES filters are kept (least recently used go first)
+app.config['FACET_CACHE_TTL'] = 300
+app.config['FACET_CACHE_MAX_ENTRIES'] = 1000
+
+# In-memory order book: bids kept per lot, and the minimum raise as
+# (from amount, increment) tiers
+app.config['ORDER_BOOK_DEPTH'] = 10
+app.config['BID_INCREMENT_LADDER'] = [(0, 50)]
+
+# Bids of auctions closed for longer than this are moved to compressed
+# per-month archive files (see `flask --app app archive-bids`)
+app.config['BID_ARCHIVE_FOLDER'] = os.environ.get('BID_ARCHIVE_FOLDER', os.path.join(app.instance_path, 'bid-archive'))
+app.config['BID_ARCHIVE_AFTER_DAYS'] = 30
+
+# Background jobs: worker threads per process (`flask --app app run-jobs`
+# starts a dedicated worker process) and the first retry delay, which doubles
+# on every further attempt
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+app.config['JOB_RETRY_BACKOFF_SECONDS'] = 2.0
+# Finished and failed jobs are deleted by the hourly purge-jobs job once they
+# are this old (job status URLs return 404 after that)
+app.config['JOB_RETENTION_HOURS'] = int(os.environ.get('JOB_RETENTION_HOURS', 72))
+
+# Notifications: events are resolved and delivered every flush interval; a
+# user gets at most one notification per lot and kind per cooldown
+app.config['NOTIFICATION_CHANNELS'] = os.environ.get('NOTIFICATION_CHANNELS', 'inbox').split(',')
+app.config['NOTIFICATION_FLUSH_SECONDS'] = 1.0
+app.config['NOTIFICATION_COOLDOWN_SECONDS'] = 30
+app.config['NOTIFICATION_SMTP_HOST'] = os.environ.get('NOTIFICATION_SMTP_HOST', 'localhost')
+app.config['NOTIFICATION_SMTP_PORT'] = int(os.environ.get('NOTIFICATION_SMTP_PORT', 1025))
+app.config['NOTIFICATION_EMAIL_SENDER'] = os.environ.get('NOTIFICATION_EMAIL_SENDER', 'notifications@kunsthaus.local')
+app.config['NOTIFICATION_WEBHOOK_URL'] = os.environ.get('NOTIFICATION_WEBHOOK_URL')
+app.config['CLOSING_SOON_MINUTES'] = 15
+
+# Watchlist feed deltas re-send lots changed this long before the client's
+# cursor, covering bids committed while the previous feed was being read
+app.config['WATCHLIST_FEED_OVERLAP_SECONDS'] = 2
+
+# Longest auction a new artwork may set with duration_hours (90 days)
+app.config['AUCTION_MAX_DURATION_HOURS'] = 90 * 24
+
+# Most lots (and tombstones) returned by one /api/auctions/changes page
+app.config['AUCTION_CHANGES_PAGE_SIZE'] = 100
+
+# Sampling profiler: an API request is profiled when an admin sends
+# `X-Profile: 1`, or 1 in PROFILING_SAMPLE_RATE requests (0 is off; can be
+# changed at runtime through /api/admin/profiling)
+app.config['PROFILING_FOLDER'] = os.environ.get('PROFILING_FOLDER', os.path.join(app.instance_path, 'profiles'))
+app.config['PROFILING_SAMPLE_RATE'] = int(os.environ.get('PROFILING_SAMPLE_RATE', 0))
+app.config['PROFILING_INTERVAL_MS'] = 5
+
+# Search type-ahead: the in-memory index is patched on writes made by this
+# process and rebuilt from the database this often to pick up the rest
+app.config['SUGGEST_REBUILD_SECONDS'] = 300
+
+# "Similar artworks": memory-mapped vectors rebuilt by a background job this
+# often (new artworks are appended in between), and how much co-bidding
+# counts against text similarity
+app.config['SIMILAR_FOLDER'] = os.environ.get('SIMILAR_FOLDER', os.path.join(app.instance_path, 'similar'))
+app.config['SIMILAR_REBUILD_HOURS'] = 6
+app.config['SIMILAR_BID_WEIGHT'] = 0.3
+
+# Admin analytics: hourly and daily rollups are refreshed this often, for
+# activity at least ANALYTICS_SETTLE_SECONDS old (so in-flight writes land
+# first), catching up at most ANALYTICS_MAX_HOURS_PER_RUN hours per job
+app.config['ANALYTICS_ROLLUP_SECONDS'] = 60
+app.config['ANALYTICS_SETTLE_SECONDS'] = 60
+app.config['ANALYTICS_MAX_HOURS_PER_RUN'] = 168
+
+# Request coalescing: concurrent identical requests to @coalesced routes share
+# one run per process; a request left waiting longer than
+# COALESCE_WAIT_SECONDS runs on its own if it can get an admission slot back
+app.config['COALESCE_ENABLED'] = os.environ.get('COALESCE_ENABLED', '1') == '1'
+app.config['COALESCE_WAIT_SECONDS'] = 10
+
+# Landing page: /api/home is rebuilt in the background this often and served
+# from memory; lots are "trending" by bids in the last HOME_TRENDING_MINUTES
+app.config['HOME_REFRESH_SECONDS'] = 15
+app.config['HOME_TRENDING_MINUTES'] = 60
+app.config['HOME_SECTION_SIZE'] = 8
+
+# Idempotency keys: responses of bid and artwork creation are kept this long
+# under the client's Idempotency-Key and replayed on retries. A first request
+# still unfinished after IDEMPOTENCY_LOCK_SECONDS is presumed dead, and the key
+# can be used again
+app.config['IDEMPOTENCY_KEY_TTL_HOURS'] = int(os.environ.get('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+app.config['IDEMPOTENCY_LOCK_SECONDS'] = 60
+
+# Shill-bid watch: accepted bids are checked off the request path and
+# suspicious bidding is queued as BidFlag rows for admins (see bid_watch.py).
+# A bidder is flagged when at least BID_WATCH_ARTIST_MIN_BIDS of their bids in
+# the window, and BID_WATCH_ARTIST_SHARE of them, went to one artist; when they
+# raise their own leading bid BID_WATCH_SELF_RAISES times within
+# BID_WATCH_SELF_RAISE_MINUTES; or when their account is younger than
+# BID_WATCH_NEW_ACCOUNT_MINUTES
+app.config['BID_WATCH_ENABLED'] = os.environ.get('BID_WATCH_ENABLED', '1') == '1'
+app.config['BID_WATCH_WINDOW_HOURS'] = 24
+app.config['BID_WATCH_ARTIST_MIN_BIDS'] = 5
+app.config['BID_WATCH_ARTIST_SHARE'] = 0.8
+app.config['BID_WATCH_SELF_RAISES'] = 3
+app.config['BID_WATCH_SELF_RAISE_MINUTES'] = 10
+app.config['BID_WATCH_NEW_ACCOUNT_MINUTES'] = 60
+
+# Per-lot actors: each live lot is owned by one worker process (consistent
+# hashing on the artwork id over the sockets in LOT_ACTORS_SOCKET_DIR), and
+# every worker hands bids to the owner, which applies them in order and
+# commits them in batches of up to LOT_ACTORS_MAX_BATCH (see lot_actors.py).
+# All workers serving bids must share the directory and the setting
+app.config['LOT_ACTORS_ENABLED'] = os.environ.get('LOT_ACTORS_ENABLED', '0') == '1'
+app.config['LOT_ACTORS_SOCKET_DIR'] = os.environ.get('LOT_ACTORS_SOCKET_DIR', os.path.join(app.instance_path, 'lot-actors'))
+app.config['LOT_ACTORS_TIMEOUT_SECONDS'] = 5
+app.config['LOT_ACTORS_MAX_BATCH'] = 500
+if app.config['LOT_ACTORS_ENABLED'] and not LOT_ACTORS_SUPPORTED:
+    raise RuntimeError('LOT_ACTORS_ENABLED needs Unix domain sockets, which this platform does not have')
+
+# Users allowed to call /api/admin endpoints
+app.config['ADMIN_USERNAMES'] = [name for name in os.environ.get('ADMIN_USERNAMES', 'admin').split(',') if name]
+
 # Initialize extensions
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 jwt = JWTManager(app)
 CORS(app)
 
@@ -42,6 +236,16 @@ class Artist(db.Model):
     profile_image = db.Column(db.String(200))
     featured = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Maintained by record_artist_activity so listings never count per row
+    artwork_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_sales = db.Column(db.Float, nullable=False, default=0, server_default='0')  # Winning bids on closed lots
+    last_activity_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Joined, or last artwork listed or sold
+    
+    __table_args__ = (
+        db.Index('ix_artist_featured_order', 'featured', 'artwork_count', 'id'),
+        db.Index('ix_artist_popular_order', 'total_sales', 'artwork_count', 'id'),
+    )
 
 class Artwork(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -53,6 +257,20 @@ class Artwork(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     artist_id = db.Column(db.Integer, db.ForeignKey('artist.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    bid_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped with every accepted bid
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Last bid or status change
+    change_version = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)  # See next_change_version
+    status = db.Column(db.String(20), nullable=False, default='live', server_default='live')
+    ends_at = db.Column(db.DateTime, index=True)  # Closed automatically at this time, if set
+    closing_notified = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
+    closed_at = db.Column(db.DateTime, index=True)
+    
+    # Uploaded image metadata (empty for remote image URLs)
+    image_hash = db.Column(db.String(20))
+    image_width = db.Column(db.Integer)
+    image_height = db.Column(db.Integer)
+    image_blurhash = db.Column(db.String(64))
+    image_variants = db.Column(db.String(100))  # Comma separated variant widths, set once processed
     
     # Relationship to bids
     bids = db.relationship('Bid', backref='artwork', lazy=True, cascade='all, delete-orphan')
@@ -62,10 +280,1148 @@ class Bid(db.Model):
     amount = db.Column(db.Float, nullable=False)
     artwork_id = db.Column(db.Integer, db.ForeignKey('artwork.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    journal_seq = db.Column(db.Integer, unique=True)  # Set when applied from the bid journal
     
     # Relationships
     user = db.relationship('User', backref='bids')
+    
+    __table_args__ = (
+        # A lot's bids by amount: order book loads and winning bids
+        db.Index('ix_bid_artwork_amount', 'artwork_id', 'amount'),
+    )
+
+class Watch(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    artwork_id = db.Column(db.Integer, db.ForeignKey('artwork.id'), primary_key=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Notification(db.Model):
+    # In-app inbox
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    kind = db.Column(db.String(30), nullable=False)
+    artwork_id = db.Column(db.Integer, db.ForeignKey('artwork.id'))
+    message = db.Column(db.String(300), nullable=False)
+    data = db.Column(db.Text)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime)
+
+class BidSummary(db.Model):
+    # Stands in for the bids of an artwork once they have been archived
+    artwork_id = db.Column(db.Integer, db.ForeignKey('artwork.id'), primary_key=True)
+    bid_count = db.Column(db.Integer, nullable=False, default=0)
+    highest_bid = db.Column(db.Float)
+    highest_bidder_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    first_bid_at = db.Column(db.DateTime)
+    last_bid_at = db.Column(db.DateTime)
+    months = db.Column(db.String(400), nullable=False, default='')  # Archive months holding its bids
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ArchivedBidMonth(db.Model):
+    # Archive months in which a user has bids, so their history reads only those files
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)
+
+class ChangeCounter(db.Model):
+    # Single row holding the last auction change version handed out
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class AnalyticsRollup(db.Model):
+    # Activity per hour or day, overall ('all', key '') and per category and artist
+    grain = db.Column(db.String(4), primary_key=True)  # hour, day
+    dimension = db.Column(db.String(10), primary_key=True)  # all, category, artist
+    key = db.Column(db.String(100), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)  # Start of the hour or day (UTC)
+    bids = db.Column(db.Integer, nullable=False, default=0)
+    bidders = db.Column(db.Integer, nullable=False, default=0)  # Distinct within the bucket
+    new_lots = db.Column(db.Integer, nullable=False, default=0)
+    lots_closed = db.Column(db.Integer, nullable=False, default=0)
+    lots_sold = db.Column(db.Integer, nullable=False, default=0)
+    gmv = db.Column(db.Float, nullable=False, default=0)  # Winning bids of lots closed in the bucket
+
+class AnalyticsWatermark(db.Model):
+    # Single row: activity before this time is reflected in the rollups
+    id = db.Column(db.Integer, primary_key=True)
+    rolled_up_to = db.Column(db.DateTime)
+
+class AuctionTombstone(db.Model):
+    # Left behind by deleted artworks so delta clients can drop them
+    artwork_id = db.Column(db.Integer, primary_key=True)
+    change_version = db.Column(db.Integer, nullable=False, index=True)
+    removed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class IdempotencyKey(db.Model):
+    # Response of a create request sent with an Idempotency-Key, replayed on retries
+    scope = db.Column(db.String(100), primary_key=True)  # endpoint:user id
+    key = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)  # Hash of the request the key was first used with
+    status_code = db.Column(db.Integer)  # Null while that request is running
+    content_type = db.Column(db.String(100))
+    body = db.Column(db.LargeBinary)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class BidFlag(db.Model):
+    # Suspicious bidding raised by the bid watch, for admins to review
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)  # artist_concentration, self_outbid, new_account
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    artwork_id = db.Column(db.Integer, db.ForeignKey('artwork.id'))  # The bid that raised it
+    artist_id = db.Column(db.Integer, db.ForeignKey('artist.id'))
+    details = db.Column(db.Text)  # JSON
+    status = db.Column(db.String(20), nullable=False, default='open', server_default='open', index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    reviewed_at = db.Column(db.DateTime)
+    reviewed_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+
+class ReplicationHeartbeat(db.Model):
+    # Single row touched by the primary so replicas can measure their lag
+    id = db.Column(db.Integer, primary_key=True)
+    beat = db.Column(db.Float, nullable=False)
+
+# Admin Access
+def is_admin(user):
+    return user is not None and user.username in app.config['ADMIN_USERNAMES']
+
+def admin_required(view):
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not is_admin(User.query.get(int(get_jwt_identity()))):
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+# Rate Limiting & Admission Control
+rate_limiter = RateLimiter(
+    create_bucket_store(app.config['RATELIMIT_STORAGE_URL']),
+    app.config['RATELIMIT_BUDGETS'],
+    app.config['RATELIMIT_DEFAULT']
+)
+admission = AdmissionController(app.config['MAX_IN_FLIGHT_REQUESTS'])
+
+def rate_limit_key():
+    # Authenticated clients get their own bucket, everyone else is keyed by IP
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+        if identity:
+            return f'user:{identity}'
+    except Exception:
+        pass
+    return f'ip:{request.remote_addr}'
+
+@app.before_request
+def limit_api_requests():
+    if not request.path.startswith('/api/') or request.method == 'OPTIONS':
+        return None
+
+    if app.config['RATELIMIT_ENABLED']:
+        retry_after = rate_limiter.hit(request.endpoint, rate_limit_key())
+        if retry_after:
+            response = jsonify({'error': 'Rate limit exceeded, please slow down'})
+            response.headers['Retry-After'] = str(retry_after)
+            return response, 429
+
+    if not admission.acquire():
+        response = jsonify({'error': 'Server is busy, please retry shortly'})
+        response.headers['Retry-After'] = '1'
+        return response, 503
+    g.admitted = True
+    return None
+
+@app.teardown_request
+def release_admission_slot(exc):
+    if g.pop('admitted', False):
+        admission.release()
+
+def reacquire_admission_slot():
+    # For a request that gave its slot back while waiting on another
+    if not admission.acquire():
+        return False
+    g.admitted = True
+    return True
+
+# Profiling
+profiler = SamplingProfiler(
+    app.config['PROFILING_FOLDER'],
+    interval=app.config['PROFILING_INTERVAL_MS'] / 1000
+)
+request_counter = itertools.count()
+
+def profile_requested():
+    if request.headers.get('X-Profile') != '1':
+        return False
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return False
+    return identity is not None and is_admin(User.query.get(int(identity)))
+
+@app.before_request
+def start_profiling():
+    if not request.path.startswith('/api/') or request.endpoint is None:
+        return None
+    rate = app.config['PROFILING_SAMPLE_RATE']
+    if (rate and next(request_counter) % rate == 0) or profile_requested():
+        profiler.begin(request.endpoint)
+        g.profiled = True
+    return None
+
+@app.teardown_request
+def stop_profiling(exc):
+    if g.pop('profiled', False):
+        profiler.end()
+
+@app.route('/api/admin/profiling', methods=['GET'])
+@admin_required
+def get_profiling():
+    try:
+        return jsonify({
+            'sample_rate': app.config['PROFILING_SAMPLE_RATE'],
+            'interval_ms': app.config['PROFILING_INTERVAL_MS'],
+            'routes': [{
+                'route': route,
+                'samples': samples,
+                'collapsed': f'/api/admin/profiling/{route}/collapsed',
+                'speedscope': f'/api/admin/profiling/{route}/speedscope'
+            } for route, samples in profiler.routes().items()]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/profiling', methods=['POST'])
+@admin_required
+def update_profiling():
+    try:
+        data = request.get_json(silent=True) or {}
+        if 'sample_rate' in data:
+            rate = int(data['sample_rate'])
+            if rate < 0:
+                return jsonify({'error': 'sample_rate must be 0 (off) or N for 1 in N requests'}), 400
+            # Per process: with several workers, send this to each of them
+            app.config['PROFILING_SAMPLE_RATE'] = rate
+        if data.get('reset'):
+            profiler.reset()
+        return jsonify({
+            'message': 'Profiling updated',
+            'sample_rate': app.config['PROFILING_SAMPLE_RATE']
+        }), 200
+    except (TypeError, ValueError):
+        return jsonify({'error': 'sample_rate must be an integer'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/profiling/<route>/<fmt>', methods=['GET'])
+@admin_required
+def download_profile(route, fmt):
+    try:
+        if fmt == 'collapsed':
+            response = Response(profiler.collapsed(route), mimetype='text/plain')
+            filename = f'{route}.collapsed.txt'
+        elif fmt == 'speedscope':
+            response = jsonify(profiler.speedscope(route))
+            filename = f'{route}.speedscope.json'
+        else:
+            return jsonify({'error': 'Format must be collapsed or speedscope'}), 400
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Read Replica Routing
+def read_replica_heartbeat(engine):
+    with engine.connect() as connection:
+        return connection.execute(
+            db.select(ReplicationHeartbeat.beat).where(ReplicationHeartbeat.id == 1)
+        ).scalar()
+
+def write_heartbeat():
+    with app.app_context():
+        db.session.merge(ReplicationHeartbeat(id=1, beat=time.time()))
+        db.session.commit()
+
+def heartbeat_loop():
+    while True:
+        try:
+            write_heartbeat()
+        except Exception as e:
+            app.logger.warning('Replication heartbeat failed: %s', e)
+        time.sleep(app.config['REPLICA_HEARTBEAT_SECONDS'])
+
+def set_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA query_only = ON')
+    cursor.close()
+
+with app.app_context():
+    replica_engines = [db.engines[key] for key in app.config['SQLALCHEMY_BINDS'] if key.startswith('replica_')]
+for engine in replica_engines:
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', set_query_only)
+
+replicas = ReplicaSet(
+    replica_engines,
+    read_replica_heartbeat,
+    max_lag=app.config['REPLICA_MAX_LAG_SECONDS']
+)
+replica_heartbeat = None
+
+def pin_to_primary():
+    # Read-your-own-writes: this client skips replicas for a few seconds. The
+    # pin travels with the client (a cookie, or the X-Primary-Pin header sent
+    # back), so every worker process honours it and none has to remember it
+    g.primary_pin = time.time() + app.config['REPLICA_PIN_SECONDS']
+
+def is_pinned_to_primary():
+    pin = request.cookies.get('primary_pin') or request.headers.get('X-Primary-Pin')
+    try:
+        return float(pin) > time.time()
+    except (TypeError, ValueError):
+        return False
+
+@app.after_request
+def send_primary_pin(response):
+    until = g.pop('primary_pin', None)
+    if until is not None:
+        response.set_cookie('primary_pin', f'{until:.3f}', max_age=app.config['REPLICA_PIN_SECONDS'],
+                            httponly=True, samesite='Lax')
+        response.headers['X-Primary-Pin'] = f'{until:.3f}'
+    return response
+
+def read_replica(view):
+    # Marks a read-only route whose queries may be served by a replica
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        global replica_heartbeat
+        if replicas.engines:
+            if replica_heartbeat is None:
+                replica_heartbeat = threading.Thread(target=heartbeat_loop, daemon=True)
+                replica_heartbeat.start()
+            if not is_pinned_to_primary():
+                g.db_replica = replicas.choose()
+        return view(*args, **kwargs)
+    return wrapper
+
+# Request Coalescing
+single_flight = SingleFlight(wait_timeout=app.config['COALESCE_WAIT_SECONDS'])
+
+def frozen_response(rv):
+    # Body bytes, status and headers, so every waiting request builds its own Response
+    response = app.make_response(rv)
+    return response.get_data(), response.status_code, list(response.headers)
+
+def coalesced(view):
+    # Marks a public GET route: concurrent requests with the same path and
+    # query arguments are answered from one run of the view
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # A client that has just written must not get a run started before its write
+        if not app.config['COALESCE_ENABLED'] or is_pinned_to_primary():
+            return view(*args, **kwargs)
+        key = (tuple(sorted(kwargs.items())), tuple(sorted(request.args.items(multi=True))))
+        # Waiting requests hold no database connection, so they give back
+        # their admission slot and do not crowd out other requests
+        try:
+            (body, status, headers), shared = single_flight.do(
+                request.endpoint, key, lambda: frozen_response(view(*args, **kwargs)),
+                on_wait=lambda: release_admission_slot(None),
+                on_resume=reacquire_admission_slot
+            )
+        except FlightBusy:
+            response = jsonify({'error': 'Server is busy, please retry shortly'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        response = Response(body, status=status, headers=headers)
+        if shared:
+            response.headers['X-Coalesced'] = '1'
+        return response
+    return wrapper
+
+@app.route('/api/admin/coalescing', methods=['GET'])
+@admin_required
+def get_coalescing():
+    try:
+        return jsonify({
+            'enabled': app.config['COALESCE_ENABLED'],
+            'wait_seconds': app.config['COALESCE_WAIT_SECONDS'],
+            'routes': single_flight.stats()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Bid Journal (write-behind ingestion)
+bid_journal = None
+bid_journal_lock = threading.Lock()
+
+def apply_journal_bids(records):
+    with app.app_context():
+        seqs = [record['seq'] for record in records]
+        # Records may be replayed after a crash, skip the ones already applied
+        applied = {seq for (seq,) in db.session.query(Bid.journal_seq).filter(Bid.journal_seq.in_(seqs))}
+        new_records = [record for record in records if record['seq'] not in applied]
+        # A journaled bid can outlive its artwork when another process deleted
+        # it first; the journal dead-letters the refused records
+        live = {artwork_id for (artwork_id,) in db.session.query(Artwork.id).filter(
+            Artwork.id.in_({record['artwork_id'] for record in new_records}))}
+        refused = [(record, 'Artwork no longer exists') for record in new_records if record['artwork_id'] not in live]
+        new_records = [record for record in new_records if record['artwork_id'] in live]
+        db.session.add_all([
+            Bid(
+                amount=record['amount'],
+                artwork_id=record['artwork_id'],
+                user_id=record['user_id'],
+                created_at=datetime.fromisoformat(record['created_at']),
+                journal_seq=record['seq']
+            )
+            for record in new_records
+        ])
+        
+        bids_per_artwork = {}
+        for record in new_records:
+            bids_per_artwork[record['artwork_id']] = bids_per_artwork.get(record['artwork_id'], 0) + 1
+        for artwork_id, count in bids_per_artwork.items():
+            Artwork.query.filter_by(id=artwork_id).update(
+                {Artwork.bid_version: Artwork.bid_version + count, Artwork.updated_at: datetime.utcnow()},
+                synchronize_session=False
+            )
+        if bids_per_artwork:
+            mark_changed(bids_per_artwork)
+        db.session.commit()
+        return refused
+
+def get_bid_journal():
+    # Started lazily so the debug reloader's parent process never opens the journal
+    global bid_journal
+    with bid_journal_lock:
+        if bid_journal is None:
+            journal = BidJournal(
+                app.config['BID_JOURNAL_PATH'],
+                apply_journal_bids,
+                flush_interval=app.config['BID_JOURNAL_FLUSH_MS'] / 1000
+            )
+            replayed = journal.open()
+            if replayed:
+                app.logger.info('Replaying %d journaled bids', replayed)
+            journal.start()
+            atexit.register(journal.close)
+            bid_journal = journal
+    return bid_journal
+
+# Lot Actors (per-lot bid serialization)
+lot_actors = None
+
+lot_actors_lock = threading.Lock()
+
+def actor_bid_json(artwork_id, bid):
+    bid_id, user_id, amount, created_at = bid
+    return {
+        'message': 'Bid placed successfully',
+        'bid': {
+            'id': bid_id,
+            'amount': amount,
+            'artwork_id': artwork_id,
+            'user_id': user_id,
+            'created_at': created_at.isoformat()
+        }
+    }
+
+def apply_lot_bids(artwork_id, bids):
+    """Validate and store the bids of one lot in arrival order, claimed at the
+    version they were checked against. Returns (status, body) per bid"""
+    for attempt in range(3):
+        artwork = Artwork.query.get(artwork_id)
+        if artwork is None:
+            return [(404, {'error': 'Artwork not found'})] * len(bids)
+        if artwork.status == 'closed':
+            return [(400, {'error': 'This auction has closed'})] * len(bids)
+        if artwork.ends_at and artwork.ends_at <= datetime.utcnow():
+            return [(400, {'error': 'This auction has ended'})] * len(bids)
+        lot = get_lot(artwork)
+        
+        results, rows, highest = [], [], None
+        for bid in bids:
+            # Earlier bids of the batch count towards the minimum
+            minimum_bid = order_book.minimum_bid(lot)
+            if highest is not None:
+                minimum_bid = max(minimum_bid, highest + order_book.increment_for(highest))
+            if bid['amount'] < minimum_bid:
+                results.append((400, {'error': f'Minimum bid is ${minimum_bid:,.2f}'}))
+                continue
+            row = Bid(amount=bid['amount'], artwork_id=artwork_id, user_id=bid['user_id'],
+                      created_at=datetime.utcnow())
+            results.append(row)
+            rows.append(row)
+            highest = bid['amount']
+        
+        if not rows:
+            return results
+        db.session.add_all(rows)
+        
+        # Routing alone does not exclude other writers (membership changes,
+        # journaled bids), so the lot is still claimed at the version its
+        # bids were checked against
+        claimed = Artwork.query.filter_by(id=artwork_id, bid_version=lot.version).update(
+            {Artwork.bid_version: Artwork.bid_version + len(rows), Artwork.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+        if claimed:
+            mark_changed([artwork_id])
+            break
+        db.session.rollback()
+    else:
+        # Only the bids that passed validation lost the race
+        return [(409, {'error': 'Bidding is very active on this artwork, please try again'})
+                if isinstance(result, Bid) else result for result in results]
+    
+    # Read the new ids before the commit expires the rows
+    db.session.flush()
+    stored = {id(row): (row.id, row.user_id, row.amount, row.created_at) for row in rows}
+    db.session.commit()
+    
+    # The bids are committed, so a failure from here on must not answer them
+    # with an error (their retries would be placed twice)
+    try:
+        previous_price = lot.current_price
+        previous_leader = lot.leader[1] if lot.leader else None
+        version = lot.version
+        for row in rows:
+            version += 1
+            bid = stored[id(row)]
+            order_book.record_bid(artwork_id, bid, version)
+            notify_bid(artwork, previous_leader, bid[1], bid[2])
+            watch_bid(artwork, bid[1], bid[2], previous_leader)
+            previous_leader = bid[1]
+        facet_cache.price_changed(artwork_facet_info(artwork, None), previous_price, stored[id(rows[-1])][2])
+    except Exception as e:
+        db.session.rollback()
+        app.logger.warning('Publishing %d bids on artwork %s failed: %s', len(rows), artwork_id, e)
+    return [(201, actor_bid_json(artwork_id, stored[id(result)])) if isinstance(result, Bid) else result
+            for result in results]
+
+def apply_actor_bids(bids):
+    """Validate and store a batch of bids for lots this worker owns, in arrival order.
+    Each lot is claimed and committed on its own, so a conflict or error on one
+    lot leaves the bids on the others alone. Returns (status, body) per bid"""
+    positions = {}
+    for index, bid in enumerate(bids):
+        positions.setdefault(bid['artwork_id'], []).append(index)
+    
+    results = [None] * len(bids)
+    with app.app_context():
+        for artwork_id, indexes in positions.items():
+            try:
+                lot_results = apply_lot_bids(artwork_id, [bids[index] for index in indexes])
+            except Exception as e:
+                # Raised before the lot's commit, so none of its bids were stored
+                db.session.rollback()
+                lot_results = [(500, {'error': str(e)})] * len(indexes)
+            for index, result in zip(indexes, lot_results):
+                results[index] = result
+    return results
+
+def get_lot_actors():
+    # Started lazily, like the bid journal, so only serving processes join the ring
+    global lot_actors
+    with lot_actors_lock:
+        if lot_actors is None:
+            actors = LotActors(
+                app.config['LOT_ACTORS_SOCKET_DIR'],
+                apply_actor_bids,
+                timeout=app.config['LOT_ACTORS_TIMEOUT_SECONDS'],
+                max_batch=app.config['LOT_ACTORS_MAX_BATCH']
+            )
+            actors.open()
+            atexit.register(actors.close)
+            lot_actors = actors
+    return lot_actors
+
+def place_actor_bid(user_id, artwork_id, amount):
+    try:
+        status, body = get_lot_actors().submit({'user_id': user_id, 'artwork_id': artwork_id, 'amount': amount})
+    except TimeoutError as e:
+        return jsonify({'error': str(e)}), 504
+    if status == 201:
+        pin_to_primary()
+    return jsonify(body), status
+
+@app.route('/api/admin/lot-actors', methods=['GET'])
+@admin_required
+def get_lot_actors_stats():
+    try:
+        if not app.config['LOT_ACTORS_ENABLED']:
+            return jsonify({'enabled': False}), 200
+        actors = get_lot_actors()
+        live = db.session.query(Artwork.id).filter(Artwork.status != 'closed')
+        owners = {}
+        for (artwork_id,) in live:
+            owner = actors.owner(artwork_id)
+            owners[owner] = owners.get(owner, 0) + 1
+        return jsonify({'enabled': True, **actors.stats(), 'live_lots_per_member': owners}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Auction Change Versions
+def next_change_version():
+    """Take the next auction change version inside the current transaction
+
+    Incrementing the single counter row locks it until commit, so versions
+    become visible in increasing order and a client that has seen version N
+    can never later miss a change numbered below N.
+    """
+    bumped = ChangeCounter.query.filter_by(id=1).update(
+        {ChangeCounter.value: ChangeCounter.value + 1}, synchronize_session=False
+    )
+    if not bumped:
+        db.session.add(ChangeCounter(id=1, value=1))
+        db.session.flush()
+        return 1
+    return db.session.query(ChangeCounter.value).filter_by(id=1).scalar()
+
+def mark_changed(artwork_ids):
+    version = next_change_version()
+    Artwork.query.filter(Artwork.id.in_(list(artwork_ids))).update(
+        {Artwork.change_version: version}, synchronize_session=False
+    )
+    return version
+
+# Order Book
+def merge_bid_summary(summary, bid_count, recent):
+    # Archived lots keep their winning bid and count through the summary row
+    if summary is None:
+        return bid_count, recent
+    if summary.highest_bid is not None and (not recent or summary.highest_bid > recent[0][2]):
+        recent = [(None, summary.highest_bidder_id, summary.highest_bid, summary.last_bid_at)] + recent
+    return bid_count + summary.bid_count, recent
+
+def load_lot_bids(artwork_id):
+    bid_count = Bid.query.filter_by(artwork_id=artwork_id).count()
+    recent = db.session.query(Bid.id, Bid.user_id, Bid.amount, Bid.created_at)\
+                       .filter_by(artwork_id=artwork_id)\
+                       .order_by(Bid.amount.desc(), Bid.id.desc())\
+                       .limit(app.config['ORDER_BOOK_DEPTH'])\
+                       .all()
+    return merge_bid_summary(BidSummary.query.get(artwork_id), bid_count, [tuple(row) for row in recent])
+
+def load_all_lot_bids():
+    # Top bids of every artwork plus its bid count, in a single windowed query
+    ranked = db.session.query(
+        Bid.artwork_id, Bid.id, Bid.user_id, Bid.amount, Bid.created_at,
+        db.func.row_number().over(
+            partition_by=Bid.artwork_id, order_by=(Bid.amount.desc(), Bid.id.desc())
+        ).label('position'),
+        db.func.count().over(partition_by=Bid.artwork_id).label('bid_count')
+    ).subquery()
+    rows = db.session.query(ranked)\
+                     .filter(ranked.c.position <= app.config['ORDER_BOOK_DEPTH'])\
+                     .order_by(ranked.c.artwork_id, ranked.c.position)
+    
+    lots = {}
+    for artwork_id, bid_id, user_id, amount, created_at, position, bid_count in rows:
+        lots.setdefault(artwork_id, (bid_count, []))[1].append((bid_id, user_id, amount, created_at))
+    
+    summaries = {summary.artwork_id: summary for summary in BidSummary.query.all()}
+    return [
+        (artwork_id, *merge_bid_summary(summaries.get(artwork_id), *lots.get(artwork_id, (0, []))))
+        for artwork_id in set(lots) | set(summaries)
+    ]
+
+order_book = OrderBook(
+    load_lot_bids,
+    load_all_lot_bids,
+    depth=app.config['ORDER_BOOK_DEPTH'],
+    ladder=app.config['BID_INCREMENT_LADDER']
+)
+
+def get_lot(artwork):
+    if not order_book.warmed:
+        order_book.warm(db.session.query(Artwork.id, Artwork.price, Artwork.bid_version))
+    return order_book.lot(artwork.id, artwork.price, artwork.bid_version)
+
+# Read Path: listing routes select columns into read_path records instead
+# of loading ORM instances
+artwork_table, artist_table = Artwork.__table__, Artist.__table__
+bid_table, user_table = Bid.__table__, User.__table__
+
+def artwork_rows(record, columns=None):
+    """Core select of a record's artwork columns plus the artist name. With
+    `columns`, every other one is selected as NULL (and artist is only joined
+    when its name is wanted)"""
+    def column(name):
+        return artwork_table.c[name] if columns is None or name in columns else null().label(name)
+    if columns is not None and 'artist_name' not in columns:
+        return select(*[column(name) for name in record.__slots__[:-1]], null().label('artist_name'))
+    return select(*[column(name) for name in record.__slots__[:-1]], artist_table.c.name)\
+        .select_from(artwork_table.outerjoin(artist_table, artist_table.c.id == artwork_table.c.artist_id))
+
+def artist_rows():
+    return select(*[artist_table.c[name] for name in ArtistRow.__slots__])
+
+# Artwork Images
+def record_image_variants(artwork_id, metadata):
+    # Runs on an image worker thread once the variants are on disk
+    with app.app_context():
+        artwork = Artwork.query.get(artwork_id)
+        if artwork:
+            artwork.image_width = metadata['width']
+            artwork.image_height = metadata['height']
+            artwork.image_blurhash = metadata['blurhash']
+            artwork.image_variants = ','.join(str(w) for w in metadata['widths'])
+            db.session.commit()
+
+image_pipeline = ImagePipeline(
+    app.config['UPLOAD_FOLDER'],
+    widths=app.config['IMAGE_WIDTHS'],
+    workers=app.config['IMAGE_WORKERS'],
+    on_complete=record_image_variants
+)
+
+def artwork_variant_widths(artwork):
+    if not artwork.image_hash or not artwork.image_variants:
+        return []
+    return [int(w) for w in artwork.image_variants.split(',')]
+
+def artwork_image_url(artwork, width=640):
+    # Smallest processed variant at least `width` wide, falling back to the original
+    widths = artwork_variant_widths(artwork)
+    if not widths:
+        return artwork.image_url
+    chosen = next((w for w in widths if w >= width), widths[-1])
+    return f'/media/artworks/{artwork.image_hash}/{chosen}.webp'
+
+def artwork_image_srcset(artwork):
+    return ', '.join(f'/media/artworks/{artwork.image_hash}/{w}.webp {w}w' for w in artwork_variant_widths(artwork))
+
+def artwork_image_fields(artwork):
+    return {
+        'image_srcset': artwork_image_srcset(artwork),
+        'image_blurhash': artwork.image_blurhash,
+        'image_width': artwork.image_width,
+        'image_height': artwork.image_height
+    }
+
+# Listing fields: `fields=` and `view=` project responses down to the columns selected
+ARTWORK_FIELDS = FieldSet({
+    'id': (('id',), lambda artwork, options: artwork.id),
+    'title': (('title',), lambda artwork, options: artwork.title),
+    'description': (('description',), lambda artwork, options: artwork.description),
+    'category': (('category',), lambda artwork, options: artwork.category),
+    'price': (('price',), lambda artwork, options: artwork.price),
+    'image': (('image_url', 'image_hash', 'image_variants'),
+              lambda artwork, options: artwork_image_url(artwork, options['image_width'])),
+    'image_srcset': (('image_hash', 'image_variants'), lambda artwork, options: artwork_image_srcset(artwork)),
+    'image_blurhash': (('image_blurhash',), lambda artwork, options: artwork.image_blurhash),
+    'image_width': (('image_width',), lambda artwork, options: artwork.image_width),
+    'image_height': (('image_height',), lambda artwork, options: artwork.image_height),
+    'artist': (('artist_name',), lambda artwork, options: artwork.artist_name or 'Unknown Artist'),
+    'created_at': (('created_at',), lambda artwork, options: artwork.created_at.isoformat()),
+}, views={
+    'card': ('id', 'title', 'image', 'image_srcset', 'image_blurhash', 'price', 'artist'),
+    'result': ('id', 'title', 'description', 'category', 'price', 'image', 'artist'),  # /api/search
+})
+
+# Background Jobs
+with app.app_context():
+    job_queue = JobQueue(
+        db.engine,
+        workers=app.config['JOB_WORKERS'],
+        backoff_seconds=app.config['JOB_RETRY_BACKOFF_SECONDS'],
+        context=app.app_context
+    )
+job_queue_started = False
+job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    # Workers start lazily, like the bid journal, so the reloader parent never runs jobs
+    global job_queue_started
+    with job_queue_lock:
+        if not job_queue_started:
+            job_queue.open()
+            job_queue.start()
+            atexit.register(job_queue.close)
+            job_queue_started = True
+            schedule_job_purge()
+    return job_queue
+
+def schedule_job_purge(delay=3600):
+    # Enqueues directly: this also runs inside get_job_queue while it holds the lock
+    slot = int((time.time() + delay) // 3600)
+    job_queue.enqueue('purge-jobs', delay=delay, idempotency_key=f'purge-jobs:{slot}')
+
+@job_queue.register('purge-jobs')
+def purge_jobs_job(payload):
+    """Delete finished jobs older than the retention period"""
+    try:
+        cutoff = datetime.utcnow() - timedelta(hours=app.config['JOB_RETENTION_HOURS'])
+        return {'purged': job_queue.purge(cutoff)}
+    finally:
+        schedule_job_purge()
+
+def job_response(job_id):
+    return jsonify({
+        'message': 'Job queued',
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}'
+    }), 202
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        job = get_job_queue().get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        if job['user_id'] is not None:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+            if identity is None or (int(identity) != job['user_id'] and not is_admin(User.query.get(int(identity)))):
+                return jsonify({'error': 'Job not found'}), 404
+        
+        return jsonify({
+            'id': job['id'],
+            'name': job['name'],
+            'status': job['status'],
+            'attempts': job['attempts'],
+            'max_attempts': job['max_attempts'],
+            'result': job['result'],
+            'error': job['error'],
+            'created_at': job['created_at'].isoformat() if job['created_at'] else None,
+            'started_at': job['started_at'].isoformat() if job['started_at'] else None,
+            'finished_at': job['finished_at'].isoformat() if job['finished_at'] else None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.cli.command('run-jobs')
+def run_jobs_command():
+    """Work queued background jobs in this process until interrupted."""
+    job_queue.open()
+    job_queue.start()
+    schedule_deadline_scan(delay=0)
+    schedule_similar_build(delay=0)
+    schedule_analytics_rollup(delay=0)
+    schedule_idempotency_purge(delay=0)
+    schedule_job_purge(delay=0)
+    print(f'Working jobs with {job_queue.workers} threads, press Ctrl+C to stop')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        job_queue.close()
+
+# Idempotency Keys
+idempotency_purge_scheduled = False
+
+def request_fingerprint():
+    # Reusing a key for a different request is a client bug, not a retry
+    digest = hashlib.sha256(f'{request.method} {request.full_path}\n'.encode())
+    if request.mimetype in ('multipart/form-data', 'application/x-www-form-urlencoded'):
+        for name, value in sorted(request.form.items(multi=True)):
+            digest.update(f'{name}={value}\n'.encode())
+        for name, upload in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+            digest.update(f'{name}:{upload.filename}\n'.encode())
+            for chunk in iter(lambda: upload.stream.read(65536), b''):
+                digest.update(chunk)
+            upload.stream.seek(0)
+    else:
+        digest.update(request.get_data(cache=True))
+    return digest.hexdigest()
+
+def idempotency_in_progress():
+    response = jsonify({'error': 'A request with this Idempotency-Key is still being processed'})
+    response.status_code = 409
+    response.headers['Retry-After'] = '1'
+    return response
+
+def release_idempotency_key(scope, key):
+    IdempotencyKey.query.filter_by(scope=scope, key=key).delete(synchronize_session=False)
+    db.session.commit()
+
+def idempotent(view):
+    # Marks a create route: requests sent with the same Idempotency-Key by the
+    # same user run once, and retries get the stored response without running
+    # the view again. Goes below @jwt_required
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        global idempotency_purge_scheduled
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > 255:
+            return jsonify({'error': 'Idempotency-Key must be 1 to 255 characters'}), 400
+
+        scope = f'{request.endpoint}:{get_jwt_identity()}'
+        fingerprint = request_fingerprint()
+        now = datetime.utcnow()
+        record = IdempotencyKey.query.get((scope, key))
+        if record is not None:
+            abandoned = record.status_code is None and \
+                record.created_at <= now - timedelta(seconds=app.config['IDEMPOTENCY_LOCK_SECONDS'])
+            if record.expires_at > now and not abandoned:
+                if record.fingerprint != fingerprint:
+                    return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+                if record.status_code is None:
+                    return idempotency_in_progress()
+                response = Response(record.body, status=record.status_code, content_type=record.content_type)
+                response.headers['Idempotent-Replayed'] = 'true'
+                return response
+            # Matching created_at, so a fresh claim made by another request meanwhile is kept
+            db.session.expunge(record)
+            IdempotencyKey.query.filter_by(scope=scope, key=key, created_at=record.created_at) \
+                .delete(synchronize_session=False)
+
+        db.session.add(IdempotencyKey(
+            scope=scope, key=key, fingerprint=fingerprint, created_at=now,
+            expires_at=now + timedelta(hours=app.config['IDEMPOTENCY_KEY_TTL_HOURS'])
+        ))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return idempotency_in_progress()
+        if not idempotency_purge_scheduled:
+            schedule_idempotency_purge()
+            idempotency_purge_scheduled = True
+
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        except BaseException:
+            db.session.rollback()
+            release_idempotency_key(scope, key)
+            raise
+        # Failures and responses asking the client to try again are not kept,
+        # so a retry with the same key runs the request
+        if response.status_code >= 500 or response.status_code in (409, 429):
+            db.session.rollback()
+            release_idempotency_key(scope, key)
+        else:
+            IdempotencyKey.query.filter_by(scope=scope, key=key).update({
+                IdempotencyKey.status_code: response.status_code,
+                IdempotencyKey.content_type: response.content_type,
+                IdempotencyKey.body: response.get_data()
+            }, synchronize_session=False)
+            db.session.commit()
+        return response
+    return wrapper
+
+def schedule_idempotency_purge(delay=3600):
+    slot = int((time.time() + delay) // 3600)
+    get_job_queue().enqueue('purge-idempotency-keys', delay=delay,
+                            idempotency_key=f'purge-idempotency-keys:{slot}')
+
+@job_queue.register('purge-idempotency-keys')
+def purge_idempotency_keys_job(payload):
+    """Delete stored responses whose key has expired"""
+    try:
+        purged = IdempotencyKey.query.filter(IdempotencyKey.expires_at <= datetime.utcnow()) \
+            .delete(synchronize_session=False)
+        db.session.commit()
+        return {'purged': purged}
+    finally:
+        schedule_idempotency_purge()
+
+# Notifications
+def resolve_notifications(events):
+    """Turn buffered events into per-user notifications"""
+    with app.app_context():
+        # Watchers of every lot in the batch plus the bidders of closing or
+        # closed lots, in one query
+        lot_ids = {event['artwork_id'] for event in events}
+        ending_ids = {event['artwork_id'] for event in events if event['kind'] in ('closing_soon', 'closed')}
+        audience = union(
+            select(Watch.artwork_id, Watch.user_id, literal('watch')).where(Watch.artwork_id.in_(lot_ids)),
+            select(Bid.artwork_id, Bid.user_id, literal('bid')).where(Bid.artwork_id.in_(ending_ids)),
+            select(BidSummary.artwork_id, BidSummary.highest_bidder_id, literal('bid'))
+                .where(BidSummary.artwork_id.in_(ending_ids))
+        )
+        watchers, bidders = {}, {}
+        for artwork_id, user_id, role in db.session.execute(audience):
+            (watchers if role == 'watch' else bidders).setdefault(artwork_id, set()).add(user_id)
+    
+    notifications = []
+    def notify(user_id, kind, event, message):
+        notifications.append({
+            'user_id': user_id,
+            'kind': kind,
+            'artwork_id': event['artwork_id'],
+            'message': message,
+            'data': {'title': event['title'], 'amount': event.get('amount')}
+        })
+    
+    for event in events:
+        title = event['title']
+        lot_watchers = watchers.get(event['artwork_id'], set())
+        if event['kind'] == 'bid':
+            previous_leader = event['previous_leader']
+            if previous_leader is not None and previous_leader != event['bidder_id']:
+                notify(previous_leader, 'outbid', event,
+                       f'You have been outbid on "{title}", the current bid is ${event["amount"]:,.2f}')
+            for user_id in lot_watchers - {previous_leader, event['bidder_id']}:
+                notify(user_id, 'new_bid', event, f'New bid of ${event["amount"]:,.2f} on "{title}"')
+        elif event['kind'] == 'closing_soon':
+            for user_id in bidders.get(event['artwork_id'], set()) | lot_watchers:
+                notify(user_id, 'closing_soon', event,
+                       f'"{title}" closes in less than {app.config["CLOSING_SOON_MINUTES"]} minutes')
+        elif event['kind'] == 'closed':
+            for user_id in bidders.get(event['artwork_id'], set()) | lot_watchers:
+                if user_id == event['winner_id']:
+                    notify(user_id, 'auction_won', event, f'You won "{title}" for ${event["amount"]:,.2f}')
+                else:
+                    notify(user_id, 'auction_ended', event, f'"{title}" has closed')
+    return notifications
+
+def dispatch_notifications(batches, chunk_size=1000):
+    # One delivery job per channel and chunk of users, so a failing channel
+    # is retried on its own
+    with app.app_context():
+        users = dict(db.session.query(User.id, User.email).filter(User.id.in_(list(batches))))
+    user_batches = [
+        {'user_id': user_id, 'email': users.get(user_id), 'notifications': notifications}
+        for user_id, notifications in batches.items()
+    ]
+    for start in range(0, len(user_batches), chunk_size):
+        chunk = user_batches[start:start + chunk_size]
+        for channel in notification_channels:
+            get_job_queue().enqueue('deliver-notifications', {'channel': channel, 'batches': chunk}, priority=5)
+
+def store_inbox_notifications(rows):
+    now = datetime.utcnow()
+    db.session.execute(db.insert(Notification), [{
+        'user_id': row['user_id'],
+        'kind': row['kind'],
+        'artwork_id': row['artwork_id'],
+        'message': row['message'],
+        'data': json.dumps(row['data']),
+        'created_at': now
+    } for row in rows])
+    db.session.commit()
+
+notification_channels = {}
+for channel_name in app.config['NOTIFICATION_CHANNELS']:
+    if channel_name == 'inbox':
+        notification_channels['inbox'] = InboxChannel(store_inbox_notifications)
+    elif channel_name == 'email':
+        notification_channels['email'] = EmailChannel(
+            app.config['NOTIFICATION_SMTP_HOST'],
+            app.config['NOTIFICATION_SMTP_PORT'],
+            app.config['NOTIFICATION_EMAIL_SENDER']
+        )
+    elif channel_name == 'webhook' and app.config['NOTIFICATION_WEBHOOK_URL']:
+        notification_channels['webhook'] = WebhookChannel(app.config['NOTIFICATION_WEBHOOK_URL'])
+
+notification_hub = NotificationHub(
+    resolve_notifications,
+    dispatch_notifications,
+    flush_interval=app.config['NOTIFICATION_FLUSH_SECONDS'],
+    cooldown=app.config['NOTIFICATION_COOLDOWN_SECONDS']
+)
+notification_hub_started = False
+
+def publish_notification(kind, artwork_id, **data):
+    global notification_hub_started
+    if not notification_hub_started:
+        with job_queue_lock:
+            if not notification_hub_started:
+                notification_hub.start()
+                atexit.register(notification_hub.close)
+                notification_hub_started = True
+        schedule_deadline_scan()
+        schedule_analytics_rollup()
+    notification_hub.publish(kind, artwork_id, **data)
+
+@job_queue.register('deliver-notifications')
+def deliver_notifications_job(payload):
+    notification_channels[payload['channel']].deliver(payload['batches'])
+    return {'delivered': sum(len(batch['notifications']) for batch in payload['batches'])}
+
+def schedule_deadline_scan(delay=60):
+    # Keyed by minute, so each slot is queued once however many processes ask
+    slot = int((time.time() + delay) // 60)
+    get_job_queue().enqueue('scan-auction-deadlines', delay=delay,
+                            idempotency_key=f'scan-auction-deadlines:{slot}')
+
+@job_queue.register('scan-auction-deadlines')
+def scan_auction_deadlines_job(payload):
+    """Announce lots closing soon and close the ones whose end time has passed"""
+    try:
+        now = datetime.utcnow()
+        closing = Artwork.query.filter(
+            Artwork.status == 'live',
+            Artwork.closing_notified.is_(False),
+            Artwork.ends_at > now,
+            Artwork.ends_at <= now + timedelta(minutes=app.config['CLOSING_SOON_MINUTES'])
+        ).all()
+        for artwork in closing:
+            artwork.closing_notified = True
+        db.session.commit()
+        for artwork in closing:
+            publish_notification('closing_soon', artwork.id, title=artwork.title)
+        
+        expired = Artwork.query.filter(Artwork.status == 'live', Artwork.ends_at <= now).all()
+        for artwork in expired:
+            close_lot(artwork)
+        
+        return {'closing_soon': len(closing), 'closed': len(expired)}
+    finally:
+        schedule_deadline_scan()
+
+@app.route('/api/notifications', methods=['GET'])
+@jwt_required()
+def get_notifications():
+    try:
+        user_id = int(get_jwt_identity())
+        unread_only = request.args.get('unread', 'false').lower() == 'true'
+        limit = min(request.args.get('limit', 50, type=int), 100)
+        before = request.args.get('before', type=int)
+        
+        query = Notification.query.filter_by(user_id=user_id)
+        if unread_only:
+            query = query.filter(Notification.read_at.is_(None))
+        if before:
+            query = query.filter(Notification.id < before)
+        notifications = query.order_by(Notification.id.desc()).limit(limit).all()
+        
+        unread_count = Notification.query.filter_by(user_id=user_id)\
+                                         .filter(Notification.read_at.is_(None)).count()
+        
+        return jsonify({
+            'notifications': [{
+                'id': notification.id,
+                'kind': notification.kind,
+                'artwork_id': notification.artwork_id,
+                'message': notification.message,
+                'data': json.loads(notification.data) if notification.data else None,
+                'created_at': notification.created_at.isoformat(),
+                'read': notification.read_at is not None
+            } for notification in notifications],
+            'unread_count': unread_count
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/notifications/read', methods=['POST'])
+@jwt_required()
+def mark_notifications_read():
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json(silent=True) or {}
+        
+        query = Notification.query.filter_by(user_id=user_id).filter(Notification.read_at.is_(None))
+        if data.get('ids'):
+            query = query.filter(Notification.id.in_([int(i) for i in data['ids']]))
+        updated = query.update({Notification.read_at: datetime.utcnow()}, synchronize_session=False)
+        db.session.commit()
+        
+        return jsonify({'message': 'Notifications marked as read', 'updated': updated}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
 
 # Authentication Routes
 @app.route('/api/auth/register', methods=['POST'])
@@ -104,6 +1460,7 @@ def register():
             )
             db.session.add(artist)
             db.session.commit()
+            suggest_artist_added(artist)
         
         access_token = create_access_token(identity=str(user.id))
         
@@ -180,12 +1537,11 @@ def get_user_profile():
                 'bio': artist.bio,
                 'specialty': artist.specialty,
                 'profile_image': artist.profile_image,
-                'featured': artist.featured
+                'featured': artist.featured,
+                'artwork_count': artist.artwork_count,
+                'total_sales': artist.total_sales,
+                'last_activity_at': artist.last_activity_at.isoformat() if artist.last_activity_at else None
             }
-            
-            # Add artwork count
-            artwork_count = Artwork.query.filter_by(artist_id=artist.id).count()
-            profile_data['artist_profile']['artwork_count'] = artwork_count
         
         return jsonify(profile_data), 200
         
@@ -226,6 +1582,9 @@ def update_user_profile():
         
         db.session.commit()
         
+        if user.is_artist and user.artist_profile:
+            suggest_artist_added(user.artist_profile)
+        
         return jsonify({'message': 'Profile updated successfully'}), 200
         
     except Exception as e:
@@ -303,60 +1662,102 @@ def change_password():
 
 # Artwork Routes
 @app.route('/api/artworks', methods=['GET'])
+@coalesced
+@read_replica
 def get_artworks():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 12, type=int)
         category = request.args.get('category')
         search = request.args.get('search')
+        image_width = request.args.get('image_width', 640, type=int)
+        projection = ARTWORK_FIELDS.projection(request.args.get('fields'), request.args.get('view'))
         
-        query = Artwork.query
+        statement = artwork_rows(ArtworkRow, projection.columns)
         
         if category:
-            query = query.filter(Artwork.category == category)
+            statement = statement.where(artwork_table.c.category == category)
         
         if search:
-            query = query.filter(
-                (Artwork.title.contains(search)) |
-                (Artwork.description.contains(search))
+            statement = statement.where(
+                (artwork_table.c.title.contains(search)) |
+                (artwork_table.c.description.contains(search))
             )
         
-        artworks = query.paginate(page=page, per_page=per_page, error_out=False)
+        artworks, pagination = paginate(db.session, statement, ArtworkRow, page, per_page)
         
-        artwork_list = []
-        for artwork in artworks.items:
-            artist_name = "Unknown Artist"
-            if artwork.artist_id:
-                artist = Artist.query.get(artwork.artist_id)
-                if artist:
-                    artist_name = artist.name
-            
-            artwork_list.append({
-                'id': artwork.id,
-                'title': artwork.title,
-                'description': artwork.description,
-                'category': artwork.category,
-                'price': artwork.price,
-                'image': artwork.image_url,
-                'artist': artist_name,
-                'created_at': artwork.created_at.isoformat()
-            })
+        options = {'image_width': image_width}
+        artwork_list = [projection.render(artwork, options) for artwork in artworks]
         
         return jsonify({
             'artworks': artwork_list,
-            'pagination': {
-                'page': artworks.page,
-                'pages': artworks.pages,
-                'per_page': artworks.per_page,
-                'total': artworks.total
-            }
+            'pagination': pagination
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Longest accepted value of each text field (the column sizes, description is free text)
+ARTWORK_TEXT_LIMITS = {'title': 200, 'description': 10000, 'category': 50, 'image_url': 200}
+
+def artwork_fields(data):
+    """Column values for a new artwork from request data. Raises ValueError with the message for the client"""
+    if not isinstance(data, dict):
+        raise ValueError('Artwork data must be a JSON object')
+    if not data.get('title'):
+        raise ValueError('Title is required')
+    for name, limit in ARTWORK_TEXT_LIMITS.items():
+        value = data.get(name)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f'{name} must be a string')
+        if value and len(value) > limit:
+            raise ValueError(f'{name} must be at most {limit} characters')
+    try:
+        price = float(data.get('starting_price') or 0)
+    except (TypeError, ValueError):
+        raise ValueError('Valid starting price is required')
+    if not 0 < price < float('inf'):
+        raise ValueError('Valid starting price is required')
+    
+    ends_at = None
+    if data.get('duration_hours') not in (None, ''):
+        try:
+            hours = float(data['duration_hours'])
+        except (TypeError, ValueError):
+            raise ValueError('Valid duration_hours is required')
+        if not 0 < hours <= app.config['AUCTION_MAX_DURATION_HOURS']:
+            raise ValueError(f"duration_hours must be more than 0 and at most {app.config['AUCTION_MAX_DURATION_HOURS']}")
+        ends_at = datetime.utcnow() + timedelta(hours=hours)
+    
+    return {
+        'title': data['title'],
+        'description': data.get('description', ''),
+        'category': data.get('category', 'contemporary'),
+        'price': price,
+        'image_url': data.get('image_url', ''),
+        'ends_at': ends_at
+    }
+
+def get_or_create_artist(user):
+    """(artist profile, created) for an artist user, added to the session if new"""
+    artist = user.artist_profile
+    if artist:
+        return artist, False
+    artist = Artist(
+        user_id=user.id,
+        name=user.username,
+        bio='',
+        specialty='Contemporary Art'
+    )
+    db.session.add(artist)
+    db.session.flush()
+    return artist, True
+
 @app.route('/api/artworks', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_artwork():
     try:
         user_id = int(get_jwt_identity())
@@ -368,41 +1769,67 @@ def create_artwork():
         if not user.is_artist:
             return jsonify({'error': 'Only artists can create artworks'}), 403
         
-        data = request.get_json()
+        # Accept JSON, or multipart form data carrying an 'image' file upload
+        upload = request.files.get('image')
+        if upload:
+            data = request.form.to_dict()
+            try:
+                data['starting_price'] = float(data.get('starting_price') or 0)
+            except ValueError:
+                return jsonify({'error': 'Valid starting price is required'}), 400
+        else:
+            data = request.get_json(silent=True)
         
         # Validate required fields
-        if not data.get('title'):
-            return jsonify({'error': 'Title is required'}), 400
-        
-        if not data.get('starting_price') or data.get('starting_price') < 0:
-            return jsonify({'error': 'Valid starting price is required'}), 400
-        
-        # Get or create artist profile
-        artist = user.artist_profile
-        if not artist:
-            artist = Artist(
-                user_id=user.id,
-                name=user.username,
-                bio='',
-                specialty='Contemporary Art'
-            )
-            db.session.add(artist)
-            db.session.flush()
+        try:
+            fields = artwork_fields(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        ends_at = fields['ends_at']
+        
+        image_hash = None
+        if upload:
+            try:
+                image_hash, extension = image_pipeline.save_original(upload.stream)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            fields['image_url'] = f'/media/artworks/{image_hash}/original.{extension}'
+        
+        artist, new_artist = get_or_create_artist(user)
         
         # Create artwork
         artwork = Artwork(
-            title=data['title'],
-            description=data.get('description', ''),
-            category=data.get('category', 'contemporary'),
-            price=data['starting_price'],
-            image_url=data.get('image_url', ''),
+            **fields,
+            image_hash=image_hash,
             user_id=user.id,
             artist_id=artist.id
         )
         
+        artwork.change_version = next_change_version()
         db.session.add(artwork)
+        record_artist_activity(artist.id, artworks=1)
         db.session.commit()
         
+        # The artwork is committed, so a failure from here on must not turn
+        # into a 500 (@idempotent would release the key and a retry would
+        # create it twice); the indexes catch up on their next rebuild
+        try:
+            if ends_at:
+                schedule_deadline_scan(delay=0)
+            
+            if image_hash:
+                image_pipeline.submit(artwork.id, image_hash, extension)
+            
+            facet_cache.artwork_added(artwork_facet_info(artwork, artist.name))
+            if new_artist:
+                suggest_artist_added(artist)
+            suggest_artwork_added(artwork, artist)
+            similar_index.add(artwork.id, artwork_text(artwork, artist.specialty))
+        except Exception as e:
+            db.session.rollback()
+            app.logger.warning('Indexing artwork %s failed: %s', artwork.id, e)
+        pin_to_primary()
+        
         return jsonify({
             'message': 'Artwork created successfully',
             'artwork': {
@@ -413,6 +1840,7 @@ def create_artwork():
                 'price': artwork.price,
                 'image': artwork.image_url,
                 'artist': artist.name,
+                'ends_at': artwork.ends_at.isoformat() if artwork.ends_at else None,
                 'created_at': artwork.created_at.isoformat()
             }
         }), 201
@@ -421,93 +1849,534 @@ def create_artwork():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# Bulk Artwork Import
+def bulk_artwork_items():
+    """Items of a bulk request: a JSON array (or {"artworks": [...]}), or NDJSON
+    read line by line. Lines that are not JSON are yielded as ValueErrors"""
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        # @idempotent has already read the body to fingerprint it when a key was sent
+        lines = request.get_data(cache=True).splitlines() if 'Idempotency-Key' in request.headers \
+            else request.stream
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield ValueError('Invalid JSON')
+        return
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('artworks')
+    if not isinstance(data, list):
+        raise ValueError('Send a JSON array of artworks, {"artworks": [...]}, or NDJSON')
+    yield from data
+
+def is_remote_image(url):
+    return bool(url) and url.startswith(('http://', 'https://'))
+
+def insert_artwork_batch(user, artist, batch):
+    """Insert (index, fields) pairs in one transaction and return the new artworks"""
+    version = next_change_version()
+    artworks = [Artwork(**fields, user_id=user.id, artist_id=artist.id, change_version=version)
+                for _, fields in batch]
+    db.session.add_all(artworks)
+    record_artist_activity(artist.id, artworks=len(artworks))
+    db.session.commit()
+    
+    # The rows are committed, so an index failure must not report them as
+    # failed (a retry would create them twice); the indexes catch up on
+    # their next rebuild
+    try:
+        for artwork in artworks:
+            facet_cache.artwork_added(artwork_facet_info(artwork, artist.name))
+            suggest_index.add('artwork', artwork.id, artwork.title, 1)
+        suggest_index.bump('artist', artist.id, artist.name, len(artworks))
+        similar_index.add_many([(artwork.id, artwork_text(artwork, artist.specialty), ()) for artwork in artworks])
+    except Exception as e:
+        app.logger.warning('Indexing %d imported artworks failed: %s', len(artworks), e)
+    return artworks
+
+@app.route('/api/artworks/bulk', methods=['POST'])
+@jwt_required()
+@idempotent
+def create_artworks_bulk():
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        if not user.is_artist:
+            return jsonify({'error': 'Only artists can create artworks'}), 403
+        
+        import_images = request.args.get('import_images', 'true').lower() != 'false'
+        max_items = app.config['BULK_ARTWORKS_MAX_ITEMS']
+        batch_size = app.config['BULK_ARTWORKS_BATCH_SIZE']
+        artist, new_artist, has_deadlines = None, False, False
+        created, errors, image_jobs = [], [], []
+        batch = []
+        
+        def flush():
+            nonlocal artist, new_artist, has_deadlines
+            try:
+                if artist is None:
+                    artist, new_artist = get_or_create_artist(user)
+                artworks = insert_artwork_batch(user, artist, batch)
+            except Exception as e:
+                # The database error names the statement and every value in it
+                db.session.rollback()
+                app.logger.warning('Bulk artwork batch failed: %s', e)
+                errors.extend({'index': index, 'error': 'This batch could not be saved, please try again'}
+                              for index, _ in batch)
+                batch.clear()
+                return
+            
+            for (index, _), artwork in zip(batch, artworks):
+                created.append({'index': index, 'id': artwork.id, 'title': artwork.title})
+            has_deadlines = has_deadlines or any(artwork.ends_at for artwork in artworks)
+            remote = [artwork.id for artwork in artworks if is_remote_image(artwork.image_url)]
+            if import_images and remote:
+                job_id = get_job_queue().enqueue('import-artwork-images', {'artwork_ids': remote}, user_id=user.id)
+                image_jobs.append({'job_id': job_id, 'status_url': f'/api/jobs/{job_id}', 'artworks': len(remote)})
+            batch.clear()
+        
+        total = 0
+        for index, item in enumerate(bulk_artwork_items()):
+            if index >= max_items:
+                errors.append({'index': index, 'error': f'At most {max_items} artworks per request'})
+                break
+            total += 1
+            try:
+                if isinstance(item, ValueError):
+                    raise item
+                batch.append((index, artwork_fields(item)))
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+                continue
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        
+        if created:
+            if new_artist:
+                suggest_artist_added(artist)
+            if has_deadlines:
+                schedule_deadline_scan(delay=0)
+            pin_to_primary()
+        
+        return jsonify({
+            'message': f'{len(created)} of {total} artworks created',
+            'created': created,
+            'errors': errors,
+            'image_jobs': image_jobs
+        }), 201 if created else 400
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@job_queue.register('import-artwork-images')
+def import_artwork_images_job(payload):
+    # Each image is committed on its own, so a retried job skips those already imported
+    imported, failed = 0, {}
+    for artwork in Artwork.query.filter(Artwork.id.in_(payload['artwork_ids'])).all():
+        if artwork.image_hash or not is_remote_image(artwork.image_url):
+            continue
+        try:
+            image_hash, extension = image_pipeline.fetch_original(artwork.image_url, app.config['MAX_CONTENT_LENGTH'])
+        except (ValueError, OSError) as e:
+            # The artwork keeps showing the remote URL
+            failed[artwork.id] = str(e)
+            continue
+        artwork.image_hash = image_hash
+        artwork.image_url = f'/media/artworks/{image_hash}/original.{extension}'
+        db.session.commit()
+        image_pipeline.submit(artwork.id, image_hash, extension)
+        imported += 1
+    return {'imported': imported, 'failed': failed}
+
+@app.route('/api/artworks/<int:artwork_id>', methods=['DELETE'])
+@jwt_required()
+def delete_artwork(artwork_id):
+    try:
+        user_id = int(get_jwt_identity())
+        
+        artwork = Artwork.query.get(artwork_id)
+        if not artwork:
+            return jsonify({'error': 'Artwork not found'}), 404
+        
+        if artwork.user_id != user_id and not is_admin(User.query.get(user_id)):
+            return jsonify({'error': 'Only the owner can delete this artwork'}), 403
+        
+        has_bids = db.session.query(exists().where(Bid.artwork_id == artwork_id)).scalar()
+        # Journaled bids of this process may not be in the bid table yet
+        if has_bids or (app.config['BID_JOURNAL_ENABLED'] and get_bid_journal().latest_amount(artwork_id) is not None):
+            return jsonify({'error': 'Artworks with bids cannot be deleted, close the auction instead'}), 400
+        
+        Watch.query.filter_by(artwork_id=artwork_id).delete()
+        Notification.query.filter_by(artwork_id=artwork_id).update({Notification.artwork_id: None})
+        # The bid check is repeated in the delete itself, so a bid committed
+        # after the check above is never deleted along with the artwork
+        deleted = Artwork.query.filter(
+            Artwork.id == artwork_id,
+            Artwork.bid_version == artwork.bid_version,
+            ~exists().where(Bid.artwork_id == artwork_id)
+        ).delete(synchronize_session=False)
+        if not deleted:
+            db.session.rollback()
+            return jsonify({'error': 'A bid was placed on this artwork while it was being deleted'}), 409
+        db.session.add(AuctionTombstone(artwork_id=artwork_id, change_version=next_change_version()))
+        if artwork.artist_id:
+            record_artist_activity(artwork.artist_id, artworks=-1)
+        db.session.commit()
+        
+        order_book.invalidate(artwork_id)
+        facet_cache.clear()
+        suggest_index.remove('artwork', artwork_id)
+        pin_to_primary()
+        
+        return jsonify({'message': 'Artwork deleted successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Similar Artworks
+similar_index = SimilarIndex(app.config['SIMILAR_FOLDER'], bid_weight=app.config['SIMILAR_BID_WEIGHT'])
+similar_build_lock = threading.RLock()
+
+def artwork_text(artwork, specialty):
+    return (artwork.title, artwork.description, artwork.category, specialty)
+
+def build_similar_index():
+    """Rebuild the similar-artworks vectors from every artwork and bid"""
+    with similar_build_lock:
+        last_id = db.session.query(db.func.max(Artwork.id)).scalar() or 0
+        documents = db.session.query(Artwork.id, Artwork.title, Artwork.description, Artwork.category,
+                                     Artist.specialty)\
+                              .outerjoin(Artist, Artist.id == Artwork.artist_id)\
+                              .filter(Artwork.id <= last_id)\
+                              .order_by(Artwork.id)
+        bids = union(
+            select(Bid.artwork_id, Bid.user_id),
+            select(BidSummary.artwork_id, BidSummary.highest_bidder_id).where(BidSummary.highest_bidder_id.isnot(None))
+        )
+        result = similar_index.build(
+            ((artwork_id, fields) for artwork_id, *fields in documents.yield_per(10000)),
+            db.session.execute(bids)
+        )
+        
+        # Artworks created while the build was running went to the old generation
+        for artwork, specialty in db.session.query(Artwork, Artist.specialty)\
+                                            .outerjoin(Artist, Artist.id == Artwork.artist_id)\
+                                            .filter(Artwork.id > last_id):
+            similar_index.add(artwork.id, artwork_text(artwork, specialty))
+        return result
+
+def schedule_similar_build(delay=None):
+    if delay is None:
+        delay = app.config['SIMILAR_REBUILD_HOURS'] * 3600
+    slot = int((time.time() + delay) // 3600)
+    get_job_queue().enqueue('build-similar-index', delay=delay, priority=-10,
+                            idempotency_key=f'build-similar-index:{slot}')
+
+@job_queue.register('build-similar-index')
+def build_similar_index_job(payload):
+    try:
+        return build_similar_index()
+    finally:
+        schedule_similar_build()
+
+@app.cli.command('build-similar')
+def build_similar_command():
+    """Rebuild the similar-artworks index now."""
+    result = build_similar_index()
+    print(f"Indexed {result['artworks']} artworks and {result['bidders']} bidders in {result['seconds']}s")
+
+@app.route('/api/artworks/<int:artwork_id>/similar', methods=['GET'])
+@read_replica
+def get_similar_artworks(artwork_id):
+    try:
+        limit = min(request.args.get('limit', 8, type=int), 50)
+        
+        artwork = Artwork.query.get(artwork_id)
+        if not artwork:
+            return jsonify({'error': 'Artwork not found'}), 404
+        
+        if not similar_index.refresh():
+            # First use: a large catalog takes minutes to build, so it is left
+            # to a job worker (one build per hour slot, however many ask)
+            schedule_similar_build(delay=0)
+            return jsonify({'artwork_id': artwork_id, 'similar': [], 'building': True}), 200
+        
+        # Over-fetch, deleted artworks stay in the index until the next rebuild
+        matches = similar_index.similar(artwork_id, limit * 2)
+        scores = dict(matches)
+        rows = db.session.query(Artwork, Artist.name)\
+                         .outerjoin(Artist, Artist.id == Artwork.artist_id)\
+                         .filter(Artwork.id.in_(list(scores))).all()
+        rows.sort(key=lambda row: -scores[row[0].id])
+        
+        return jsonify({
+            'artwork_id': artwork_id,
+            'similar': [{
+                'id': similar.id,
+                'title': similar.title,
+                'category': similar.category,
+                'price': similar.price,
+                'image': artwork_image_url(similar, 320),
+                'artist': artist_name or 'Unknown Artist',
+                'status': similar.status,
+                'score': scores[similar.id]
+            } for similar, artist_name in rows[:limit]]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+facet_cache = FacetCache(ttl=app.config['FACET_CACHE_TTL'], max_entries=app.config['FACET_CACHE_MAX_ENTRIES'])
+
+def artwork_facet_info(artwork, artist_name):
+    return {
+        'category': artwork.category,
+        'price': artwork.price,
+        'artist_id': artwork.artist_id,
+        'artist_name': artist_name,
+        'title': artwork.title,
+        'description': artwork.description
+    }
+
+def compute_facets(category, search):
+    # Current price is the highest bid, or the starting price for lots without bids
+    highest = db.session.query(
+        Bid.artwork_id, db.func.max(Bid.amount).label('highest')
+    ).group_by(Bid.artwork_id).subquery()
+    current_price = db.func.coalesce(highest.c.highest, BidSummary.highest_bid, Artwork.price, 0)
+    band = db.case(
+        *[(current_price < high, name) for name, low, high in PRICE_BANDS if high is not None],
+        else_=PRICE_BANDS[-1][0]
+    )
+    
+    query = db.session.query(
+        Artwork.category, band, Artwork.artist_id, Artist.name, db.func.count(Artwork.id)
+    ).outerjoin(highest, highest.c.artwork_id == Artwork.id)\
+     .outerjoin(BidSummary, BidSummary.artwork_id == Artwork.id)\
+     .outerjoin(Artist, Artist.id == Artwork.artist_id)
+    
+    if category:
+        query = query.filter(Artwork.category == category)
+    
+    if search:
+        query = query.filter(
+            (Artwork.title.contains(search)) |
+            (Artwork.description.contains(search))
+        )
+    
+    facets = empty_facets()
+    for row in query.group_by(Artwork.category, band, Artwork.artist_id, Artist.name):
+        add_row(facets, *row)
+    return facets
+
+@app.route('/api/artworks/facets', methods=['GET'])
+def get_artwork_facets():
+    try:
+        category = request.args.get('category') or None
+        search = request.args.get('search') or None
+        artist_limit = request.args.get('artist_limit', 20, type=int)
+        
+        key = (category, search)
+        facets = facet_cache.get(key)
+        if facets is None:
+            facets = compute_facets(category, search)
+            facet_cache.put(key, facets)
+        
+        artists = sorted(facets['artist'].items(), key=lambda item: -item[1]['count'])
+        
+        return jsonify({
+            'total': facets['total'],
+            'facets': {
+                'category': [
+                    {'value': value, 'count': count}
+                    for value, count in sorted(facets['category'].items(), key=lambda item: -item[1])
+                ],
+                'price_band': [
+                    {'value': name, 'count': facets['price_band'].get(name, 0)}
+                    for name, low, high in PRICE_BANDS
+                ],
+                'artist': [
+                    {'id': artist_id, 'name': artist['name'] or 'Unknown Artist', 'count': artist['count']}
+                    for artist_id, artist in artists[:artist_limit]
+                ]
+            },
+            'filters': {'category': category, 'search': search}
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Artist Routes
+# Each ordering matches one of the indexes on Artist
+ARTIST_SORTS = {
+    'featured': (artist_table.c.featured.desc(), artist_table.c.artwork_count.desc(), artist_table.c.id.desc()),
+    'popular': (artist_table.c.total_sales.desc(), artist_table.c.artwork_count.desc(), artist_table.c.id.desc()),
+    'recent': (artist_table.c.last_activity_at.desc(), artist_table.c.id.desc())
+}
+
+def artist_json(artist):
+    return {
+        'id': artist.id,
+        'name': artist.name,
+        'bio': artist.bio,
+        'specialty': artist.specialty,
+        'image': artist.profile_image,
+        'works': artist.artwork_count,
+        'total_sales': artist.total_sales,
+        'featured': artist.featured,
+        'last_activity_at': artist.last_activity_at.isoformat() if artist.last_activity_at else None,
+        'created_at': artist.created_at.isoformat()
+    }
+
+def record_artist_activity(artist_id, artworks=0, sales=0):
+    """Adjust an artist's counters in the current transaction"""
+    # Applied as SQL increments so concurrent requests cannot lose updates
+    values = {
+        Artist.artwork_count: Artist.artwork_count + artworks,
+        Artist.total_sales: Artist.total_sales + sales
+    }
+    if artworks > 0 or sales:
+        values[Artist.last_activity_at] = datetime.utcnow()
+    Artist.query.filter_by(id=artist_id).update(values, synchronize_session=False)
+
+def recount_artist_stats():
+    """Recompute every artist's counters from artworks and closed lots"""
+    counts = dict(db.session.query(Artwork.artist_id, db.func.count(Artwork.id)).group_by(Artwork.artist_id))
+    sales = {}
+    for artwork in Artwork.query.filter(Artwork.status == 'closed', Artwork.artist_id.isnot(None)):
+        lot = get_lot(artwork)
+        if lot.leader:
+            sales[artwork.artist_id] = sales.get(artwork.artist_id, 0) + lot.highest_bid
+    last_activity = dict(
+        db.session.query(Artwork.artist_id, db.func.max(db.func.coalesce(Artwork.closed_at, Artwork.created_at)))
+                  .group_by(Artwork.artist_id)
+    )
+    artists = Artist.query.all()
+    for artist in artists:
+        artist.artwork_count = counts.get(artist.id, 0)
+        artist.total_sales = sales.get(artist.id, 0)
+        artist.last_activity_at = max(filter(None, (artist.created_at, last_activity.get(artist.id))), default=None)
+    db.session.commit()
+    return len(artists)
+
+@app.cli.command('recount-artists')
+def recount_artists_command():
+    """Rebuild artist artwork counts, sales totals and last activity."""
+    print(f'Recounted {recount_artist_stats()} artists')
+
 @app.route('/api/artists', methods=['GET'])
+@coalesced
+@read_replica
 def get_artists():
     try:
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 12, type=int)
         search = request.args.get('search')
+        sort = request.args.get('sort', 'featured')
         
-        query = Artist.query
+        if sort not in ARTIST_SORTS:
+            return jsonify({'error': f"sort must be one of: {', '.join(ARTIST_SORTS)}"}), 400
+        
+        statement = artist_rows()
         
         if search:
-            query = query.filter(
-                (Artist.name.contains(search)) |
-                (Artist.bio.contains(search)) |
-                (Artist.specialty.contains(search))
+            statement = statement.where(
+                (artist_table.c.name.contains(search)) |
+                (artist_table.c.bio.contains(search)) |
+                (artist_table.c.specialty.contains(search))
             )
         
-        artists = query.paginate(page=page, per_page=per_page, error_out=False)
-        
-        artist_list = []
-        for artist in artists.items:
-            artwork_count = Artwork.query.filter_by(artist_id=artist.id).count()
-            
-            artist_list.append({
-                'id': artist.id,
-                'name': artist.name,
-                'bio': artist.bio,
-                'specialty': artist.specialty,
-                'image': artist.profile_image,
-                'works': artwork_count,
-                'featured': artist.featured,
-                'created_at': artist.created_at.isoformat()
-            })
+        artists, pagination = paginate(db.session, statement.order_by(*ARTIST_SORTS[sort]), ArtistRow, page, per_page)
         
         return jsonify({
-            'artists': artist_list,
-            'pagination': {
-                'page': artists.page,
-                'pages': artists.pages,
-                'per_page': artists.per_page,
-                'total': artists.total
-            }
+            'artists': [artist_json(artist) for artist in artists],
+            'pagination': pagination
         }), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 # Auction Routes (simplified)
+def auction_end_time(artwork):
+    # Lots without an end time keep the rolling 24 hour placeholder
+    return artwork.ends_at or datetime.utcnow() + timedelta(hours=24)
+
+def auction_time_remaining(artwork):
+    end_time = auction_end_time(artwork)
+    remaining = max(0, int((end_time - datetime.utcnow()).total_seconds())) if artwork.status == 'live' else 0
+    return f'{remaining // 3600:02d}:{remaining % 3600 // 60:02d}:{remaining % 60:02d}'
+
+def auction_json(artwork, artist_name):
+    # Get real bid data from the order book
+    lot = get_lot(artwork)
+    end_time = auction_end_time(artwork)
+    
+    # Convert artwork to auction format
+    return {
+        'id': artwork.id,
+        'artwork': {
+            'id': artwork.id,
+            'title': artwork.title,
+            'artist': artist_name,
+            'image': artwork_image_url(artwork),
+            'image_blurhash': artwork.image_blurhash,
+            'category': artwork.category,
+            'description': artwork.description
+        },
+        'starting_bid': artwork.price,
+        'current_bid': lot.current_price,
+        'status': artwork.status,
+        'end_time': end_time.isoformat(),
+        'bid_count': lot.bid_count,
+        'time_remaining': auction_time_remaining(artwork),
+        'version': artwork.change_version
+    }
+
+LOT_COLUMNS = ('id', 'price', 'bid_version')  # What get_lot reads
+
+AUCTION_FIELDS = FieldSet({
+    'id': (('id',), lambda artwork, options: artwork.id),
+    'artwork.id': (('id',), lambda artwork, options: artwork.id),
+    'artwork.title': (('title',), lambda artwork, options: artwork.title),
+    'artwork.artist': (('artist_name',), lambda artwork, options: artwork.artist_name or 'Unknown Artist'),
+    'artwork.image': (('image_url', 'image_hash', 'image_variants'), lambda artwork, options: artwork_image_url(artwork)),
+    'artwork.image_blurhash': (('image_blurhash',), lambda artwork, options: artwork.image_blurhash),
+    'artwork.category': (('category',), lambda artwork, options: artwork.category),
+    'artwork.description': (('description',), lambda artwork, options: artwork.description),
+    'starting_bid': (('price',), lambda artwork, options: artwork.price),
+    'current_bid': (LOT_COLUMNS, lambda artwork, options: get_lot(artwork).current_price),
+    'status': (('status',), lambda artwork, options: artwork.status),
+    'end_time': (('ends_at',), lambda artwork, options: auction_end_time(artwork).isoformat()),
+    'bid_count': (LOT_COLUMNS, lambda artwork, options: get_lot(artwork).bid_count),
+    'time_remaining': (('ends_at', 'status'), lambda artwork, options: auction_time_remaining(artwork)),
+    'version': (('change_version',), lambda artwork, options: artwork.change_version),
+}, views={
+    'card': ('id', 'artwork.title', 'artwork.artist', 'artwork.image', 'artwork.image_blurhash', 'artwork.category',
+             'current_bid', 'status', 'end_time', 'bid_count', 'time_remaining', 'version'),
+})
+
 @app.route('/api/auctions', methods=['GET'])
+@coalesced
 def get_auctions():
     try:
-        # Get all artworks and convert them to auctions
-        artworks = Artwork.query.all()
+        projection = AUCTION_FIELDS.projection(request.args.get('fields'), request.args.get('view'))
         
-        auctions = []
-        for artwork in artworks:
-            # Get artist name
-            artist_name = "Unknown Artist"
-            if artwork.artist_id:
-                artist = Artist.query.get(artwork.artist_id)
-                if artist:
-                    artist_name = artist.name
-            
-            # Get real bid data
-            highest_bid = db.session.query(db.func.max(Bid.amount)).filter_by(artwork_id=artwork.id).scalar()
-            bid_count = Bid.query.filter_by(artwork_id=artwork.id).count()
-            current_bid = highest_bid if highest_bid else artwork.price
-            
-            # Convert artwork to auction format
-            auction = {
-                'id': artwork.id,
-                'artwork': {
-                    'id': artwork.id,
-                    'title': artwork.title,
-                    'artist': artist_name,
-                    'image': artwork.image_url,
-                    'category': artwork.category,
-                    'description': artwork.description
-                },
-                'starting_bid': artwork.price,
-                'current_bid': current_bid,
-                'status': 'live',  # All auctions are live for now
-                'end_time': (datetime.utcnow() + timedelta(hours=24)).isoformat(),  # 24 hours from now
-                'bid_count': bid_count,
-                'time_remaining': '23:59:59'
-            }
-            auctions.append(auction)
+        # Get all artworks and convert them to auctions
+        auctions = [projection.render(artwork)
+                    for artwork in fetch(db.session, artwork_rows(AuctionRow, projection.columns), AuctionRow)]
         
         return jsonify({
             'auctions': auctions,
@@ -519,12 +2388,144 @@ def get_auctions():
             }
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def parse_changes_cursor(cursor):
+    # "<version>.<kind>.<id>" of the last change sent: kind 0 is a lot, 1 a
+    # tombstone and 9 means everything up to and including the version
+    version, kind, item_id = (int(part) for part in cursor.split('.'))
+    return version, kind, item_id
+
+@app.route('/api/auctions/changes', methods=['GET'])
+@read_replica
+def get_auction_changes():
+    try:
+        if request.args.get('cursor'):
+            try:
+                version, kind, item_id = parse_changes_cursor(request.args['cursor'])
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        else:
+            # Without since, every lot is sent (paged the same way) to seed the client
+            version, kind, item_id = request.args.get('since', -1, type=int), 9, 0
+        limit = min(request.args.get('limit', app.config['AUCTION_CHANGES_PAGE_SIZE'], type=int),
+                    app.config['AUCTION_CHANGES_PAGE_SIZE'])
+        
+        # Read before the changes: anything committed after this has a higher version
+        latest = db.session.query(ChangeCounter.value).filter_by(id=1).scalar() or 0
+        
+        if kind == 0:
+            artwork_filter = db.or_(Artwork.change_version > version,
+                                    db.and_(Artwork.change_version == version, Artwork.id > item_id))
+            tombstone_filter = AuctionTombstone.change_version >= version
+        elif kind == 1:
+            artwork_filter = Artwork.change_version > version
+            tombstone_filter = db.or_(AuctionTombstone.change_version > version,
+                                      db.and_(AuctionTombstone.change_version == version,
+                                              AuctionTombstone.artwork_id > item_id))
+        else:
+            artwork_filter = Artwork.change_version > version
+            tombstone_filter = AuctionTombstone.change_version > version
+        
+        rows = db.session.query(Artwork, Artist.name)\
+                         .outerjoin(Artist, Artist.id == Artwork.artist_id)\
+                         .filter(artwork_filter)\
+                         .order_by(Artwork.change_version, Artwork.id)\
+                         .limit(limit + 1)\
+                         .all()
+        tombstones = AuctionTombstone.query.filter(tombstone_filter)\
+                                           .order_by(AuctionTombstone.change_version, AuctionTombstone.artwork_id)\
+                                           .limit(limit + 1)\
+                                           .all()
+        
+        # Merge both streams in (version, kind, id) order and cut the page there
+        changes = [((artwork.change_version, 0, artwork.id), artwork, artist_name) for artwork, artist_name in rows]
+        changes += [((tombstone.change_version, 1, tombstone.artwork_id), tombstone, None) for tombstone in tombstones]
+        changes.sort(key=lambda change: change[0])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        
+        auctions, removed = [], []
+        for key, item, artist_name in changes:
+            if key[1] == 1:
+                removed.append({'id': item.artwork_id, 'version': key[0]})
+            else:
+                auctions.append(auction_json(item, artist_name or 'Unknown Artist'))
+        
+        if has_more:
+            cursor = '.'.join(str(part) for part in changes[-1][0])
+        else:
+            cursor = f'{max(latest, changes[-1][0][0] if changes else version)}.9.0'
+        
+        return jsonify({
+            'auctions': auctions,
+            'removed': removed,
+            'cursor': cursor,
+            'has_more': has_more
+        }), 200
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/auctions/<int:artwork_id>/close', methods=['POST'])
+@jwt_required()
+def close_auction(artwork_id):
+    try:
+        user_id = int(get_jwt_identity())
+        user = User.query.get(user_id)
+        
+        artwork = Artwork.query.get(artwork_id)
+        if not artwork:
+            return jsonify({'error': 'Artwork not found'}), 404
+        
+        if artwork.user_id != user_id and not is_admin(user):
+            return jsonify({'error': 'Only the owner can close this auction'}), 403
+        
+        if artwork.status == 'closed':
+            return jsonify({'error': 'Auction is already closed'}), 400
+        
+        lot = close_lot(artwork)
+        return jsonify({
+            'message': 'Auction closed successfully',
+            'auction': {
+                'id': artwork.id,
+                'status': artwork.status,
+                'closed_at': artwork.closed_at.isoformat(),
+                'winning_bid': lot.highest_bid,
+                'winner_id': lot.leader[1] if lot.leader else None,
+                'bid_count': lot.bid_count
+            }
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+def close_lot(artwork):
+    lot = get_lot(artwork)
+    artwork.status = 'closed'
+    artwork.closed_at = datetime.utcnow()
+    artwork.updated_at = artwork.closed_at
+    artwork.change_version = next_change_version()
+    if lot.leader and artwork.artist_id:
+        record_artist_activity(artwork.artist_id, sales=lot.highest_bid)
+    db.session.commit()
+    
+    publish_notification('closed', artwork.id, title=artwork.title, amount=lot.highest_bid,
+                         winner_id=lot.leader[1] if lot.leader else None)
+    return lot
+
+def notify_bid(artwork, previous_leader, user_id, amount):
+    publish_notification('bid', artwork.id, bidder_id=user_id, previous_leader=previous_leader,
+                         title=artwork.title, amount=amount)
+
 # Bidding Routes
 @app.route('/api/bids/', methods=['POST'])
 @jwt_required()
+@idempotent
 def place_bid():
     try:
         user_id = int(get_jwt_identity())
@@ -555,24 +2556,60 @@ def place_bid():
         if artwork.user_id == user_id:
             return jsonify({'error': 'You cannot bid on your own artwork'}), 400
         
-        # Get current highest bid
-        highest_bid = db.session.query(db.func.max(Bid.amount)).filter_by(artwork_id=artwork_id).scalar()
-        minimum_bid = max(artwork.price, (highest_bid or 0) + 50)
+        if artwork.status == 'closed':
+            return jsonify({'error': 'This auction has closed'}), 400
         
-        # Validate bid amount
-        if amount < minimum_bid:
-            return jsonify({'error': f'Minimum bid is ${minimum_bid:,.2f}'}), 400
+        # The deadline scan only closes lots once a minute
+        if artwork.ends_at and artwork.ends_at <= datetime.utcnow():
+            return jsonify({'error': 'This auction has ended'}), 400
         
-        # Create new bid
-        bid = Bid(
-            amount=amount,
-            artwork_id=artwork_id,
-            user_id=user_id
-        )
+        if app.config['LOT_ACTORS_ENABLED']:
+            return place_actor_bid(user_id, artwork_id, amount)
+        
+        for attempt in range(3):
+            # Get current highest bid from the order book
+            lot = get_lot(artwork)
+            minimum_bid = order_book.minimum_bid(lot)
+            
+            # Validate bid amount
+            if amount < minimum_bid:
+                return jsonify({'error': f'Minimum bid is ${minimum_bid:,.2f}'}), 400
+            
+            previous_price = lot.current_price
+            previous_leader = lot.leader[1] if lot.leader else None
+            
+            if app.config['BID_JOURNAL_ENABLED']:
+                return place_journaled_bid(user_id, artwork, lot, amount, minimum_bid)
+            
+            # Create new bid
+            bid = Bid(
+                amount=amount,
+                artwork_id=artwork_id,
+                user_id=user_id
+            )
+            db.session.add(bid)
+            
+            # Claim the version the bid was validated against; if another worker
+            # got there first, reload the lot and validate again
+            claimed = Artwork.query.filter_by(id=artwork_id, bid_version=lot.version).update(
+                {Artwork.bid_version: Artwork.bid_version + 1, Artwork.updated_at: datetime.utcnow()},
+                synchronize_session=False
+            )
+            if claimed:
+                mark_changed([artwork_id])
+                break
+            db.session.rollback()
+        else:
+            return jsonify({'error': 'Bidding is very active on this artwork, please try again'}), 409
         
-        db.session.add(bid)
         db.session.commit()
         
+        order_book.record_bid(artwork_id, (bid.id, user_id, amount, bid.created_at), lot.version + 1)
+        facet_cache.price_changed(artwork_facet_info(artwork, None), previous_price, amount)
+        notify_bid(artwork, previous_leader, user_id, amount)
+        watch_bid(artwork, user_id, amount, previous_leader)
+        pin_to_primary()
+        
         return jsonify({
             'message': 'Bid placed successfully',
             'bid': {
@@ -590,32 +2627,94 @@ def place_bid():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def place_journaled_bid(user_id, artwork, lot, amount, minimum_bid):
+    # Bids accepted by the journal may not be in the database yet, so the
+    # minimum is re-checked against them atomically with the append
+    def check_minimum(journaled_amount):
+        journaled_amount = journaled_amount or 0
+        required = max(minimum_bid, journaled_amount + order_book.increment_for(journaled_amount))
+        if amount < required:
+            raise BidRejected(f'Minimum bid is ${required:,.2f}')
+    
+    artwork_id = artwork.id
+    created_at = datetime.utcnow()
+    try:
+        seq = get_bid_journal().append({
+            'amount': amount,
+            'artwork_id': artwork_id,
+            'user_id': user_id,
+            'created_at': created_at.isoformat()
+        }, check=check_minimum)
+    except BidRejected as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Applying the journal bumps bid_version, which reloads the lot from the table
+    previous_price = lot.current_price
+    previous_leader = lot.leader[1] if lot.leader else None
+    order_book.record_bid(artwork_id, (None, user_id, amount, created_at), lot.version, previous=lot.version)
+    facet_cache.price_changed(artwork_facet_info(artwork, None), previous_price, amount)
+    notify_bid(artwork, previous_leader, user_id, amount)
+    watch_bid(artwork, user_id, amount, previous_leader)
+    pin_to_primary()
+    
+    return jsonify({
+        'message': 'Bid placed successfully',
+        'bid': {
+            'id': None,
+            'journal_seq': seq,
+            'amount': amount,
+            'artwork_id': artwork_id,
+            'user_id': user_id,
+            'created_at': created_at.isoformat()
+        }
+    }), 202
+
 @app.route('/api/bids/artwork/<int:artwork_id>', methods=['GET'])
+@coalesced
+@read_replica
 def get_artwork_bids(artwork_id):
     try:
         # Get artwork to verify it exists
-        artwork = Artwork.query.get(artwork_id)
-        if not artwork:
+        starting_price = db.session.execute(
+            select(artwork_table.c.price).where(artwork_table.c.id == artwork_id)
+        ).first()
+        if not starting_price:
             return jsonify({'error': 'Artwork not found'}), 404
         
-        # Get all bids for this artwork, ordered by amount (highest first)
-        bids = Bid.query.filter_by(artwork_id=artwork_id)\
-                       .order_by(Bid.amount.desc(), Bid.created_at.desc())\
-                       .all()
+        include_archived = request.args.get('include_archived', 'true').lower() != 'false'
         
-        bid_list = []
-        for bid in bids:
-            bid_list.append({
-                'id': bid.id,
-                'amount': bid.amount,
-                'bidder_name': bid.user.username,
-                'created_at': bid.created_at.isoformat()
-            })
+        # Get all bids for this artwork, ordered by amount (highest first)
+        bids = fetch(db.session, select(bid_table.c.id, bid_table.c.amount, bid_table.c.created_at, user_table.c.username)
+                                 .join(user_table, user_table.c.id == bid_table.c.user_id)
+                                 .where(bid_table.c.artwork_id == artwork_id)
+                                 .order_by(bid_table.c.amount.desc(), bid_table.c.created_at.desc()), BidRow)
+        
+        bid_list = [{
+            'id': bid.id,
+            'amount': bid.amount,
+            'bidder_name': bid.bidder_name,
+            'created_at': bid.created_at.isoformat()
+        } for bid in bids]
+        
+        summary = BidSummary.query.get(artwork_id) if include_archived else None
+        if summary:
+            archived = bid_archive.find(summary.months.split(','), artwork_id=artwork_id)
+            usernames = dict(db.session.query(User.id, User.username)
+                                       .filter(User.id.in_({record['user_id'] for record in archived})))
+            for record in archived:
+                bid_list.append({
+                    'id': record['id'],
+                    'amount': record['amount'],
+                    'bidder_name': usernames.get(record['user_id'], 'Unknown'),
+                    'created_at': record['created_at'],
+                    'archived': True
+                })
+            bid_list.sort(key=lambda item: (item['amount'], item['created_at']), reverse=True)
         
         return jsonify({
             'bids': bid_list,
             'total_bids': len(bid_list),
-            'highest_bid': bid_list[0]['amount'] if bid_list else artwork.price
+            'highest_bid': bid_list[0]['amount'] if bid_list else starting_price[0]
         }), 200
         
     except Exception as e:
@@ -631,6 +2730,8 @@ def get_user_bids():
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
+        include_archived = request.args.get('include_archived', 'false').lower() == 'true'
+        
         # Get all bids by this user
         bids = Bid.query.filter_by(user_id=user_id)\
                        .order_by(Bid.created_at.desc())\
@@ -646,8 +2747,7 @@ def get_user_bids():
                     artist_name = artist.name
             
             # Check if this is the highest bid
-            highest_bid = db.session.query(db.func.max(Bid.amount)).filter_by(artwork_id=bid.artwork_id).scalar()
-            is_winning = (bid.amount == highest_bid)
+            is_winning = (bid.amount == get_lot(bid.artwork).highest_bid)
             
             bid_list.append({
                 'id': bid.id,
@@ -662,6 +2762,10 @@ def get_user_bids():
                 'created_at': bid.created_at.isoformat()
             })
         
+        if include_archived:
+            bid_list.extend(archived_user_bids(user_id))
+            bid_list.sort(key=lambda item: item['created_at'], reverse=True)
+        
         return jsonify({
             'bids': bid_list,
             'total_bids': len(bid_list)
@@ -670,11 +2774,602 @@ def get_user_bids():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def archived_user_bids(user_id):
+    months = [month for (month,) in db.session.query(ArchivedBidMonth.month).filter_by(user_id=user_id)]
+    records = bid_archive.find(months, user_id=user_id)
+    if not records:
+        return []
+    
+    artworks = {artwork.id: artwork for artwork in Artwork.query.filter(Artwork.id.in_({r['artwork_id'] for r in records}))}
+    artist_names = dict(db.session.query(Artist.id, Artist.name)
+                                  .filter(Artist.id.in_({a.artist_id for a in artworks.values() if a.artist_id})))
+    
+    bid_list = []
+    for record in records:
+        artwork = artworks.get(record['artwork_id'])
+        if not artwork:
+            continue
+        bid_list.append({
+            'id': record['id'],
+            'amount': record['amount'],
+            'artwork': {
+                'id': artwork.id,
+                'title': artwork.title,
+                'artist': artist_names.get(artwork.artist_id, 'Unknown Artist'),
+                'image': artwork.image_url
+            },
+            'is_winning': record['amount'] == get_lot(artwork).highest_bid,
+            'created_at': record['created_at'],
+            'archived': True
+        })
+    return bid_list
+
+# Bid Archival
+bid_archive = BidArchive(app.config['BID_ARCHIVE_FOLDER'])
+
+def archive_closed_bids(older_than_days=None, batch_size=100):
+    """Move bids of auctions closed before the cutoff from the bid table into the archive"""
+    if older_than_days is None:
+        older_than_days = app.config['BID_ARCHIVE_AFTER_DAYS']
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    
+    artwork_ids = [artwork_id for (artwork_id,) in db.session.query(Artwork.id).filter(
+        Artwork.status == 'closed',
+        Artwork.closed_at <= cutoff,
+        Artwork.bids.any()
+    )]
+    
+    archived_bids = 0
+    for start in range(0, len(artwork_ids), batch_size):
+        batch_ids = artwork_ids[start:start + batch_size]
+        bids = Bid.query.filter(Bid.artwork_id.in_(batch_ids)).order_by(Bid.id).all()
+        
+        # Files first: a crash before the commit below only leaves duplicates,
+        # which readers drop by bid id
+        by_month = {}
+        for bid in bids:
+            by_month.setdefault(bid.created_at.strftime('%Y-%m'), []).append({
+                'id': bid.id,
+                'artwork_id': bid.artwork_id,
+                'user_id': bid.user_id,
+                'amount': bid.amount,
+                'created_at': bid.created_at.isoformat()
+            })
+        for month, records in by_month.items():
+            bid_archive.append(month, records)
+        
+        user_months = set()
+        for bid in bids:
+            month = bid.created_at.strftime('%Y-%m')
+            user_months.add((bid.user_id, month))
+            
+            summary = BidSummary.query.get(bid.artwork_id)
+            if summary is None:
+                summary = BidSummary(artwork_id=bid.artwork_id, bid_count=0, months='')
+                db.session.add(summary)
+            summary.bid_count += 1
+            if summary.highest_bid is None or bid.amount > summary.highest_bid:
+                summary.highest_bid = bid.amount
+                summary.highest_bidder_id = bid.user_id
+            summary.first_bid_at = min(filter(None, [summary.first_bid_at, bid.created_at]))
+            summary.last_bid_at = max(filter(None, [summary.last_bid_at, bid.created_at]))
+            months = set(filter(None, summary.months.split(',')))
+            if month not in months:
+                summary.months = ','.join(sorted(months | {month}))
+            summary.archived_at = datetime.utcnow()
+        
+        existing = set(db.session.query(ArchivedBidMonth.user_id, ArchivedBidMonth.month).filter(
+            ArchivedBidMonth.user_id.in_({user_id for user_id, month in user_months})
+        ))
+        db.session.add_all([
+            ArchivedBidMonth(user_id=user_id, month=month)
+            for user_id, month in user_months - {tuple(row) for row in existing}
+        ])
+        
+        Bid.query.filter(Bid.id.in_([bid.id for bid in bids])).delete(synchronize_session=False)
+        Artwork.query.filter(Artwork.id.in_(batch_ids)).update(
+            {Artwork.bid_version: Artwork.bid_version + 1}, synchronize_session=False
+        )
+        db.session.commit()
+        db.session.expunge_all()
+        archived_bids += len(bids)
+    
+    return {'artworks': len(artwork_ids), 'bids': archived_bids}
+
+@app.route('/api/admin/archive-bids', methods=['POST'])
+@admin_required
+def archive_bids():
+    try:
+        data = request.get_json(silent=True) or {}
+        result = archive_closed_bids(data.get('older_than_days'))
+        return jsonify({'message': 'Bids archived successfully', **result}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.cli.command('archive-bids')
+def archive_bids_command():
+    """Archive bids of auctions closed more than BID_ARCHIVE_AFTER_DAYS ago."""
+    result = archive_closed_bids()
+    print(f"Archived {result['bids']} bids from {result['artworks']} closed auctions")
+
+# Admin Analytics
+ANALYTICS_GRAINS = {'hour': timedelta(hours=1), 'day': timedelta(days=1)}
+ANALYTICS_METRICS = ('bids', 'bidders', 'new_lots', 'lots_closed', 'lots_sold', 'gmv')
+
+def bucket_start(moment, grain):
+    return moment.replace(minute=0, second=0, microsecond=0) if grain == 'hour' \
+        else moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def rollup_bucket(grain, start):
+    """Recompute one hour or day of rollups from bids and artworks"""
+    end = start + ANALYTICS_GRAINS[grain]
+    rows = {}
+    
+    def add(dimension, key, **metrics):
+        row = rows.setdefault((dimension, '' if key is None else str(key)), dict.fromkeys(ANALYTICS_METRICS, 0))
+        for name, value in metrics.items():
+            row[name] += value or 0
+    
+    in_bucket = Bid.query.filter(Bid.created_at >= start, Bid.created_at < end)
+    bids, bidders = db.func.count(Bid.id), db.func.count(db.distinct(Bid.user_id))
+    for count, distinct in in_bucket.with_entities(bids, bidders):
+        if count:
+            add('all', '', bids=count, bidders=distinct)
+    for group in (Artwork.category, Artwork.artist_id):
+        dimension = 'category' if group is Artwork.category else 'artist'
+        for key, count, distinct in in_bucket.join(Artwork, Artwork.id == Bid.artwork_id)\
+                                             .with_entities(group, bids, bidders).group_by(group):
+            add(dimension, key, bids=count, bidders=distinct)
+    
+    for category, artist_id in db.session.query(Artwork.category, Artwork.artist_id)\
+                                         .filter(Artwork.created_at >= start, Artwork.created_at < end):
+        for dimension, key in (('all', ''), ('category', category), ('artist', artist_id)):
+            add(dimension, key, new_lots=1)
+    
+    # Winning bid of each lot closed in the bucket only, looked up per lot
+    # through ix_bid_artwork_amount rather than grouping the whole bid table
+    winning = db.session.query(db.func.max(Bid.amount))\
+                        .filter(Bid.artwork_id == Artwork.id)\
+                        .correlate(Artwork).scalar_subquery()
+    closed = db.session.query(Artwork.category, Artwork.artist_id,
+                              db.func.coalesce(winning, BidSummary.highest_bid))\
+                       .outerjoin(BidSummary, BidSummary.artwork_id == Artwork.id)\
+                       .filter(Artwork.closed_at >= start, Artwork.closed_at < end)
+    for category, artist_id, amount in closed:
+        for dimension, key in (('all', ''), ('category', category), ('artist', artist_id)):
+            add(dimension, key, lots_closed=1, lots_sold=1 if amount else 0, gmv=amount)
+    
+    AnalyticsRollup.query.filter_by(grain=grain, bucket=start).delete()
+    db.session.add_all([
+        AnalyticsRollup(grain=grain, bucket=start, dimension=dimension, key=key, **metrics)
+        for (dimension, key), metrics in rows.items()
+    ])
+
+def rollup_analytics():
+    """Bring the rollups up to date, a bounded number of hours at a time"""
+    watermark = AnalyticsWatermark.query.get(1)
+    if watermark is None:
+        watermark = AnalyticsWatermark(id=1)
+        db.session.add(watermark)
+    
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config['ANALYTICS_SETTLE_SECONDS'])
+    since = watermark.rolled_up_to
+    if since is None:
+        # First run: backfill from the earliest activity still in the tables
+        firsts = [db.session.query(db.func.min(Bid.created_at)).scalar(),
+                  db.session.query(db.func.min(Artwork.created_at)).scalar()]
+        since = min(filter(None, firsts), default=cutoff)
+    
+    # Hours touched since the last run; the hour holding the watermark is
+    # redone because it may have been partial
+    hours = []
+    hour = bucket_start(since, 'hour')
+    while hour <= cutoff and len(hours) < app.config['ANALYTICS_MAX_HOURS_PER_RUN']:
+        hours.append(hour)
+        hour += ANALYTICS_GRAINS['hour']
+    caught_up = hour > cutoff
+    
+    for hour in hours:
+        rollup_bucket('hour', hour)
+    for day in sorted({bucket_start(hour, 'day') for hour in hours}):
+        rollup_bucket('day', day)
+    
+    watermark.rolled_up_to = cutoff if caught_up else hours[-1] + ANALYTICS_GRAINS['hour']
+    db.session.commit()
+    return {'hours': len(hours), 'rolled_up_to': watermark.rolled_up_to.isoformat(), 'caught_up': caught_up}
+
+def schedule_analytics_rollup(delay=None, key=None):
+    if delay is None:
+        delay = app.config['ANALYTICS_ROLLUP_SECONDS']
+    slot = key or int((time.time() + delay) // app.config['ANALYTICS_ROLLUP_SECONDS'])
+    get_job_queue().enqueue('rollup-analytics', delay=delay,
+                            idempotency_key=f'rollup-analytics:{slot}')
+
+@job_queue.register('rollup-analytics')
+def rollup_analytics_job(payload):
+    result = None
+    try:
+        result = rollup_analytics()
+        return result
+    finally:
+        if result and not result['caught_up']:
+            # Keep backfilling without a pause, keyed by progress so it is queued once
+            schedule_analytics_rollup(delay=0, key=result['rolled_up_to'])
+        else:
+            schedule_analytics_rollup()
+
+@app.route('/api/admin/analytics', methods=['GET'])
+@admin_required
+def get_analytics():
+    try:
+        grain = request.args.get('grain', 'day')
+        dimension = request.args.get('dimension', 'all')
+        key = request.args.get('key')
+        
+        if grain not in ANALYTICS_GRAINS:
+            return jsonify({'error': 'grain must be hour or day'}), 400
+        if dimension not in ('all', 'category', 'artist'):
+            return jsonify({'error': 'dimension must be all, category or artist'}), 400
+        
+        try:
+            end = datetime.fromisoformat(request.args['to']) if request.args.get('to') else datetime.utcnow()
+            start = datetime.fromisoformat(request.args['from']) if request.args.get('from') \
+                else end - (timedelta(days=2) if grain == 'hour' else timedelta(days=30))
+        except ValueError:
+            return jsonify({'error': 'from and to must be ISO dates'}), 400
+        
+        # Per-bucket series are long for every artist over a year, so by
+        # default they come only for one key or the overall numbers
+        include_series = request.args.get('series', str(dimension == 'all' or key is not None)).lower() == 'true'
+        
+        query = AnalyticsRollup.query.filter(
+            AnalyticsRollup.grain == grain,
+            AnalyticsRollup.dimension == dimension,
+            AnalyticsRollup.bucket >= bucket_start(start, grain),
+            AnalyticsRollup.bucket <= end
+        )
+        if key is not None:
+            query = query.filter(AnalyticsRollup.key == key)
+        
+        def sell_through(metrics):
+            return round(metrics['lots_sold'] / metrics['lots_closed'], 4) if metrics['lots_closed'] else None
+        
+        series = []
+        if include_series:
+            columns = [getattr(AnalyticsRollup, name) for name in ANALYTICS_METRICS]
+            for bucket, row_key, *values in query.with_entities(AnalyticsRollup.bucket, AnalyticsRollup.key, *columns)\
+                                                 .order_by(AnalyticsRollup.bucket, AnalyticsRollup.key):
+                metrics = dict(zip(ANALYTICS_METRICS, values))
+                series.append({'bucket': bucket.isoformat(), 'key': row_key, **metrics,
+                               'sell_through': sell_through(metrics)})
+        
+        # Distinct bidders do not add up across buckets, so totals leave them out
+        summed = [name for name in ANALYTICS_METRICS if name != 'bidders']
+        totals = {
+            row_key: dict(zip(summed, values))
+            for row_key, *values in query.with_entities(
+                AnalyticsRollup.key, *[db.func.sum(getattr(AnalyticsRollup, name)) for name in summed]
+            ).group_by(AnalyticsRollup.key)
+        }
+        
+        names = {}
+        if dimension == 'artist':
+            artist_ids = {int(total_key) for total_key in totals if total_key.isdigit()}
+            names = {str(artist_id): name for artist_id, name in
+                     db.session.query(Artist.id, Artist.name).filter(Artist.id.in_(artist_ids))}
+        
+        watermark = AnalyticsWatermark.query.get(1)
+        if watermark is None or watermark.rolled_up_to is None or \
+                watermark.rolled_up_to < datetime.utcnow() - timedelta(seconds=3 * app.config['ANALYTICS_ROLLUP_SECONDS']):
+            schedule_analytics_rollup(delay=0)
+        
+        return jsonify({
+            'grain': grain,
+            'dimension': dimension,
+            'from': bucket_start(start, grain).isoformat(),
+            'to': end.isoformat(),
+            'rolled_up_to': watermark.rolled_up_to.isoformat() if watermark and watermark.rolled_up_to else None,
+            'series': series,
+            'totals': [{
+                'key': total_key,
+                'name': names.get(total_key, total_key) if dimension == 'artist' else total_key,
+                **total,
+                'gmv': round(total['gmv'] or 0, 2),
+                'sell_through': sell_through(total)
+            } for total_key, total in sorted(totals.items(), key=lambda item: -item[1]['gmv'])]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.cli.command('rollup-analytics')
+def rollup_analytics_command():
+    """Bring the analytics rollups up to date (backfills on the first run)."""
+    while True:
+        result = rollup_analytics()
+        print(f"Rolled up {result['hours']} hours up to {result['rolled_up_to']}")
+        if result['caught_up']:
+            break
+
+# Bid Watch (shill-bid detection)
+BID_FLAG_STATUSES = ('open', 'confirmed', 'dismissed')
+
+def store_bid_flags(flags):
+    # Called from the bid watch thread
+    with app.app_context():
+        now = datetime.utcnow()
+        db.session.execute(db.insert(BidFlag), [{
+            'kind': flag['kind'],
+            'user_id': flag['user_id'],
+            'artwork_id': flag['artwork_id'],
+            'artist_id': flag['artist_id'],
+            'details': json.dumps(flag['details']),
+            'created_at': now
+        } for flag in flags])
+        db.session.commit()
+
+def account_join_times(user_ids):
+    with app.app_context():
+        rows = db.session.execute(select(user_table.c.id, user_table.c.created_at)
+                                  .where(user_table.c.id.in_(user_ids)))
+        return {user_id: (created_at - datetime(1970, 1, 1)).total_seconds()
+                for user_id, created_at in rows if created_at}
+
+bid_watch = BidWatch(
+    store_bid_flags,
+    account_join_times,
+    window=app.config['BID_WATCH_WINDOW_HOURS'] * 3600,
+    artist_min_bids=app.config['BID_WATCH_ARTIST_MIN_BIDS'],
+    artist_share=app.config['BID_WATCH_ARTIST_SHARE'],
+    self_raises=app.config['BID_WATCH_SELF_RAISES'],
+    self_raise_window=app.config['BID_WATCH_SELF_RAISE_MINUTES'] * 60,
+    new_account_age=app.config['BID_WATCH_NEW_ACCOUNT_MINUTES'] * 60
+)
+bid_watch_started = False
+
+def watch_bid(artwork, user_id, amount, previous_leader):
+    # Only buffers the bid; the checks run on the bid watch thread
+    global bid_watch_started
+    if not app.config['BID_WATCH_ENABLED']:
+        return
+    if not bid_watch_started:
+        with job_queue_lock:
+            if not bid_watch_started:
+                bid_watch.start()
+                atexit.register(bid_watch.close)
+                bid_watch_started = True
+    bid_watch.observe(user_id, artwork.id, artwork.artist_id, amount, previous_leader)
+
+def bid_flag_json(flag, usernames, artists, titles):
+    return {
+        'id': flag.id,
+        'kind': flag.kind,
+        'user_id': flag.user_id,
+        'username': usernames.get(flag.user_id),
+        'artwork_id': flag.artwork_id,
+        'artwork_title': titles.get(flag.artwork_id),
+        'artist_id': flag.artist_id,
+        'artist': artists.get(flag.artist_id),
+        'details': json.loads(flag.details) if flag.details else {},
+        'status': flag.status,
+        'created_at': flag.created_at.isoformat() if flag.created_at else None,
+        'reviewed_at': flag.reviewed_at.isoformat() if flag.reviewed_at else None,
+        'reviewed_by': usernames.get(flag.reviewed_by)
+    }
+
+def bid_flag_names(user_ids, artist_ids, artwork_ids):
+    """Usernames, artist names and artwork titles for the given ids, one query each"""
+    usernames = dict(db.session.query(User.id, User.username).filter(User.id.in_(user_ids))) if user_ids else {}
+    artists = dict(db.session.query(Artist.id, Artist.name).filter(Artist.id.in_(artist_ids))) if artist_ids else {}
+    titles = dict(db.session.query(Artwork.id, Artwork.title).filter(Artwork.id.in_(artwork_ids))) if artwork_ids else {}
+    return usernames, artists, titles
+
+@app.route('/api/admin/bid-flags', methods=['GET'])
+@admin_required
+def get_bid_flags():
+    try:
+        status = request.args.get('status', 'open')
+        kind = request.args.get('kind')
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        before = request.args.get('before', type=int)
+        if status != 'all' and status not in BID_FLAG_STATUSES:
+            return jsonify({'error': f"status must be all or one of: {', '.join(BID_FLAG_STATUSES)}"}), 400
+
+        query = BidFlag.query
+        if status != 'all':
+            query = query.filter(BidFlag.status == status)
+        if kind:
+            query = query.filter(BidFlag.kind == kind)
+        if before:
+            query = query.filter(BidFlag.id < before)
+        flags = query.order_by(BidFlag.id.desc()).limit(limit).all()
+
+        watch = bid_watch.stats()
+        usernames, artists, titles = bid_flag_names(
+            {flag.user_id for flag in flags} | {flag.reviewed_by for flag in flags if flag.reviewed_by}
+            | {pair['user_id'] for pair in watch['top_pairs']},
+            {flag.artist_id for flag in flags if flag.artist_id} | {pair['artist_id'] for pair in watch['top_pairs']},
+            {flag.artwork_id for flag in flags if flag.artwork_id}
+        )
+        for pair in watch['top_pairs']:
+            pair['username'] = usernames.get(pair['user_id'])
+            pair['artist'] = artists.get(pair['artist_id'])
+
+        return jsonify({
+            'flags': [bid_flag_json(flag, usernames, artists, titles) for flag in flags],
+            'open': dict(db.session.query(BidFlag.kind, db.func.count())
+                         .filter(BidFlag.status == 'open').group_by(BidFlag.kind).all()),
+            'watch': dict(watch, enabled=app.config['BID_WATCH_ENABLED'])
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/bid-flags/<int:flag_id>', methods=['POST'])
+@admin_required
+def review_bid_flag(flag_id):
+    try:
+        data = request.get_json(silent=True) or {}
+        status = data.get('status')
+        if status not in BID_FLAG_STATUSES:
+            return jsonify({'error': f"status must be one of: {', '.join(BID_FLAG_STATUSES)}"}), 400
+
+        flag = BidFlag.query.get(flag_id)
+        if not flag:
+            return jsonify({'error': 'Flag not found'}), 404
+
+        flag.status = status
+        if status == 'open':
+            flag.reviewed_at = flag.reviewed_by = None
+        else:
+            flag.reviewed_at = datetime.utcnow()
+            flag.reviewed_by = int(get_jwt_identity())
+        db.session.commit()
+
+        usernames, artists, titles = bid_flag_names(
+            {flag.user_id, flag.reviewed_by} - {None},
+            {flag.artist_id} - {None},
+            {flag.artwork_id} - {None}
+        )
+        return jsonify({
+            'message': 'Flag updated',
+            'flag': bid_flag_json(flag, usernames, artists, titles)
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+# Watchlist Routes
+def watched_lot(artwork, artist_name):
+    lot = get_lot(artwork)
+    return {
+        'id': artwork.id,
+        'title': artwork.title,
+        'artist': artist_name or 'Unknown Artist',
+        'image': artwork_image_url(artwork, 320),
+        'status': artwork.status,
+        'current_bid': lot.current_price,
+        'bid_count': lot.bid_count,
+        'leader_id': lot.leader[1] if lot.leader else None,
+        'end_time': artwork.ends_at.isoformat() if artwork.ends_at else None,
+        'updated_at': artwork.updated_at.isoformat() if artwork.updated_at else None
+    }
+
+@app.route('/api/watchlist', methods=['GET'])
+@jwt_required()
+def get_watchlist():
+    try:
+        user_id = int(get_jwt_identity())
+        rows = db.session.query(Artwork, Artist.name, Watch.created_at)\
+                         .join(Watch, Watch.artwork_id == Artwork.id)\
+                         .outerjoin(Artist, Artist.id == Artwork.artist_id)\
+                         .filter(Watch.user_id == user_id)\
+                         .order_by(Watch.created_at.desc())\
+                         .all()
+        
+        watchlist = []
+        for artwork, artist_name, watched_at in rows:
+            item = watched_lot(artwork, artist_name)
+            item['watched_at'] = watched_at.isoformat()
+            watchlist.append(item)
+        
+        return jsonify({'watchlist': watchlist, 'total': len(watchlist)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/watchlist', methods=['POST'])
+@jwt_required()
+def add_watch():
+    try:
+        user_id = int(get_jwt_identity())
+        data = request.get_json() or {}
+        
+        if not data.get('artwork_id'):
+            return jsonify({'error': 'artwork_id is required'}), 400
+        
+        artwork_id = int(data['artwork_id'])
+        if not Artwork.query.get(artwork_id):
+            return jsonify({'error': 'Artwork not found'}), 404
+        
+        if Watch.query.get((user_id, artwork_id)):
+            return jsonify({'message': 'Already watching this artwork'}), 200
+        
+        db.session.add(Watch(user_id=user_id, artwork_id=artwork_id))
+        db.session.commit()
+        pin_to_primary()
+        
+        return jsonify({'message': 'Artwork added to watchlist'}), 201
+        
+    except ValueError:
+        return jsonify({'error': 'Invalid artwork_id format'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/watchlist/<int:artwork_id>', methods=['DELETE'])
+@jwt_required()
+def remove_watch(artwork_id):
+    try:
+        user_id = int(get_jwt_identity())
+        removed = Watch.query.filter_by(user_id=user_id, artwork_id=artwork_id).delete()
+        db.session.commit()
+        
+        if not removed:
+            return jsonify({'error': 'Artwork is not on your watchlist'}), 404
+        pin_to_primary()
+        
+        return jsonify({'message': 'Artwork removed from watchlist'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/watchlist/feed', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_watchlist_feed():
+    try:
+        user_id = int(get_jwt_identity())
+        cursor = datetime.utcnow()
+        if g.get('db_replica') is not None:
+            # The replica may not have seen the last few seconds of writes yet
+            cursor -= timedelta(seconds=replicas.max_lag)
+        
+        since = None
+        if request.args.get('since'):
+            try:
+                since = datetime.fromisoformat(request.args['since'])
+            except ValueError:
+                return jsonify({'error': 'since must be a cursor returned by this endpoint'}), 400
+        
+        # One join over the (user_id, artwork_id) watch key; with since=, only
+        # lots changed (or watched) after the cursor
+        query = db.session.query(Artwork, Artist.name)\
+                          .join(Watch, Watch.artwork_id == Artwork.id)\
+                          .outerjoin(Artist, Artist.id == Artwork.artist_id)\
+                          .filter(Watch.user_id == user_id)
+        if since:
+            since -= timedelta(seconds=app.config['WATCHLIST_FEED_OVERLAP_SECONDS'])
+            query = query.filter(db.or_(Artwork.updated_at > since, Watch.created_at > since))
+        
+        return jsonify({
+            'lots': [watched_lot(artwork, artist_name) for artwork, artist_name in query],
+            'cursor': cursor.isoformat(),
+            'full': since is None
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Search Routes
 @app.route('/api/search', methods=['GET'])
+@coalesced
+@read_replica
 def search():
     try:
         query = request.args.get('q', '').strip()
+        projection = ARTWORK_FIELDS.projection(request.args.get('fields'), request.args.get('view'), default='result')
         
         if not query:
             return jsonify({
@@ -684,51 +3379,24 @@ def search():
             }), 200
         
         # Search artworks
-        artworks = Artwork.query.filter(
-            (Artwork.title.contains(query)) |
-            (Artwork.description.contains(query))
-        ).limit(12).all()
+        artworks = fetch(db.session, artwork_rows(ArtworkRow, projection.columns).where(
+            (artwork_table.c.title.contains(query)) |
+            (artwork_table.c.description.contains(query))
+        ).limit(12), ArtworkRow)
         
         # Search artists
-        artists = Artist.query.filter(
-            (Artist.name.contains(query)) |
-            (Artist.bio.contains(query)) |
-            (Artist.specialty.contains(query))
-        ).limit(12).all()
+        artists = fetch(db.session, artist_rows().where(
+            (artist_table.c.name.contains(query)) |
+            (artist_table.c.bio.contains(query)) |
+            (artist_table.c.specialty.contains(query))
+        ).order_by(*ARTIST_SORTS['featured']).limit(12), ArtistRow)
         
         # Format artwork results
-        artwork_results = []
-        for artwork in artworks:
-            artist_name = "Unknown Artist"
-            if artwork.artist_id:
-                artist = Artist.query.get(artwork.artist_id)
-                if artist:
-                    artist_name = artist.name
-            
-            artwork_results.append({
-                'id': artwork.id,
-                'title': artwork.title,
-                'description': artwork.description,
-                'category': artwork.category,
-                'price': artwork.price,
-                'image': artwork.image_url,
-                'artist': artist_name,
-                'type': 'artwork'
-            })
+        options = {'image_width': 320}
+        artwork_results = [dict(projection.render(artwork, options), type='artwork') for artwork in artworks]
         
         # Format artist results
-        artist_results = []
-        for artist in artists:
-            artwork_count = Artwork.query.filter_by(artist_id=artist.id).count()
-            artist_results.append({
-                'id': artist.id,
-                'name': artist.name,
-                'bio': artist.bio,
-                'specialty': artist.specialty,
-                'image': artist.profile_image,
-                'works': artwork_count,
-                'type': 'artist'
-            })
+        artist_results = [dict(artist_json(artist), type='artist') for artist in artists]
         
         return jsonify({
             'query': query,
@@ -737,6 +3405,181 @@ def search():
             'total_results': len(artwork_results) + len(artist_results)
         }), 200
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Search Suggestions
+suggest_index = SuggestIndex(k=10)
+suggest_built_at = 0
+suggest_lock = threading.Lock()
+
+def suggest_items():
+    # Weighted by popularity: bids for artworks, artworks (and featuring)
+    # for artists, artists for specialties
+    bid_counts = db.session.query(Bid.artwork_id, db.func.count(Bid.id).label('bids'))\
+                           .group_by(Bid.artwork_id).subquery()
+    rows = db.session.query(Artwork.id, Artwork.title, bid_counts.c.bids, BidSummary.bid_count)\
+                     .outerjoin(bid_counts, bid_counts.c.artwork_id == Artwork.id)\
+                     .outerjoin(BidSummary, BidSummary.artwork_id == Artwork.id)
+    for artwork_id, title, bids, archived_bids in rows:
+        yield 'artwork', artwork_id, title, 1 + (bids or 0) + (archived_bids or 0)
+    
+    rows = db.session.query(Artist.id, Artist.name, Artist.specialty, Artist.featured, Artist.artwork_count)
+    specialties = {}
+    for artist_id, name, specialty, featured, works in rows:
+        yield 'artist', artist_id, name, 1 + works + (5 if featured else 0)
+        if specialty:
+            specialties[specialty] = specialties.get(specialty, 0) + 1
+    for specialty, count in specialties.items():
+        yield 'specialty', specialty, specialty, count
+
+def rebuild_suggest_index():
+    with app.app_context():
+        suggest_index.build(suggest_items())
+
+def get_suggest_index():
+    global suggest_built_at
+    if time.time() - suggest_built_at > app.config['SUGGEST_REBUILD_SECONDS']:
+        with suggest_lock:
+            if time.time() - suggest_built_at > app.config['SUGGEST_REBUILD_SECONDS']:
+                first_build = suggest_built_at == 0
+                suggest_built_at = time.time()
+                if first_build:
+                    rebuild_suggest_index()
+                else:
+                    # Keep answering from the current index while rebuilding
+                    threading.Thread(target=rebuild_suggest_index, daemon=True).start()
+    return suggest_index
+
+def suggest_artist_added(artist):
+    suggest_index.bump('artist', artist.id, artist.name, 0 if ('artist', artist.id) in suggest_index else 1)
+    if artist.specialty and ('specialty', artist.specialty) not in suggest_index:
+        suggest_index.add('specialty', artist.specialty, artist.specialty, 1)
+
+def suggest_artwork_added(artwork, artist):
+    suggest_index.add('artwork', artwork.id, artwork.title, 1)
+    suggest_index.bump('artist', artist.id, artist.name)
+
+@app.route('/api/search/suggest', methods=['GET'])
+def search_suggest():
+    try:
+        query = request.args.get('q', '').strip()
+        limit = min(request.args.get('limit', 8, type=int), 10)
+        suggestions = get_suggest_index().suggest(query, limit) if query else []
+        return jsonify({
+            'query': query,
+            'suggestions': [suggestion.to_dict() for suggestion in suggestions]
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Home Page
+home_snapshot = None  # (JSON bytes, ETag)
+home_refresher = None
+home_lock = threading.Lock()
+
+def home_lots(statement):
+    return [auction_json(artwork, artwork.artist_name or 'Unknown Artist')
+            for artwork in fetch(db.session, statement, AuctionRow)]
+
+def build_home():
+    size = app.config['HOME_SECTION_SIZE']
+    now = datetime.utcnow()
+    since = now - timedelta(minutes=app.config['HOME_TRENDING_MINUTES'])
+    live = artwork_table.c.status == 'live'
+    
+    featured_artists = fetch(db.session, artist_rows().order_by(*ARTIST_SORTS['featured']).limit(size), ArtistRow)
+    
+    # Bid velocity: bids per lot over the trending window
+    velocity = select(bid_table.c.artwork_id, db.func.count().label('bids'))\
+        .where(bid_table.c.created_at >= since).group_by(bid_table.c.artwork_id).subquery()
+    trending_bids = dict(db.session.execute(
+        select(velocity.c.artwork_id, velocity.c.bids)
+        .join(artwork_table, artwork_table.c.id == velocity.c.artwork_id)
+        .where(live).order_by(velocity.c.bids.desc(), velocity.c.artwork_id.desc()).limit(size)
+    ).all())
+    if len(trending_bids) < size:
+        # Quiet catalogs: newest live lots fill the rest
+        for (artwork_id,) in db.session.execute(
+            select(artwork_table.c.id).where(live, artwork_table.c.id.notin_(trending_bids))
+            .order_by(artwork_table.c.id.desc()).limit(size - len(trending_bids))
+        ):
+            trending_bids[artwork_id] = 0
+    trending = sorted(home_lots(artwork_rows(AuctionRow).where(artwork_table.c.id.in_(trending_bids))),
+                      key=lambda lot: (trending_bids[lot['id']], lot['id']), reverse=True)
+    for lot in trending:
+        lot['recent_bids'] = trending_bids[lot['id']]
+    
+    ending_soon = home_lots(artwork_rows(AuctionRow).where(live, artwork_table.c.ends_at > now)
+                            .order_by(artwork_table.c.ends_at).limit(size))
+    
+    ticker = [{
+        'artwork_id': artwork_id,
+        'artwork': title,
+        'bidder_name': username,
+        'amount': amount,
+        'created_at': created_at.isoformat()
+    } for artwork_id, title, username, amount, created_at in db.session.execute(
+        select(bid_table.c.artwork_id, artwork_table.c.title, user_table.c.username, bid_table.c.amount,
+               bid_table.c.created_at)
+        .join(artwork_table, artwork_table.c.id == bid_table.c.artwork_id)
+        .join(user_table, user_table.c.id == bid_table.c.user_id)
+        .order_by(bid_table.c.created_at.desc()).limit(size)
+    )]
+    
+    stats = {
+        'total_artworks': db.session.execute(select(db.func.count()).select_from(artwork_table)).scalar(),
+        'total_artists': db.session.execute(select(db.func.count()).select_from(artist_table)).scalar(),
+        'live_auctions': db.session.execute(select(db.func.count()).select_from(artwork_table).where(live)).scalar(),
+        'bids_last_24h': db.session.execute(
+            select(db.func.count()).select_from(bid_table).where(bid_table.c.created_at >= now - timedelta(hours=24))
+        ).scalar()
+    }
+    
+    return {
+        'featured_artists': [artist_json(artist) for artist in featured_artists],
+        'trending': trending,
+        'ending_soon': ending_soon,
+        'ticker': ticker,
+        'stats': stats,
+        'generated_at': now.isoformat(),
+        'refresh_seconds': app.config['HOME_REFRESH_SECONDS']
+    }
+
+def refresh_home():
+    global home_snapshot
+    with app.app_context():
+        body = json.dumps(build_home(), separators=(',', ':')).encode('utf-8')
+    home_snapshot = (body, hashlib.sha256(body).hexdigest()[:16])
+
+def home_refresh_loop():
+    while True:
+        time.sleep(app.config['HOME_REFRESH_SECONDS'])
+        try:
+            refresh_home()
+        except Exception as e:
+            app.logger.warning('Home page refresh failed: %s', e)
+
+@app.route('/api/home', methods=['GET'])
+def get_home():
+    global home_refresher
+    try:
+        if home_snapshot is None:
+            with home_lock:
+                if home_snapshot is None:
+                    refresh_home()
+                    home_refresher = threading.Thread(target=home_refresh_loop, name='home-refresher', daemon=True)
+                    home_refresher.start()
+        body, etag = home_snapshot
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.headers['ETag'] = f'"{etag}"'
+        response.headers['Cache-Control'] = f"public, max-age={app.config['HOME_REFRESH_SECONDS']}"
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -746,10 +3589,12 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'replicas': replicas.status()
     }), 200
 
 @app.route('/api/stats', methods=['GET'])
+@read_replica
 def get_stats():
     try:
         stats = {
@@ -769,6 +3614,19 @@ def get_stats():
 # Sample Data Creation
 @app.route('/api/create-sample-data', methods=['POST'])
 def create_sample_data():
+    # Hashing the sample passwords is slow, so the work runs as a background job
+    try:
+        job_id = get_job_queue().enqueue(
+            'create-sample-data',
+            priority=10,
+            idempotency_key=request.headers.get('Idempotency-Key')
+        )
+        return job_response(job_id)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@job_queue.register('create-sample-data')
+def create_sample_data_job(payload):
     try:
         sample_users = [
             {
@@ -800,6 +3658,7 @@ def create_sample_data():
             }
         ]
         
+        created_users = 0
         created_artists = []
         for user_data in sample_users:
             existing_user = User.query.filter_by(username=user_data['username']).first()
@@ -814,6 +3673,7 @@ def create_sample_data():
             )
             db.session.add(user)
             db.session.flush()
+            created_users += 1
             
             if user.is_artist:
                 artist = Artist(
@@ -852,6 +3712,7 @@ def create_sample_data():
             }
         ]
         
+        created_artworks = []
         for i, artwork_data in enumerate(sample_artworks):
             if i < len(created_artists):
                 artist = created_artists[i]
@@ -864,32 +3725,65 @@ def create_sample_data():
                     user_id=artist.user_id,
                     artist_id=artist.id
                 )
+                artwork.change_version = next_change_version()
                 db.session.add(artwork)
+                record_artist_activity(artist.id, artworks=1)
+                created_artworks.append((artwork, artist.name))
         
         db.session.commit()
         
-        return jsonify({
+        artist_specialties = {artist.id: artist.specialty for artist in created_artists}
+        for artist in created_artists:
+            suggest_artist_added(artist)
+        for artwork, artist_name in created_artworks:
+            facet_cache.artwork_added(artwork_facet_info(artwork, artist_name))
+            suggest_index.add('artwork', artwork.id, artwork.title, 1)
+            similar_index.add(artwork.id, artwork_text(artwork, artist_specialties.get(artwork.artist_id)))
+        
+        return {
             'message': 'Sample data created successfully',
-            'users_created': len([u for u in sample_users if not User.query.filter_by(username=u['username']).first()]),
-            'artworks_created': len(sample_artworks)
-        }), 201
+            'users_created': created_users,
+            'artworks_created': len(created_artworks)
+        }
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        return jsonify({'error': str(e)}), 500
+        raise
+
+# Uploaded Media
+@app.route('/media/artworks/<image_hash>/<name>')
+def serve_artwork_image(image_hash, name):
+    path = image_pipeline.variant_path(image_hash, name)
+    if not path or not os.path.exists(path):
+        return jsonify({'error': 'Image not found'}), 404
+    # Paths are content addressed, so they never change once written
+    response = send_from_directory(os.path.dirname(path), name, max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 # Frontend Routes
+static_assets = StaticAssets(FRONTEND_FOLDER)
+static_assets.load()
+
+def serve_frontend(path):
+    if app.debug:
+        static_assets.reload_if_changed()
+    asset, immutable = static_assets.lookup(path)
+    if asset is None:
+        # Unknown paths fall back to the landing page (SPA behavior)
+        asset, immutable = static_assets.lookup('index.html')
+    return static_assets.response(asset, request, immutable)
+
 @app.route('/')
 def index():
-    return send_from_directory(app.static_folder, 'index.html')
+    return serve_frontend('index.html')
 
 @app.route('/<path:filename>')
 def serve_static(filename):
-    # Serve static files (HTML, CSS, JS, images)
-    if filename.endswith(('.html', '.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico')):
-        return send_from_directory(app.static_folder, filename)
-    # For other paths, serve index.html (SPA behavior)
-    return send_from_directory(app.static_folder, 'index.html')
+    # Serve static files (HTML, CSS, JS, images), plain or fingerprinted
+    if filename.startswith('api/'):
+        return jsonify({'error': 'Resource not found'}), 404
+    return serve_frontend(filename)
 
 # Error Handlers
 @app.errorhandler(404)
@@ -898,7 +3792,7 @@ def not_found(error):
     if request.path.startswith('/api/'):
         return jsonify({'error': 'Resource not found'}), 404
     # Otherwise serve the frontend
-    return send_from_directory(app.static_folder, 'index.html')
+    return serve_frontend('index.html')
 
 @app.errorhandler(500)
 def internal_error(error):
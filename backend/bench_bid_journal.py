@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark bid ingestion: commit-per-bid versus the write-behind bid journal.
+
+Runs against a throwaway SQLite database through the Flask test client:
+    cd backend
+    python bench_bid_journal.py --bids 2000 --threads 16
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix='kunsthaus-bench-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORK_DIR, 'bench.db')
+os.environ['BID_JOURNAL_PATH'] = os.path.join(WORK_DIR, 'bids.journal')
+os.environ['RATELIMIT_ENABLED'] = '0'
+os.environ['MAX_IN_FLIGHT_REQUESTS'] = '1000'
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, Bid, get_bid_journal
+
+
+def setup(client, lots, bidders):
+    def register(name, is_artist=False):
+        response = client.post('/api/auth/register', json={
+            'username': name,
+            'email': f'{name}@bench.local',
+            'password': 'password123',
+            'is_artist': is_artist
+        })
+        return response.get_json()['access_token']
+
+    artist = register('bench_artist', True)
+    artwork_ids = []
+    for i in range(lots):
+        response = client.post('/api/artworks', json={'title': f'Lot {i}', 'starting_price': 100},
+                               headers={'Authorization': f'Bearer {artist}'})
+        artwork_ids.append(response.get_json()['artwork']['id'])
+    tokens = [register(f'bench_bidder_{i}') for i in range(bidders)]
+    return artwork_ids, tokens
+
+
+def run(label, bids, threads, artwork_ids, tokens, start_amount):
+    per_thread = bids // threads
+    accepted = []
+
+    def worker(n):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[n % len(tokens)]}'}
+        count = 0
+        for i in range(per_thread):
+            # Every thread owns its lots, so amounts always clear the minimum
+            artwork_id = artwork_ids[n % len(artwork_ids)]
+            amount = start_amount + (i * threads + n) * 100
+            response = client.post('/api/bids/', json={'artwork_id': artwork_id, 'amount': amount}, headers=headers)
+            if response.status_code in (201, 202):
+                count += 1
+        accepted.append(count)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = sum(accepted)
+    print(f'{label:<22} {total:>6} bids  {elapsed:>7.2f}s  {total / elapsed:>9.1f} bids/sec')
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--bids', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+
+    client = app.test_client()
+    artwork_ids, tokens = setup(client, args.threads, args.threads)
+
+    app.config['BID_JOURNAL_ENABLED'] = False
+    run('commit per bid', args.bids, args.threads, artwork_ids, tokens, 1000)
+
+    app.config['BID_JOURNAL_ENABLED'] = True
+    accepted = run('journal group commit', args.bids, args.threads, artwork_ids, tokens, 10_000_000)
+
+    journal = get_bid_journal()
+    started = time.perf_counter()
+    journal.close()
+    print(f'journal drain         {time.perf_counter() - started:.2f}s')
+
+    with app.app_context():
+        applied = Bid.query.filter(Bid.journal_seq.isnot(None)).count()
+    print(f'journaled bids applied: {applied}/{accepted}')
+    print(f'work dir: {WORK_DIR}')
+
+
+if __name__ == '__main__':
+    main()
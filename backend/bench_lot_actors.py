@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark a single hot lot bid on from several worker processes: row claims versus per-lot actors.
+
+Every process imports the app against one shared SQLite database and sends
+bids for the same artwork from its own threads through the Flask test
+client. Amounts rise with every bid sent, so a bid is only rejected (400)
+when a higher one got in first. With --mode claim each process validates and
+claims the artwork row itself (409 after three lost races); with --mode
+actors the bids are handed to the lot's owner process over its Unix socket:
+    cd backend
+    python bench_lot_actors.py --processes 4 --threads 8 --bids 50
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# Spawned workers import this module again and must find the same directory
+WORK_DIR = os.environ.get('KUNSTHAUS_BENCH_DIR') or tempfile.mkdtemp(prefix='kunsthaus-bench-')
+os.environ['KUNSTHAUS_BENCH_DIR'] = WORK_DIR
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORK_DIR, 'bench.db')
+os.environ['LOT_ACTORS_SOCKET_DIR'] = os.path.join(WORK_DIR, 'lot-actors')
+os.environ['RATELIMIT_ENABLED'] = '0'
+os.environ['MAX_IN_FLIGHT_REQUESTS'] = '1000'
+os.environ['BID_WATCH_ENABLED'] = '0'
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup(bidders):
+    from app import app, db
+
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+
+    def register(name, is_artist=False):
+        response = client.post('/api/auth/register', json={
+            'username': name,
+            'email': f'{name}@bench.local',
+            'password': 'password123',
+            'is_artist': is_artist
+        })
+        return response.get_json()['access_token']
+
+    artist = register('bench_artist', True)
+    artwork_ids = [
+        client.post('/api/artworks', json={'title': f'Hot lot ({mode})', 'starting_price': 100},
+                    headers={'Authorization': f'Bearer {artist}'}).get_json()['artwork']['id']
+        for mode in ('claim', 'actors')
+    ]
+    return artwork_ids, [register(f'bench_bidder_{i}') for i in range(bidders)]
+
+
+def worker(mode, index, args, artwork_id, tokens, ready, go, results):
+    # Runs in a spawned process, so the app is imported with this mode's settings
+    os.environ['LOT_ACTORS_ENABLED'] = '1' if mode == 'actors' else '0'
+    import threading
+    from app import app, get_lot_actors
+
+    if mode == 'actors':
+        get_lot_actors()
+    ready.wait()
+    if mode == 'actors':
+        get_lot_actors().refresh()  # Every process has its socket up by now
+    go.wait()
+
+    statuses, latencies = [], []
+    total_threads = args.processes * args.threads
+
+    def send(thread):
+        client = app.test_client()
+        slot = index * args.threads + thread
+        headers = {'Authorization': f'Bearer {tokens[slot % len(tokens)]}'}
+        for i in range(args.bids):
+            amount = 1000 + (i * total_threads + slot) * 100
+            started = time.perf_counter()
+            response = client.post('/api/bids/', json={'artwork_id': artwork_id, 'amount': amount}, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=send, args=(n,)) for n in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = get_lot_actors().stats() if mode == 'actors' else None
+    results.put((statuses, latencies, stats))
+    # Stay in the ring until every process has finished sending
+    ready.wait()
+
+
+def run(mode, args, artwork_id, tokens):
+    context = multiprocessing.get_context('spawn')
+    ready, go, results = context.Barrier(args.processes), context.Barrier(args.processes + 1), context.Queue()
+    processes = [
+        context.Process(target=worker, args=(mode, n, args, artwork_id, tokens, ready, go, results))
+        for n in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    go.wait()
+    started = time.perf_counter()
+    collected = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    statuses = [status for result in collected for status in result[0]]
+    latencies = sorted(latency for result in collected for latency in result[1])
+    accepted = statuses.count(201)
+    print(f'{mode:<7} {len(statuses) / elapsed:>7.1f} bids/s  {accepted:>6} accepted  '
+          f'{statuses.count(400):>5} outbid (400)  {statuses.count(409):>4} lost races (409)  '
+          f'{len(statuses) - accepted - statuses.count(400) - statuses.count(409):>4} errors  '
+          f'p50 {latencies[len(latencies) // 2] * 1000:>6.1f}ms  '
+          f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:>6.1f}ms')
+    for result in collected:
+        if result[2] and result[2]['batches']:
+            print(f'        {result[2]["name"]}: routed {result[2]["routed"]}, '
+                  f'{result[2]["bids_per_batch"]} bids per batch')
+    return accepted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--bids', type=int, default=50, help='bids per thread')
+    parser.add_argument('--mode', choices=('claim', 'actors', 'both'), default='both')
+    args = parser.parse_args()
+
+    artwork_ids, tokens = setup(args.processes * args.threads)
+    print(f'{args.processes} processes x {args.threads} threads x {args.bids} bids on one lot')
+    for mode, artwork_id in zip(('claim', 'actors'), artwork_ids):
+        if args.mode in (mode, 'both'):
+            run(mode, args, artwork_id, tokens)
+    print(f'work dir: {WORK_DIR}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark the listing read path: ORM instances versus Core selects into __slots__ records.
+
+Seeds a throwaway SQLite database, then loads an artworks page and one
+lot's bid history both ways, reporting time and allocated memory per row:
+    cd backend
+    python bench_read_path.py --artworks 20000 --bids 20000 --per-page 5000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+WORK_DIR = tempfile.mkdtemp(prefix='kunsthaus-bench-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(WORK_DIR, 'bench.db')
+os.environ['RATELIMIT_ENABLED'] = '0'
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import select
+
+from app import app, db, User, Artist, Artwork, Bid, artwork_rows, bid_table, user_table
+from read_path import ArtworkRow, BidRow, fetch, paginate
+
+
+def seed(artworks, bids):
+    now = datetime.utcnow()
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'username': f'user{i}', 'email': f'user{i}@bench.local', 'password_hash': 'x',
+         'is_artist': i <= 100, 'created_at': now}
+        for i in range(1, 1001)
+    ])
+    db.session.execute(Artist.__table__.insert(), [
+        {'id': i, 'user_id': i, 'name': f'Artist {i}', 'bio': '', 'specialty': 'Painting', 'created_at': now}
+        for i in range(1, 101)
+    ])
+    db.session.execute(Artwork.__table__.insert(), [
+        {'id': i, 'title': f'Artwork {i}', 'description': 'Oil on canvas, ' * 8, 'category': 'painting',
+         'price': 100.0 + i, 'image_url': f'https://example.com/{i}.jpg', 'user_id': i % 100 + 1,
+         'artist_id': i % 100 + 1, 'created_at': now, 'updated_at': now}
+        for i in range(1, artworks + 1)
+    ])
+    db.session.execute(Bid.__table__.insert(), [
+        {'amount': 200.0 + i, 'artwork_id': 1, 'user_id': i % 1000 + 1, 'created_at': now - timedelta(seconds=i)}
+        for i in range(bids)
+    ])
+    db.session.commit()
+
+
+# The routes as they were before the read path
+
+def orm_artworks(per_page):
+    pagination = Artwork.query.paginate(page=1, per_page=per_page, error_out=False)
+    rows = []
+    for artwork in pagination.items:
+        artist = Artist.query.get(artwork.artist_id) if artwork.artist_id else None
+        rows.append((artwork.id, artwork.title, artwork.price, artwork.created_at,
+                     artist.name if artist else 'Unknown Artist'))
+    return rows
+
+
+def orm_bids(artwork_id):
+    bids = Bid.query.filter_by(artwork_id=artwork_id).order_by(Bid.amount.desc(), Bid.created_at.desc()).all()
+    return [(bid.id, bid.amount, bid.user.username, bid.created_at) for bid in bids]
+
+
+# The read path
+
+def core_artworks(per_page):
+    artworks, _ = paginate(db.session, artwork_rows(ArtworkRow), ArtworkRow, 1, per_page)
+    return [(artwork.id, artwork.title, artwork.price, artwork.created_at, artwork.artist_name or 'Unknown Artist')
+            for artwork in artworks]
+
+
+def core_bids(artwork_id):
+    bids = fetch(db.session, select(bid_table.c.id, bid_table.c.amount, bid_table.c.created_at, user_table.c.username)
+                             .join(user_table, user_table.c.id == bid_table.c.user_id)
+                             .where(bid_table.c.artwork_id == artwork_id)
+                             .order_by(bid_table.c.amount.desc(), bid_table.c.created_at.desc()), BidRow)
+    return [(bid.id, bid.amount, bid.bidder_name, bid.created_at) for bid in bids]
+
+
+def measure(label, load, repeat):
+    # A fresh session per run, so the ORM identity map starts empty like it does per request
+    times = []
+    for _ in range(repeat):
+        db.session.remove()
+        started = time.process_time()
+        rows = load()
+        times.append(time.process_time() - started)
+    db.session.remove()
+    tracemalloc.start()
+    rows = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.remove()
+    best = min(times)
+    print(f'{label:<24} {len(rows):>7} rows  {best * 1000:>8.1f}ms  {best / len(rows) * 1e6:>6.1f}us/row  '
+          f'{peak / len(rows):>7.0f} B/row peak')
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--artworks', type=int, default=20000)
+    parser.add_argument('--bids', type=int, default=20000)
+    parser.add_argument('--per-page', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        seed(args.artworks, args.bids)
+
+        for name, old, new in (
+            ('GET /api/artworks', lambda: orm_artworks(args.per_page), lambda: core_artworks(args.per_page)),
+            ('GET /api/bids/artwork', lambda: orm_bids(1), lambda: core_bids(1)),
+        ):
+            print(name)
+            old_time, old_peak = measure('  ORM instances', old, args.repeat)
+            new_time, new_peak = measure('  Core + __slots__', new, args.repeat)
+            print(f'  {old_time / new_time:.1f}x faster, {old_peak / new_peak:.1f}x less memory')
+    print(f'work dir: {WORK_DIR}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark the similar-artworks index: build time, query latency and appends.
+
+Runs against synthetic artworks and bids in a temporary folder, no database
+needed (the index takes about 1 KB of disk per artwork):
+    cd backend
+    python bench_similar.py --artworks 1000000 --bids 3000000
+"""
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from similar import SimilarIndex, np
+
+WORDS = ('sunset dreams ocean waves urban jungle abstract harmony golden hour mountain serenity digital '
+         'renaissance silent forest midnight garden crimson light portrait study blue morning river city '
+         'bronze marble canvas texture geometry motion shadow echo memory bloom storm desert harbor').split()
+CATEGORIES = ('abstract', 'contemporary', 'landscape', 'portrait', 'sculpture', 'digital')
+SPECIALTIES = ('Abstract Expressionism', 'Street Art', 'Surreal Landscapes', 'Digital Art', 'Portraiture')
+
+
+def documents(count, rng):
+    for artwork_id in range(1, count + 1):
+        title = ' '.join(rng.choices(WORDS, k=rng.randint(2, 4)))
+        description = ' '.join(rng.choices(WORDS, k=rng.randint(6, 16)))
+        yield artwork_id, (title, description, rng.choice(CATEGORIES), rng.choice(SPECIALTIES))
+
+
+def bids(count, artworks, bidders, rng):
+    for _ in range(count):
+        # A few very active bidders, a long tail of occasional ones
+        yield rng.randint(1, artworks), int(bidders * rng.random() ** 3)
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--artworks', type=int, default=1000000)
+    parser.add_argument('--bids', type=int, default=3000000)
+    parser.add_argument('--bidders', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=64)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    root = tempfile.mkdtemp(prefix='kunsthaus-similar-')
+
+    try:
+        index = SimilarIndex(root, cache_size=0)
+        result = index.build(documents(args.artworks, rng), bids(args.bids, args.artworks, args.bidders, rng))
+        print(f"build: {result['artworks']} artworks, {result['bidders']} bidders in {result['seconds']}s "
+              f"({'numpy' if np is not None else 'pure Python'})")
+
+        # Warm the page cache, as a long-running server would be
+        index.similar_many([1], 10)
+        latencies = []
+        for _ in range(args.queries):
+            artwork_id = rng.randint(1, args.artworks)
+            start = time.perf_counter()
+            index.similar_many([artwork_id], 10)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f'single query: mean {statistics.mean(latencies):.1f}ms, p50 {percentile(latencies, 0.5):.1f}ms, '
+              f'p99 {percentile(latencies, 0.99):.1f}ms')
+
+        batch = [rng.randint(1, args.artworks) for _ in range(args.batch)]
+        start = time.perf_counter()
+        index.similar_many(batch, 10)
+        elapsed = time.perf_counter() - start
+        print(f'batched: {args.batch} queries in {elapsed * 1000:.0f}ms ({elapsed / args.batch * 1000:.1f}ms each)')
+
+        start = time.perf_counter()
+        for i in range(1000):
+            index.add(args.artworks + 1 + i, next(documents(1, rng))[1])
+        print(f'append: {(time.perf_counter() - start):.3f}ms per artwork')
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
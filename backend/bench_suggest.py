@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark the search type-ahead index: build time and per-keystroke latency.
+
+Runs against synthetic titles, no database needed:
+    cd backend
+    python bench_suggest.py --items 1000000 --queries 20000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from suggest import SuggestIndex
+
+WORDS = ('sunset', 'dreams', 'ocean', 'waves', 'urban', 'jungle', 'abstract', 'harmony', 'golden',
+         'hour', 'mountain', 'serenity', 'digital', 'renaissance', 'silent', 'forest', 'midnight',
+         'garden', 'crimson', 'light', 'portrait', 'study', 'blue', 'morning', 'river', 'city')
+
+
+def items(count, rng):
+    for i in range(count):
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 4))) + f' {i}'
+        yield 'artwork', i, title, int(rng.paretovariate(1.2))
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    index = SuggestIndex(k=10)
+    start = time.perf_counter()
+    index.build(items(args.items, rng))
+    print(f'build: {len(index)} items, {len(index._keys) + len(index._new_keys)} keys, '
+          f'{len(index._top)} precomputed prefixes in {time.perf_counter() - start:.1f}s')
+
+    # Simulate typing: every prefix of a word, including the short heavy ones
+    prefixes = []
+    while len(prefixes) < args.queries:
+        word = rng.choice(WORDS)
+        prefixes.extend(word[:n] for n in range(1, len(word) + 1))
+    prefixes = prefixes[:args.queries]
+
+    latencies = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        index.suggest(prefix, 8)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+    print(f'suggest: {len(latencies)} queries, mean {statistics.mean(latencies):.1f}us, '
+          f'p50 {percentile(latencies, 0.5):.1f}us, p99 {percentile(latencies, 0.99):.1f}us, '
+          f'max {latencies[-1]:.1f}us')
+
+    start = time.perf_counter()
+    for i in range(20000):
+        index.add('artwork', args.items + i, f'{rng.choice(WORDS)} {rng.choice(WORDS)} new {i}', 1)
+    print(f'add: {(time.perf_counter() - start) * 50:.1f}us per item (including merges)')
+
+
+if __name__ == '__main__':
+    main()
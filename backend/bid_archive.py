@@ -0,0 +1,72 @@
+"""
+Compressed per-month archive files for bids on closed auctions.
+
+Bids are appended to <root>/bids-YYYY-MM.jsonl.gz as gzip members (one per
+archive run), so writing never rewrites old data. Readers decompress only the
+months they are told about and cache the parsed rows of recently used months.
+"""
+
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class BidArchive:
+    def __init__(self, root, cache_months=6):
+        self.root = root
+        self.cache_months = cache_months
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_for(self, month):
+        return os.path.join(self.root, f'bids-{month}.jsonl.gz')
+
+    def append(self, month, records):
+        """Durably append bid dicts (id, artwork_id, user_id, amount, created_at) to a month"""
+        os.makedirs(self.root, exist_ok=True)
+        payload = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+        with open(self.path_for(month), 'ab') as f:
+            f.write(gzip.compress(payload.encode('utf-8')))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read_month(self, month):
+        path = self.path_for(month)
+        if not os.path.exists(path):
+            return []
+        mtime = os.path.getmtime(path)
+
+        with self._lock:
+            cached = self._cache.get(month)
+            if cached and cached[0] == mtime:
+                self._cache.move_to_end(month)
+                return cached[1]
+
+        rows, seen = [], set()
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                # A run interrupted before its database commit may have archived a bid twice
+                if record['id'] not in seen:
+                    seen.add(record['id'])
+                    rows.append(record)
+
+        with self._lock:
+            self._cache[month] = (mtime, rows)
+            self._cache.move_to_end(month)
+            while len(self._cache) > self.cache_months:
+                self._cache.popitem(last=False)
+        return rows
+
+    def find(self, months, artwork_id=None, user_id=None):
+        results = []
+        for month in sorted(set(months)):
+            for record in self.read_month(month):
+                if artwork_id is not None and record['artwork_id'] != artwork_id:
+                    continue
+                if user_id is not None and record['user_id'] != user_id:
+                    continue
+                results.append(record)
+        return results
@@ -0,0 +1,250 @@
+"""
+Write-behind bid journal with group commit.
+
+Accepted bids are appended to an append-only JSON-lines file and acknowledged
+once an fsync covering them has completed. A single flusher thread fsyncs
+whatever has been written every few milliseconds, so concurrent bidders share
+one fsync. An applier thread then inserts durable records into the database in
+batches and advances a checkpoint; on startup every record past the checkpoint
+is replayed.
+
+A batch that keeps failing is retried record by record, and records that
+still fail while others succeed are moved to a dead-letter file
+(<path>.dead) so one bad record cannot hold back every bid behind it. When
+every record fails the database itself is taken to be down and the batch
+is kept.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+
+log = logging.getLogger(__name__)
+
+
+class BidRejected(Exception):
+    """Raised by a journal check to refuse a bid before it is written"""
+
+
+class BidJournal:
+    def __init__(self, path, apply_batch, flush_interval=0.005, batch_size=500,
+                 compact_bytes=16 * 1024 * 1024, max_attempts=5):
+        # apply_batch(records) must insert records idempotently (keyed by 'seq').
+        # It may return [(record, reason)] for records it refused, which are
+        # dead-lettered instead of applied
+        self.path = path
+        self.checkpoint_path = path + '.ckpt'
+        self.dead_letter_path = path + '.dead'
+        self.apply_batch = apply_batch
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.compact_bytes = compact_bytes
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._durable = threading.Condition(self._lock)
+        self._pending = threading.Condition(self._lock)
+        self._file = None
+        self._threads = []
+        self._running = False
+
+        self.next_seq = 1
+        self.written_seq = 0
+        self.durable_seq = 0
+        self.applied_seq = 0
+        self.queue = deque()
+        self.latest_amounts = {}
+        self.last_error = None
+        self.failures = 0
+        self.dead_lettered = 0
+
+    # Startup and recovery
+    def open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                self.applied_seq = int(f.read().strip() or 0)
+
+        last_seq = self.applied_seq
+        valid_bytes = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash: nothing after it was acknowledged
+                        break
+                    if not line.endswith(b'\n'):
+                        break
+                    valid_bytes += len(line)
+                    last_seq = max(last_seq, record['seq'])
+                    self.latest_amounts[record['artwork_id']] = record['amount']
+                    if record['seq'] > self.applied_seq:
+                        self.queue.append(record)
+
+        self._file = open(self.path, 'ab')
+        self._file.truncate(valid_bytes)
+        self.next_seq = last_seq + 1
+        self.written_seq = self.durable_seq = last_seq
+        return len(self.queue)
+
+    def start(self):
+        self._running = True
+        for target in (self._flush_loop, self._apply_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self):
+        """Flush and apply everything outstanding, then stop the worker threads"""
+        with self._lock:
+            self._running = False
+            self._durable.notify_all()
+            self._pending.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._file.close()
+
+    # Write path
+    def latest_amount(self, artwork_id):
+        """Highest bid accepted through this journal for an artwork, if any"""
+        return self.latest_amounts.get(artwork_id)
+
+    def append(self, record, check=None):
+        """Append a bid and block until it is durable. Returns its sequence number.
+
+        check(latest_amount) runs under the journal lock and may raise
+        BidRejected, which makes validate-and-append atomic in this process.
+        """
+        with self._lock:
+            if check:
+                check(self.latest_amounts.get(record['artwork_id']))
+
+            record = dict(record, seq=self.next_seq)
+            self.next_seq += 1
+            self._file.write(json.dumps(record, separators=(',', ':')).encode() + b'\n')
+            self.written_seq = record['seq']
+            self.latest_amounts[record['artwork_id']] = record['amount']
+            self.queue.append(record)
+            self._pending.notify_all()
+
+            while self.durable_seq < record['seq']:
+                self._durable.wait()
+        return record['seq']
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while self._running and self.written_seq == self.durable_seq:
+                    self._pending.wait()
+                if not self._running and self.written_seq == self.durable_seq:
+                    return
+
+            # Let concurrent writers pile up behind a single fsync
+            threading.Event().wait(self.flush_interval)
+
+            with self._lock:
+                self._file.flush()
+                target = self.written_seq
+            os.fsync(self._file.fileno())
+
+            with self._lock:
+                self.durable_seq = max(self.durable_seq, target)
+                self._durable.notify_all()
+                self._pending.notify_all()
+
+    # Apply path
+    def _apply_loop(self):
+        while True:
+            with self._lock:
+                while self._running and not self._ready():
+                    self._pending.wait()
+                if not self._ready():
+                    if not self._running and not self.queue:
+                        return
+                    if not self._running:
+                        self._pending.wait(self.flush_interval)
+                    continue
+                batch = []
+                while self.queue and len(batch) < self.batch_size and self.queue[0]['seq'] <= self.durable_seq:
+                    batch.append(self.queue.popleft())
+
+            try:
+                refused = self.apply_batch(batch) or []
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                log.warning('Applying %d journaled bids failed (attempt %d): %s', len(batch), self.failures, e)
+                refused = self._apply_one_by_one(batch) if self.failures >= self.max_attempts else None
+                if refused is None:
+                    # Keep the records and retry after a pause; they are safe on disk
+                    with self._lock:
+                        self.queue.extendleft(reversed(batch))
+                        if not self._running:
+                            return
+                        self._pending.wait(1.0)
+                    continue
+
+            self.failures = 0
+            self.last_error = None
+            if refused:
+                self._dead_letter(refused)
+            self._checkpoint(batch[-1]['seq'])
+
+    def _apply_one_by_one(self, batch):
+        """[(record, reason)] for the records of a failing batch that fail on their
+        own, or None when every record fails (the database is likely down)"""
+        refused, failed = [], 0
+        for record in batch:
+            try:
+                refused.extend(self.apply_batch([record]) or [])
+            except Exception as e:
+                failed += 1
+                refused.append((record, str(e)))
+        return None if failed == len(batch) else refused
+
+    def _dead_letter(self, refused):
+        with open(self.dead_letter_path, 'ab') as f:
+            for record, reason in refused:
+                f.write(json.dumps(dict(record, error=reason), separators=(',', ':')).encode() + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.dead_lettered += len(refused)
+        for record, reason in refused:
+            log.error('Moved journaled bid %s to %s: %s', record['seq'], self.dead_letter_path, reason)
+
+    def _ready(self):
+        return bool(self.queue) and self.queue[0]['seq'] <= self.durable_seq
+
+    def _checkpoint(self, seq):
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(seq))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+        with self._lock:
+            self.applied_seq = seq
+            # Everything on disk has reached the database, so the journal can restart empty
+            if (seq == self.written_seq and seq == self.durable_seq
+                    and self._file.tell() >= self.compact_bytes):
+                self._file.truncate(0)
+                self._file.seek(0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'written_seq': self.written_seq,
+                'durable_seq': self.durable_seq,
+                'applied_seq': self.applied_seq,
+                'backlog': len(self.queue),
+                'last_error': self.last_error,
+                'dead_lettered': self.dead_lettered,
+            }
@@ -0,0 +1,256 @@
+"""
+Shill-bid watch: streaming checks over accepted bids.
+
+Request handlers only append an accepted bid to a bounded in-memory buffer,
+so bid acceptance never waits on the analysis. If the analyser falls behind,
+the oldest buffered bids are dropped (and counted) rather than the buffer
+growing. An analyser thread drains the buffer every interval and checks
+each bid against sliding-window counts:
+
+- artist_concentration: most of a bidder's bids in the window (and at least
+  artist_min_bids of them) went to one artist's lots
+- self_outbid: a bidder raised their own leading bid self_raises times
+  within self_raise_window
+- new_account: the bidder's account was created less than new_account_age
+  before the bid
+
+Counts live in count-min sketches split into time slices, so memory is fixed
+(about 6 MB per sketch) however many bidders, lots and artists there are.
+Estimates can only be too high, by the bids of other keys hashed to the
+same cells. Cells are raised conservatively, so at 200k bids per window
+nearly all estimates are exact. The heaviest bidder -> artist pairs by estimate are kept in a top-k.
+A flag is raised at most once per window for each (kind, bidder, artist or
+lot) and passed to store(flags). All state is per process.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict, deque
+
+log = logging.getLogger(__name__)
+
+
+class SlidingCountMin:
+    """Count-min sketch of the last `window` seconds, kept as `slices` sketches
+    that are cleared as they age out"""
+
+    def __init__(self, window, slices=6, width=65536, depth=4):
+        self.span = window / slices
+        self.width = width
+        self.depth = depth
+        self.tables = [array('I', [0]) * (width * depth) for _ in range(slices)]  # depth rows of width
+        self.epochs = [None] * slices
+
+    def _cells(self, key):
+        # An independent 32-bit hash per row, cut from one digest. hash() will
+        # not do: it is the identity on the integer ids, so every row would
+        # collide on the same keys
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=4 * self.depth).digest()
+        width = self.width
+        return [i * width + int.from_bytes(digest[4 * i:4 * i + 4], 'little') % width for i in range(self.depth)]
+
+    def add(self, key, now, count=1):
+        """Count key at time now; returns its cells for estimate()"""
+        epoch = int(now // self.span)
+        slot = epoch % len(self.tables)
+        if self.epochs[slot] != epoch:
+            self.tables[slot] = array('I', [0]) * (self.width * self.depth)
+            self.epochs[slot] = epoch
+        cells = self._cells(key)
+        table = self.tables[slot]
+        # Conservative update: only cells below the key's new count grow. Every
+        # cell still holds at least the count of each key hashed to it, and
+        # collisions inflate far fewer cells
+        target = min(table[cell] for cell in cells) + count
+        for cell in cells:
+            if table[cell] < target:
+                table[cell] = target
+        return cells
+
+    def estimate(self, key, now, cells=None):
+        """Count of key over the window ending at now, never less than the true count"""
+        # The smallest row. Subtracting the collisions expected from the
+        # window's total (count-mean-min) undercounts here: bids are skewed
+        # towards a few busy bidders, so most cells hold far less than the
+        # average, and an undercounted bidder total inflates artist shares
+        cells = cells or self._cells(key)
+        epoch = int(now // self.span)
+        oldest = epoch - len(self.tables) + 1
+        live = [slot for slot, slot_epoch in enumerate(self.epochs)
+                if slot_epoch is not None and oldest <= slot_epoch <= epoch]
+        return min(sum(self.tables[slot][cell] for slot in live) for cell in cells)
+
+
+class TopK:
+    """The k keys with the largest sketch estimates seen, as of each key's last update"""
+
+    def __init__(self, k=100):
+        self.k = k
+        self.counts = {}
+        self._floor = 0  # Smallest count held once full
+
+    def offer(self, key, estimate):
+        if key in self.counts or len(self.counts) < self.k:
+            self.counts[key] = estimate
+        elif estimate > self._floor:
+            # Held counts change after the floor was taken, so take it again
+            smallest = min(self.counts, key=self.counts.get)
+            self._floor = self.counts[smallest]
+            if estimate > self._floor:
+                del self.counts[smallest]
+                self.counts[key] = estimate
+
+    def top(self, n=10):
+        """[(key, estimate)], largest first"""
+        return sorted(self.counts.items(), key=lambda item: -item[1])[:n]
+
+
+class BidWatch:
+    def __init__(self, store, accounts, interval=1.0, window=86400, artist_min_bids=5, artist_share=0.8,
+                 self_raises=3, self_raise_window=600, new_account_age=3600, max_pending=100000):
+        # store(flags) -> persists flag dicts with kind, user_id, artwork_id, artist_id, details
+        # accounts(user_ids) -> {user_id: account creation time (epoch seconds)}
+        self.store = store
+        self.accounts = accounts
+        self.interval = interval
+        self.window = window
+        self.artist_min_bids = artist_min_bids
+        self.artist_share = artist_share
+        self.self_raises = self_raises
+        self.new_account_age = new_account_age
+        self.pair_bids = SlidingCountMin(window)  # (bidder, artist) -> bids
+        self.bidder_bids = SlidingCountMin(window)  # bidder -> bids on lots with an artist
+        # (bidder, lot) -> raises while leading; only leaders' bids are counted, so it can be narrower
+        self.leader_raises = SlidingCountMin(self_raise_window, width=8192)
+        self.top_pairs = TopK(100)
+        self.observed = 0
+        self.analyzed = 0
+        self.dropped = 0
+        self.flagged = Counter()  # kind -> flags raised
+        self.started_at = time.time()
+        self._events = deque(maxlen=max_pending)
+        self._joined = OrderedDict()  # Bounded cache of account creation times
+        self._raised = {}  # (kind, user, subject) -> time the flag may be raised again
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def observe(self, bidder_id, artwork_id, artist_id, amount, previous_leader, at=None):
+        """Buffer an accepted bid for analysis"""
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append((bidder_id, artwork_id, artist_id, amount, previous_leader, at or time.time()))
+        self.observed += 1
+
+    def analyze(self):
+        """Check buffered bids and store the flags raised. Returns the number of flags"""
+        with self._lock:
+            events = []
+            while self._events:
+                events.append(self._events.popleft())
+            if not events:
+                return 0
+
+            unknown = {event[0] for event in events if event[0] not in self._joined}
+            if unknown:
+                try:
+                    accounts = self.accounts(unknown)
+                except Exception:
+                    # Put the bids back for the next run, ahead of any that arrived
+                    # meanwhile; if the buffer has filled up, the oldest are dropped
+                    room = self._events.maxlen - len(self._events)
+                    kept = events[len(events) - room:] if room < len(events) else events
+                    self.dropped += len(events) - len(kept)
+                    self._events.extendleft(reversed(kept))
+                    raise
+                for user_id, joined in accounts.items():
+                    self._joined[user_id] = joined
+                while len(self._joined) > 100000:
+                    self._joined.popitem(last=False)
+
+            flags = []
+            for bidder_id, artwork_id, artist_id, amount, previous_leader, at in events:
+                joined = self._joined.get(bidder_id)
+                if joined is not None and at - joined < self.new_account_age:
+                    self._flag(flags, at, 'new_account', bidder_id, None, artwork_id, artist_id,
+                               account_age_minutes=round((at - joined) / 60, 1))
+
+                if previous_leader == bidder_id:
+                    key = (bidder_id, artwork_id)
+                    raises = self.leader_raises.estimate(key, at, self.leader_raises.add(key, at))
+                    if raises >= self.self_raises:
+                        self._flag(flags, at, 'self_outbid', bidder_id, artwork_id, artwork_id, artist_id,
+                                   raises=raises, amount=amount)
+
+                if artist_id is not None:
+                    pair = (bidder_id, artist_id)
+                    pair_bids = self.pair_bids.estimate(pair, at, self.pair_bids.add(pair, at))
+                    bidder_cells = self.bidder_bids.add(bidder_id, at)
+                    self.top_pairs.offer(pair, pair_bids)
+                    if pair_bids >= self.artist_min_bids:
+                        bidder_bids = max(self.bidder_bids.estimate(bidder_id, at, bidder_cells), pair_bids)
+                        if pair_bids >= self.artist_share * bidder_bids:
+                            self._flag(flags, at, 'artist_concentration', bidder_id, artist_id, artwork_id,
+                                       artist_id, bids=pair_bids, share=round(pair_bids / bidder_bids, 2))
+                self.analyzed += 1
+
+            if len(self._raised) > 10000:
+                now = time.time()
+                self._raised = {key: until for key, until in self._raised.items() if until > now}
+
+            if flags:
+                try:
+                    self.store(flags)
+                except Exception:
+                    # Let the same patterns raise these flags again on later bids
+                    for flag in flags:
+                        self._raised.pop(flag['dedupe_key'], None)
+                    raise
+                for flag in flags:
+                    self.flagged[flag['kind']] += 1
+            return len(flags)
+
+    def _flag(self, flags, at, kind, user_id, subject, artwork_id, artist_id, **details):
+        key = (kind, user_id, subject)
+        if self._raised.get(key, 0) > at:
+            return
+        self._raised[key] = at + self.window
+        flags.append({'kind': kind, 'user_id': user_id, 'artwork_id': artwork_id, 'artist_id': artist_id,
+                      'details': details, 'dedupe_key': key})
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.analyze()
+            except Exception:
+                # Flags that could not be stored are raised again by later bids
+                log.exception('Bid watch analysis failed')
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='bid-watch', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(5)
+        self.analyze()
+
+    def stats(self, top=10):
+        with self._lock:
+            top_pairs = self.top_pairs.top(top)
+        return {
+            'observed': self.observed,
+            'analyzed': self.analyzed,
+            'dropped': self.dropped,
+            'pending': len(self._events),
+            'flagged': dict(self.flagged),
+            'top_pairs': [
+                {'user_id': bidder_id, 'artist_id': artist_id, 'bids': count}
+                for (bidder_id, artist_id), count in top_pairs
+            ],
+            'since': self.started_at
+        }
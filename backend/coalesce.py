@@ -0,0 +1,110 @@
+"""
+Single-flight request coalescing.
+
+Identical concurrent reads wait on one in-flight computation instead of each
+running it: the first caller for a key (the leader) runs the function, and
+callers arriving before it finishes (followers) block until it does and get
+the same result. Nothing is cached afterwards, so the next request after
+the leader finishes runs again and sees fresh data.
+
+Coalescing is per process. A follower waits at most `wait_timeout` seconds
+and then runs the function itself, so a stuck leader cannot hold up other
+requests indefinitely. A follower that handed back resources while waiting
+(on_wait) must get them again first (on_resume); if it cannot, it raises
+FlightBusy instead of running, so a slow leader does not turn into every
+follower running at once.
+"""
+
+import threading
+from collections import Counter
+
+
+class FlightBusy(Exception):
+    """A follower gave up waiting and could not resume to run the call itself"""
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self, wait_timeout=10.0):
+        self.wait_timeout = wait_timeout
+        self.requests = Counter()  # route -> calls
+        self.executions = Counter()  # route -> calls that ran the function
+        self.coalesced = Counter()  # route -> calls served from another's run
+        self.timeouts = Counter()  # route -> followers that gave up waiting
+        self.peak_followers = Counter()  # route -> most followers on one run
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, route, key, fn, on_wait=None, on_resume=None):
+        """(fn(), shared): runs fn unless an identical call is in flight, in which case its result is shared.
+        on_wait() is called before a follower starts waiting; on_resume() before one that timed out runs
+        fn itself, and if it returns False FlightBusy is raised instead"""
+        with self._lock:
+            self.requests[route] += 1
+            flight = self._flights.get((route, key))
+            leader = flight is None
+            if leader:
+                flight = self._flights[(route, key)] = _Flight()
+            else:
+                flight.followers += 1
+
+        if not leader:
+            if on_wait is not None:
+                on_wait()
+            if flight.done.wait(self.wait_timeout):
+                with self._lock:
+                    self.coalesced[route] += 1
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result, True
+            with self._lock:
+                self.timeouts[route] += 1
+            if on_resume is not None and not on_resume():
+                raise FlightBusy(route)
+            with self._lock:
+                self.executions[route] += 1
+            return fn(), False
+
+        try:
+            flight.result = fn()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self.executions[route] += 1
+                self.peak_followers[route] = max(self.peak_followers[route], flight.followers)
+                del self._flights[(route, key)]
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                route: {
+                    'requests': self.requests[route],
+                    'executions': self.executions[route],
+                    'coalesced': self.coalesced[route],
+                    'timeouts': self.timeouts[route],
+                    'peak_followers': self.peak_followers[route],
+                    'in_flight': sum(1 for flight_route, _ in self._flights if flight_route == route),
+                    # Requests served per query run; 1.0 means nothing was shared
+                    'collapse_ratio': round(self.requests[route] / self.executions[route], 2)
+                    if self.executions[route] else None
+                }
+                for route in sorted(self.requests)
+            }
+
+    def reset(self):
+        with self._lock:
+            for counter in (self.requests, self.executions, self.coalesced, self.timeouts, self.peak_followers):
+                counter.clear()
@@ -0,0 +1,72 @@
+"""
+Read-replica routing for the SQLAlchemy session.
+
+Routes marked read-only set g.db_replica to a replica engine; RoutingSession
+then sends their queries there, while anything flushed (and every other
+route) keeps using the primary. ReplicaSet picks replicas round-robin and
+skips any whose replication heartbeat is older than the allowed lag.
+"""
+
+import itertools
+import threading
+import time
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context():
+            replica = g.get('db_replica')
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaSet:
+    def __init__(self, engines, read_heartbeat, max_lag=5.0, check_interval=1.0):
+        # read_heartbeat(engine) -> unix time of the last primary heartbeat seen by that replica
+        self.engines = list(engines)
+        self.read_heartbeat = read_heartbeat
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag = {}
+        self._checked_at = {}
+        self._cycle = itertools.cycle(range(len(self.engines))) if self.engines else None
+        self._lock = threading.Lock()
+
+    def replica_lag(self, index):
+        now = time.time()
+        if now - self._checked_at.get(index, 0) >= self.check_interval:
+            try:
+                beat = self.read_heartbeat(self.engines[index])
+                lag = now - beat if beat is not None else float('inf')
+            except Exception:
+                lag = float('inf')
+            with self._lock:
+                self.lag[index] = lag
+                self._checked_at[index] = now
+        return self.lag[index]
+
+    def choose(self):
+        """A replica engine within the lag budget, or None to use the primary"""
+        if not self.engines:
+            return None
+        with self._lock:
+            order = [next(self._cycle) for _ in self.engines]
+        for index in order:
+            if self.replica_lag(index) <= self.max_lag:
+                return self.engines[index]
+        return None
+
+    def status(self):
+        statuses = []
+        for index in range(len(self.engines)):
+            lag = self.lag.get(index)
+            statuses.append({
+                'replica': index,
+                'lag_seconds': None if lag is None or lag == float('inf') else round(lag, 3),
+                'healthy': lag is not None and lag <= self.max_lag
+            })
+        return statuses
@@ -0,0 +1,115 @@
+"""
+Facet counts (category, price band, artist) for the artwork filter UI.
+
+Counts are computed by a single grouped query in app.py and cached here per
+filter. Instead of being thrown away on every write, cached counts are
+patched in place when an artwork is created or a bid moves a lot into a
+different price band. The cache holds at most max_entries filters (search
+strings come from users), dropping the least recently used and the expired.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+# Matches the gallery price filter, as half-open [low, high) ranges
+PRICE_BANDS = (
+    ('0-1000', 0, 1000),
+    ('1000-3000', 1000, 3000),
+    ('3000-5000', 3000, 5000),
+    ('5000+', 5000, None),
+)
+
+
+def price_band(price):
+    for name, low, high in PRICE_BANDS:
+        if high is None or (price or 0) < high:
+            return name
+    return PRICE_BANDS[-1][0]
+
+
+def empty_facets():
+    return {'total': 0, 'category': {}, 'price_band': {}, 'artist': {}}
+
+
+def add_row(facets, category, band, artist_id, artist_name, count):
+    facets['total'] += count
+    facets['category'][category] = facets['category'].get(category, 0) + count
+    facets['price_band'][band] = facets['price_band'].get(band, 0) + count
+    artist = facets['artist'].setdefault(artist_id, {'name': artist_name, 'count': 0})
+    artist['count'] += count
+
+
+def _bump(counts, key, delta):
+    counts[key] = counts.get(key, 0) + delta
+    if counts[key] <= 0:
+        del counts[key]
+
+
+class FacetCache:
+    def __init__(self, ttl=300, max_entries=1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires, facets), least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            # Copied so callers never see a write patching it mid-serialization
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, facets):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(facets))
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._drop_expired()
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _drop_expired(self):
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def matches(key, artwork):
+        category, search = key
+        if category and artwork['category'] != category:
+            return False
+        if search:
+            needle = search.casefold()
+            return needle in (artwork['title'] or '').casefold() or needle in (artwork['description'] or '').casefold()
+        return True
+
+    def artwork_added(self, artwork):
+        """artwork: dict with category, price, artist_id, artist_name, title, description"""
+        with self._lock:
+            self._drop_expired()
+            for key, (_, facets) in self._entries.items():
+                if self.matches(key, artwork):
+                    add_row(facets, artwork['category'], price_band(artwork['price']),
+                            artwork['artist_id'], artwork['artist_name'], 1)
+
+    def price_changed(self, artwork, old_price, new_price):
+        old_band, new_band = price_band(old_price), price_band(new_price)
+        if old_band == new_band:
+            return
+        with self._lock:
+            self._drop_expired()
+            for key, (_, facets) in self._entries.items():
+                if self.matches(key, artwork):
+                    _bump(facets['price_band'], old_band, -1)
+                    _bump(facets['price_band'], new_band, 1)
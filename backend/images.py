@@ -0,0 +1,250 @@
+"""
+Artwork image pipeline: stores uploaded originals on disk and builds resized
+JPEG/WebP variants plus a blurhash placeholder in a background worker pool.
+
+Files live under <root>/<content hash>/, so every URL is immutable and can be
+cached forever by browsers and proxies.
+
+Images given by URL (bulk imports) are downloaded with fetch_original, which
+only connects to public addresses so a URL cannot reach internal services.
+The host is resolved once per hop and the connection made to the address
+that was checked, so DNS cannot answer differently in between (rebinding).
+"""
+
+import hashlib
+import http.client
+import io
+import ipaddress
+import logging
+import math
+import os
+import re
+import socket
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Uploads are refused without Pillow, URL images still work
+    Image = None
+
+log = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+VARIANT_NAME = re.compile(r'^(original\.(jpg|png|webp|gif)|\d+\.(jpg|webp))$')
+
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+def resolve_public_url(url):
+    """(url parts, port, address) for an http(s) URL whose host resolves only to public addresses"""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError('Image URL must be http or https')
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    addresses = [info[4][0].split('%')[0]
+                 for info in socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)]
+    if not addresses or not all(ipaddress.ip_address(address).is_global for address in addresses):
+        raise ValueError('Image URL must point to a public host')
+    return parts, port, addresses[0]
+
+
+class _PinnedHTTPConnection(http.client.HTTPConnection):
+    # Connects to an already vetted address; Host still names the original host
+    def __init__(self, host, port, address, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self.address = address
+
+    def connect(self):
+        self.sock = socket.create_connection((self.address, self.port), self.timeout)
+
+
+class _PinnedHTTPSConnection(http.client.HTTPSConnection):
+    # As above, with SNI and certificate checks against the original host
+    def __init__(self, host, port, address, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self.address = address
+
+    def connect(self):
+        sock = socket.create_connection((self.address, self.port), self.timeout)
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+
+
+def open_public_url(url, timeout, max_redirects=5):
+    """GET url, following redirects, connecting only to public addresses. Returns (connection, response)"""
+    for _ in range(max_redirects + 1):
+        parts, port, address = resolve_public_url(url)
+        connection_class = _PinnedHTTPSConnection if parts.scheme == 'https' else _PinnedHTTPConnection
+        connection = connection_class(parts.hostname, port, address, timeout=timeout)
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        try:
+            connection.request('GET', path, headers={'User-Agent': 'kunsthaus-image-import'})
+            response = connection.getresponse()
+        except Exception:
+            connection.close()
+            raise
+        location = response.getheader('Location')
+        if response.status in REDIRECT_STATUSES and location:
+            connection.close()
+            url = urllib.parse.urljoin(url, location)
+            continue
+        if response.status != 200:
+            connection.close()
+            raise ValueError(f'Image URL returned HTTP {response.status}')
+        return connection, response
+    raise ValueError('Image URL redirects too many times')
+
+
+class ImagePipeline:
+    def __init__(self, root, widths=(320, 640, 1280), workers=2, on_complete=None):
+        self.root = root
+        self.widths = tuple(sorted(widths))
+        self.on_complete = on_complete
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-worker')
+
+    def save_original(self, stream):
+        """Validate and store an uploaded image. Returns (image_hash, extension)"""
+        if Image is None:
+            raise ValueError('Image uploads require Pillow to be installed')
+
+        data = stream.read()
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.verify()
+                extension = ALLOWED_FORMATS.get(image.format)
+        except Exception:
+            raise ValueError('Uploaded file is not a valid image')
+        if not extension:
+            raise ValueError('Unsupported image format')
+
+        image_hash = hashlib.sha256(data).hexdigest()[:20]
+        directory = os.path.join(self.root, image_hash)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'original.{extension}')
+        if not os.path.exists(path):
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        return image_hash, extension
+
+    def fetch_original(self, url, max_bytes, timeout=10):
+        """Download an image and store it like an upload. Returns (image_hash, extension)"""
+        try:
+            connection, response = open_public_url(url, timeout)
+            try:
+                data = response.read(max_bytes + 1)
+            finally:
+                connection.close()
+        except http.client.HTTPException as e:
+            raise ValueError(f'Image download failed: {e}')
+        if len(data) > max_bytes:
+            raise ValueError('Image is too large')
+        return self.save_original(io.BytesIO(data))
+
+    def submit(self, artwork_id, image_hash, extension):
+        future = self.executor.submit(self._process, artwork_id, image_hash, extension)
+        future.add_done_callback(lambda done: self._log_failure(done, artwork_id, image_hash))
+        return future
+
+    @staticmethod
+    def _log_failure(future, artwork_id, image_hash):
+        # Nobody waits on these futures, so a failed variant or blurhash would otherwise vanish
+        error = None if future.cancelled() else future.exception()
+        if error is not None:
+            log.error('Processing image %s of artwork %s failed', image_hash, artwork_id,
+                      exc_info=(type(error), error, error.__traceback__))
+
+    def variant_path(self, image_hash, name):
+        if not re.fullmatch(r'[0-9a-f]{20}', image_hash) or not VARIANT_NAME.match(name):
+            return None
+        return os.path.join(self.root, image_hash, name)
+
+    def _process(self, artwork_id, image_hash, extension):
+        directory = os.path.join(self.root, image_hash)
+        with Image.open(os.path.join(directory, f'original.{extension}')) as original:
+            image = ImageOps.exif_transpose(original).convert('RGB')
+
+        width, height = image.size
+        widths = [w for w in self.widths if w < width] or [self.widths[0]]
+        for target in widths:
+            resized = image
+            if target < width:
+                resized = image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+            resized.save(os.path.join(directory, f'{target}.jpg'), 'JPEG', quality=82, optimize=True, progressive=True)
+            resized.save(os.path.join(directory, f'{target}.webp'), 'WEBP', quality=80, method=4)
+
+        thumb = image.copy()
+        thumb.thumbnail((32, 32))
+        metadata = {
+            'width': width,
+            'height': height,
+            'blurhash': blurhash_encode(thumb),
+            'widths': widths,
+        }
+        if self.on_complete:
+            self.on_complete(artwork_id, metadata)
+        return metadata
+
+
+# Blurhash (https://blurha.sh) encoder for small RGB Pillow images
+BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+
+def _encode83(value, length):
+    return ''.join(BASE83[(value // 83 ** (length - i)) % 83] for i in range(1, length + 1))
+
+
+def _srgb_to_linear(value):
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(value):
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def blurhash_encode(image, x_components=4, y_components=3):
+    width, height = image.size
+    pixels = [tuple(_srgb_to_linear(c) for c in pixel) for pixel in image.getdata()]
+
+    factors = []
+    for j in range(y_components):
+        cos_y = [math.cos(math.pi * j * y / height) for y in range(height)]
+        for i in range(x_components):
+            cos_x = [math.cos(math.pi * i * x / width) for x in range(width)]
+            normalisation = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                for x in range(width):
+                    basis = cos_x[x] * cos_y[y]
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = normalisation / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _encode83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        quantised_max = max(0, min(82, math.floor(max(abs(c) for f in ac for c in f) * 166 - 0.5)))
+        max_value = (quantised_max + 1) / 166
+        result += _encode83(quantised_max, 1)
+    else:
+        max_value = 1
+        result += _encode83(0, 1)
+
+    result += _encode83((_linear_to_srgb(dc[0]) << 16) + (_linear_to_srgb(dc[1]) << 8) + _linear_to_srgb(dc[2]), 4)
+
+    def quantise(value):
+        return max(0, min(18, math.floor(math.copysign(abs(value / max_value) ** 0.5, value) * 9 + 9.5)))
+
+    for r, g, b in ac:
+        result += _encode83(quantise(r) * 19 * 19 + quantise(g) * 19 + quantise(b), 2)
+    return result
@@ -0,0 +1,243 @@
+"""
+Embedded background job queue backed by a database table.
+
+Jobs are rows in the `job` table, so they survive restarts and can be worked
+by the web process's own threads or by separate `flask run-jobs` processes
+pointed at the same database. A worker claims the highest-priority due job
+with a conditional UPDATE (only one claimant wins) and holds a lease on it,
+renewed every third of the lease while the job runs; a job whose worker died
+is picked up again once the lease runs out. Failures
+are retried with exponential backoff until max_attempts is reached.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import (Column, DateTime, Float, Index, Integer, MetaData, String,
+                        Table, Text, and_, delete, func, insert, or_, select, update)
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+jobs_table = Table(
+    'job', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('name', String(80), nullable=False),
+    Column('payload', Text, nullable=False, default='{}'),
+    Column('priority', Integer, nullable=False, default=0),  # Higher runs first
+    Column('status', String(20), nullable=False, default='queued'),  # queued, running, succeeded, failed
+    Column('attempts', Integer, nullable=False, default=0),
+    Column('max_attempts', Integer, nullable=False, default=3),
+    Column('run_at', Float, nullable=False),  # Unix time the job is due
+    Column('lease_until', Float),
+    Column('locked_by', String(120)),
+    Column('idempotency_key', String(200), unique=True),
+    Column('user_id', Integer),
+    Column('result', Text),
+    Column('error', Text),
+    Column('created_at', DateTime, default=datetime.utcnow),
+    Column('started_at', DateTime),
+    Column('finished_at', DateTime),
+    Index('ix_job_due', 'status', 'priority', 'run_at'),
+)
+
+class JobQueue:
+    def __init__(self, engine, workers=2, poll_interval=0.5, lease_seconds=300,
+                 backoff_seconds=2.0, context=None):
+        self.engine = engine
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.backoff_seconds = backoff_seconds
+        # context() is entered around every handler call (e.g. app.app_context)
+        self.context = context or contextlib.nullcontext
+        self.handlers = {}
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def open(self):
+        metadata.create_all(self.engine)
+
+    def register(self, name):
+        """Decorator registering handler(payload) -> JSON-serializable result for a job name"""
+        def decorator(handler):
+            self.handlers[name] = handler
+            return handler
+        return decorator
+
+    def enqueue(self, name, payload=None, priority=0, idempotency_key=None,
+                max_attempts=3, delay=0, user_id=None):
+        """Queue a job and return its id. A repeated idempotency_key returns the existing job's id"""
+        if name not in self.handlers:
+            raise ValueError(f'Unknown job: {name}')
+        if idempotency_key:
+            existing = self._find_key(idempotency_key)
+            if existing is not None:
+                return existing
+
+        try:
+            with self.engine.begin() as connection:
+                job_id = connection.execute(insert(jobs_table).values(
+                    name=name,
+                    payload=json.dumps(payload or {}),
+                    priority=priority,
+                    status='queued',
+                    attempts=0,
+                    max_attempts=max_attempts,
+                    run_at=time.time() + delay,
+                    idempotency_key=idempotency_key,
+                    user_id=user_id,
+                    created_at=datetime.utcnow()
+                )).inserted_primary_key[0]
+        except IntegrityError:
+            # Lost a race with a concurrent enqueue of the same key
+            return self._find_key(idempotency_key)
+        self._wakeup.set()
+        return job_id
+
+    def _find_key(self, idempotency_key):
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(jobs_table.c.id).where(jobs_table.c.idempotency_key == idempotency_key)
+            ).scalar()
+
+    def get(self, job_id):
+        with self.engine.connect() as connection:
+            row = connection.execute(select(jobs_table).where(jobs_table.c.id == job_id)).mappings().first()
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def claim(self):
+        """Lease the next due job to this worker, or return None"""
+        now = time.time()
+        due = or_(
+            and_(jobs_table.c.status == 'queued', jobs_table.c.run_at <= now),
+            and_(jobs_table.c.status == 'running', jobs_table.c.lease_until < now)
+        )
+        with self.engine.begin() as connection:
+            candidates = connection.execute(
+                select(jobs_table.c.id, jobs_table.c.status)
+                .where(due, jobs_table.c.name.in_(list(self.handlers)))
+                .order_by(jobs_table.c.priority.desc(), jobs_table.c.run_at, jobs_table.c.id)
+                .limit(5)
+            ).all()
+            for job_id, status in candidates:
+                claimed = connection.execute(
+                    update(jobs_table)
+                    .where(jobs_table.c.id == job_id, jobs_table.c.status == status, due)
+                    .values(status='running', lease_until=now + self.lease_seconds,
+                            locked_by=self.worker_id, attempts=jobs_table.c.attempts + 1,
+                            started_at=datetime.utcnow())
+                ).rowcount
+                if claimed:
+                    row = connection.execute(select(jobs_table).where(jobs_table.c.id == job_id)).mappings().first()
+                    return dict(row)
+        return None
+
+    def _renew_lease(self, job_id, finished):
+        # Long jobs (index builds, backfills) outlive one lease; without renewal
+        # another worker would claim the job again while it is still running
+        while not finished.wait(self.lease_seconds / 3):
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(
+                        update(jobs_table)
+                        .where(jobs_table.c.id == job_id, jobs_table.c.locked_by == self.worker_id,
+                               jobs_table.c.status == 'running')
+                        .values(lease_until=time.time() + self.lease_seconds)
+                    )
+            except Exception:
+                log.warning('Renewing the lease of job %s failed', job_id, exc_info=True)
+
+    def run_job(self, job):
+        finished = threading.Event()
+        threading.Thread(target=self._renew_lease, args=(job['id'], finished),
+                         name=f'job-lease-{job["id"]}', daemon=True).start()
+        try:
+            with self.context():
+                result = self.handlers[job['name']](json.loads(job['payload']))
+            values = {'status': 'succeeded', 'result': json.dumps(result), 'error': None,
+                      'finished_at': datetime.utcnow()}
+        except Exception as e:
+            if job['attempts'] < job['max_attempts']:
+                delay = self.backoff_seconds * 2 ** (job['attempts'] - 1)
+                values = {'status': 'queued', 'error': str(e),
+                          'run_at': time.time() + delay * random.uniform(1, 1.5)}
+            else:
+                values = {'status': 'failed', 'error': str(e), 'finished_at': datetime.utcnow()}
+        finally:
+            finished.set()
+
+        with self.engine.begin() as connection:
+            # Only the current lease holder may record the outcome
+            connection.execute(
+                update(jobs_table)
+                .where(jobs_table.c.id == job['id'], jobs_table.c.locked_by == self.worker_id,
+                       jobs_table.c.status == 'running')
+                .values(lease_until=None, locked_by=None, **values)
+            )
+        return values['status']
+
+    def run_pending(self):
+        """Work due jobs on the calling thread until none are left. Returns how many ran"""
+        count = 0
+        while True:
+            job = self.claim()
+            if job is None:
+                return count
+            self.run_job(job)
+            count += 1
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_pending():
+                    continue
+            except Exception:
+                # Database hiccup, try again on the next poll
+                log.exception('Job worker failed to claim or record a job')
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self, timeout=5):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def purge(self, finished_before):
+        """Delete succeeded and failed jobs that finished before a datetime. Returns how many"""
+        with self.engine.begin() as connection:
+            return connection.execute(
+                delete(jobs_table).where(jobs_table.c.status.in_(('succeeded', 'failed')),
+                                         jobs_table.c.finished_at < finished_before)
+            ).rowcount
+
+    def stats(self):
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(jobs_table.c.status, func.count(jobs_table.c.id)).group_by(jobs_table.c.status)
+            ).all()
+        return {status: count for status, count in rows}
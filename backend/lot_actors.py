@@ -0,0 +1,285 @@
+"""
+Per-lot actors: every live lot is owned by one worker process, which applies
+its bids one at a time in memory and writes them to the database in batches.
+
+Workers find each other through a directory of Unix sockets, one per process
+(<socket_dir>/<name>.sock). Lots are assigned to the sockets present by
+consistent hashing on the artwork id, so when a worker joins or leaves only
+the lots on its share of the ring (about 1/N of them) change owner. Every
+worker lists the directory again each refresh interval, and drops a peer at
+once if its socket refuses connections (the process died without cleaning
+up).
+
+A bid arriving at any worker is handed to the lot's owner: directly when
+that is this process, otherwise as one JSON line over the owner's socket,
+answered with one JSON line. The owner queues the bids it receives, and a
+single actor thread drains the queue in batches. apply(bids) checks each bid
+in arrival order against the lot in memory, persists the accepted ones in
+one transaction per lot and returns a (status, body) result per bid.
+Contending bidders therefore no longer race each other for the artwork row,
+and one commit covers many bids.
+
+A bid that times out in the queue is cancelled, so a 504 always means it was
+not applied and can be sent again. Once the actor has taken a bid into a
+batch it can no longer be cancelled, and its sender waits for the result.
+
+Routing is an optimisation, not a lock. While membership is changing, two
+workers can briefly both accept bids for a lot, so apply() must still
+detect concurrent writers (the bid_version claim in app.py does).
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+from collections import Counter
+
+# Unix domain sockets are missing on Windows; LotActors refuses to start there
+SUPPORTED = hasattr(socket, 'AF_UNIX')
+
+
+def ring_hash(value):
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent hashing of keys onto members, each placed at `replicas` points on the ring"""
+
+    def __init__(self, members=(), replicas=64):
+        self.members = tuple(sorted(members))
+        points = sorted((ring_hash(f'{member}#{i}'), member) for member in self.members for i in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._owners = [member for _, member in points]
+
+    def owner(self, key):
+        if not self._owners:
+            return None
+        index = bisect.bisect(self._hashes, ring_hash(str(key))) % len(self._hashes)
+        return self._owners[index]
+
+
+class _PendingBid:
+    __slots__ = ('bid', 'done', 'result', 'taken', 'cancelled')
+
+    def __init__(self, bid):
+        self.bid = bid
+        self.done = threading.Event()
+        self.result = None
+        self.taken = False  # In a batch being applied
+        self.cancelled = False  # Timed out before it was taken
+
+
+class _PeerHandler(socketserver.StreamRequestHandler):
+    # One JSON bid per line in, one [status, body] line out
+    def handle(self):
+        for line in self.rfile:
+            self.server.actors.routed['received'] += 1
+            try:
+                status, body = self.server.actors.submit_local(json.loads(line))
+            except TimeoutError:
+                status, body = 504, {'error': 'Bid was not placed in time, please try again'}
+            self.wfile.write(json.dumps([status, body]).encode() + b'\n')
+
+
+if SUPPORTED:
+    class _PeerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+
+class LotActors:
+    def __init__(self, socket_dir, apply, name=None, refresh_interval=2.0, timeout=5.0, max_batch=500):
+        # apply(bids) -> [(status, body)] per bid, called on the actor thread only.
+        # It must only raise before it has stored any bid of the batch
+        if not SUPPORTED:
+            raise RuntimeError('Per-lot actors need Unix domain sockets, which this platform does not have')
+        self.socket_dir = socket_dir
+        self.apply = apply
+        self.name = name or str(os.getpid())
+        self.path = os.path.join(socket_dir, f'{self.name}.sock')
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.max_batch = max_batch
+        self.ring = HashRing()
+        self.rebalances = 0
+        self.peers_dropped = 0
+        self.routed = Counter()  # local, forwarded, received
+        self.batches = 0
+        self.applied = 0
+        self.largest_batch = 0
+        self.cancelled = 0
+        self._queue = queue.Queue()
+        self._pending_lock = threading.Lock()
+        self._server = None
+        self._threads = []
+        self._stop = threading.Event()
+        self._peers = threading.local()  # Connections to other workers, per request thread
+
+    # Membership
+    def open(self):
+        os.makedirs(self.socket_dir, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = _PeerServer(self.path, _PeerHandler)
+        self._server.actors = self
+        for target, name in ((self._server.serve_forever, 'lot-actors-server'),
+                             (self._run, 'lot-actor'),
+                             (self._refresh_loop, 'lot-actors-membership')):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.refresh()
+
+    def close(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def refresh(self):
+        """Rebuild the ring from the sockets in the directory; returns True if membership changed"""
+        try:
+            members = [entry[:-len('.sock')] for entry in os.listdir(self.socket_dir) if entry.endswith('.sock')]
+        except FileNotFoundError:
+            members = []
+        if self.name not in members and not self._stop.is_set():
+            members.append(self.name)
+        if tuple(sorted(members)) == self.ring.members:
+            return False
+        self.ring = HashRing(members)
+        self.rebalances += 1
+        return True
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def _drop_peer(self, member):
+        # Its socket refused a connection, so the process is gone
+        try:
+            os.unlink(os.path.join(self.socket_dir, f'{member}.sock'))
+        except FileNotFoundError:
+            pass
+        self.peers_dropped += 1
+        self.refresh()
+
+    def owner(self, artwork_id):
+        return self.ring.owner(artwork_id)
+
+    # Routing
+    def submit(self, bid):
+        """(status, body) for a bid dict with artwork_id, from whichever worker owns the lot"""
+        for _ in range(len(self.ring.members) + 1):
+            owner = self.owner(bid['artwork_id'])
+            if owner is None or owner == self.name:
+                break
+            try:
+                result = self._forward(owner, bid)
+                self.routed['forwarded'] += 1
+                return result
+            except (ConnectionRefusedError, FileNotFoundError):
+                self._drop_peer(owner)
+        self.routed['local'] += 1
+        return self.submit_local(bid)
+
+    def submit_local(self, bid):
+        pending = _PendingBid(bid)
+        self._queue.put(pending)
+        if not pending.done.wait(self.timeout):
+            with self._pending_lock:
+                if not pending.taken:
+                    pending.cancelled = True
+                    self.cancelled += 1
+                    raise TimeoutError('Bid was not placed in time, please try again')
+            # Already being applied, so the outcome is only moments away
+            pending.done.wait()
+        return pending.result
+
+    def _forward(self, owner, bid):
+        connections = self._peers.__dict__.setdefault('connections', {})
+        peer = connections.pop(owner, None)
+        if peer is not None:
+            try:
+                peer[0].sendall(json.dumps(bid).encode() + b'\n')
+            except OSError:
+                # The owner closed the kept connection (it restarted) before
+                # seeing the bid; connect again
+                peer[0].close()
+                peer = None
+        if peer is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(os.path.join(self.socket_dir, f'{owner}.sock'))
+                sock.sendall(json.dumps(bid).encode() + b'\n')
+            except OSError:
+                sock.close()
+                raise
+            peer = (sock, sock.makefile('rb'))
+        sock, reader = peer
+        # No timeout on the reply: the owner answers every bid, with 504 if it
+        # cancelled it, and timing out here could drop a bid it applied
+        sock.settimeout(None)
+        try:
+            line = reader.readline()
+        except OSError:
+            sock.close()
+            raise
+        if not line:
+            sock.close()
+            raise ConnectionResetError(f'{owner} closed the connection')
+        sock.settimeout(self.timeout)
+        connections[owner] = peer
+        status, body = json.loads(line)
+        return status, body
+
+    # The actor
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            with self._pending_lock:
+                batch = [pending for pending in batch if not pending.cancelled]
+                for pending in batch:
+                    pending.taken = True
+            if not batch:
+                continue
+            try:
+                results = self.apply([pending.bid for pending in batch])
+            except Exception as e:
+                # Nothing of the batch was stored (see __init__), so every bid may be retried
+                results = [(500, {'error': str(e)})] * len(batch)
+            self.batches += 1
+            self.applied += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for pending, result in zip(batch, results):
+                pending.result = result
+                pending.done.set()
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'members': list(self.ring.members),
+            'rebalances': self.rebalances,
+            'peers_dropped': self.peers_dropped,
+            'routed': dict(self.routed),
+            'queued': self._queue.qsize(),
+            'cancelled': self.cancelled,
+            'batches': self.batches,
+            'bids_per_batch': round(self.applied / self.batches, 2) if self.batches else None,
+            'largest_batch': self.largest_batch
+        }
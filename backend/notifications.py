@@ -0,0 +1,172 @@
+"""
+Outbid / closing-soon notification fan-out.
+
+Request handlers only publish events (an append to an in-memory buffer), so
+bid acceptance never waits on recipients or delivery. A flusher thread drains
+the buffer every flush_interval, resolves all buffered events to recipients
+in one go, coalesces repeats and hands per-user batches to dispatch(), which
+in app.py queues one delivery job per channel.
+
+Bursts are deduplicated per (user, artwork, kind): a user hears about a lot at
+most once per cooldown, and a notification held back by the cooldown is
+replaced by newer ones, so what is eventually sent carries the latest state.
+Cooldown state is per process.
+"""
+
+import json
+import logging
+import smtplib
+import threading
+import time
+import urllib.request
+from collections import deque
+from email.message import EmailMessage
+
+log = logging.getLogger(__name__)
+
+
+class NotificationHub:
+    def __init__(self, resolve, dispatch, flush_interval=1.0, cooldown=30.0):
+        # resolve(events) -> notification dicts with user_id, kind, artwork_id, message, data
+        # dispatch(batches) -> delivers {user_id: [notification, ...]}
+        self.resolve = resolve
+        self.dispatch = dispatch
+        self.flush_interval = flush_interval
+        self.cooldown = cooldown
+        self.published = 0
+        self.sent = 0
+        self.coalesced = 0
+        self._events = deque()
+        self._held = {}
+        self._next_allowed = {}
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self, kind, artwork_id, **data):
+        self._events.append({'kind': kind, 'artwork_id': artwork_id, **data})
+        self.published += 1
+
+    def flush(self):
+        """Resolve buffered events and dispatch what is due. Returns the number of notifications sent"""
+        with self._flush_lock:
+            events = []
+            while self._events:
+                events.append(self._events.popleft())
+
+            now = time.monotonic()
+            if events:
+                for notification in self.resolve(events):
+                    key = (notification['user_id'], notification['artwork_id'], notification['kind'])
+                    if key in self._held:
+                        self.coalesced += 1
+                    self._held[key] = notification
+
+            batches = {}
+            for key in [key for key in self._held if self._next_allowed.get(key, 0) <= now]:
+                notification = self._held.pop(key)
+                self._next_allowed[key] = now + self.cooldown
+                batches.setdefault(notification['user_id'], []).append(notification)
+
+            if len(self._next_allowed) > 10000:
+                self._next_allowed = {k: t for k, t in self._next_allowed.items() if t > now or k in self._held}
+
+            if batches:
+                try:
+                    self.dispatch(batches)
+                except Exception:
+                    # Hold them again so the next flush retries
+                    for batch in batches.values():
+                        for notification in batch:
+                            key = (notification['user_id'], notification['artwork_id'], notification['kind'])
+                            self._held.setdefault(key, notification)
+                            self._next_allowed.pop(key, None)
+                    raise
+            count = sum(len(batch) for batch in batches.values())
+            self.sent += count
+            return count
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Undispatched notifications stay held for the next flush
+                log.exception('Flushing notifications failed')
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='notification-flusher', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(5)
+        self.flush()
+
+    def stats(self):
+        return {
+            'published': self.published,
+            'sent': self.sent,
+            'coalesced': self.coalesced,
+            'buffered': len(self._events),
+            'held': len(self._held)
+        }
+
+
+# Delivery channels. deliver() receives a list of per-user batches:
+# {'user_id': ..., 'username': ..., 'email': ..., 'notifications': [...]}
+
+class InboxChannel:
+    """In-app inbox; store(rows) bulk-inserts one row per notification"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def deliver(self, batches):
+        self.store([
+            dict(notification, user_id=batch['user_id'])
+            for batch in batches
+            for notification in batch['notifications']
+        ])
+
+
+class EmailChannel:
+    """One digest email per user per batch, over a single SMTP connection"""
+
+    def __init__(self, host='localhost', port=1025, sender='notifications@localhost'):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def deliver(self, batches):
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            for batch in batches:
+                if not batch.get('email'):
+                    continue
+                notifications = batch['notifications']
+                message = EmailMessage()
+                message['From'] = self.sender
+                message['To'] = batch['email']
+                message['Subject'] = notifications[0]['message'] if len(notifications) == 1 \
+                    else f'{len(notifications)} updates on your auctions'
+                message.set_content('\n'.join(n['message'] for n in notifications))
+                smtp.send_message(message)
+
+
+class WebhookChannel:
+    """POSTs all batches as one JSON document"""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, batches):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({'batches': batches}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
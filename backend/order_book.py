@@ -0,0 +1,119 @@
+"""
+In-process order book for live lots.
+
+Holds the current leader, bid count and the last K bids of every artwork so
+price reads and minimum-bid checks are dictionary lookups instead of
+MAX()/COUNT() queries. Each lot remembers the artwork's bid_version it was
+loaded at; callers pass in the version from the artwork row they already
+fetched, and a mismatch (another worker accepted a bid) reloads the lot.
+A bid is only applied to the lot at the version it was claimed from, so a
+lot reloaded in between never counts the same bid twice.
+"""
+
+import threading
+from collections import deque
+
+
+class Lot:
+    __slots__ = ('artwork_id', 'starting_price', 'version', 'bid_count', 'recent')
+
+    def __init__(self, artwork_id, starting_price, version, bid_count, recent, depth):
+        self.artwork_id = artwork_id
+        self.starting_price = starting_price
+        self.version = version
+        self.bid_count = bid_count
+        # (bid_id, user_id, amount, created_at), newest first. Accepted bids
+        # always raise the price, so the newest bid is also the leader.
+        self.recent = deque(recent, maxlen=depth)
+
+    @property
+    def leader(self):
+        return self.recent[0] if self.recent else None
+
+    @property
+    def highest_bid(self):
+        return self.recent[0][2] if self.recent else None
+
+    @property
+    def current_price(self):
+        return self.highest_bid if self.recent else self.starting_price
+
+
+class OrderBook:
+    def __init__(self, load_lot, load_all, depth=10, ladder=((0, 50),)):
+        # load_lot(artwork_id) -> (bid_count, recent bids newest first)
+        # load_all() -> iterable of (artwork_id, bid_count, recent bids newest first)
+        self.load_lot = load_lot
+        self.load_all = load_all
+        self.depth = depth
+        self.ladder = sorted(ladder)
+        self.lots = {}
+        self.warmed = False
+        self.hits = 0
+        self.reloads = 0
+        self._lock = threading.Lock()
+
+    def increment_for(self, amount):
+        increment = self.ladder[0][1]
+        for threshold, step in self.ladder:
+            if amount >= threshold:
+                increment = step
+        return increment
+
+    def minimum_bid(self, lot):
+        highest = lot.highest_bid or 0
+        return max(lot.starting_price, highest + self.increment_for(highest))
+
+    def warm(self, artworks):
+        """Load every lot in one pass. artworks: iterable of (artwork_id, starting_price, version)"""
+        bids = {artwork_id: (count, recent) for artwork_id, count, recent in self.load_all()}
+        with self._lock:
+            for artwork_id, starting_price, version in artworks:
+                count, recent = bids.get(artwork_id, (0, []))
+                self.lots[artwork_id] = Lot(artwork_id, starting_price, version or 0, count, recent, self.depth)
+            self.warmed = True
+
+    def lot(self, artwork_id, starting_price, version):
+        """Lot for an artwork row, reloaded from the database if its version moved on"""
+        version = version or 0
+        lot = self.lots.get(artwork_id)
+        if lot is not None and lot.version == version:
+            self.hits += 1
+            lot.starting_price = starting_price
+            return lot
+
+        count, recent = self.load_lot(artwork_id)
+        lot = Lot(artwork_id, starting_price, version, count, recent, self.depth)
+        with self._lock:
+            self.reloads += 1
+            current = self.lots.get(artwork_id)
+            # Never replace a lot that has already seen a newer version
+            if current is None or current.version <= version:
+                self.lots[artwork_id] = lot
+        return lot
+
+    def record_bid(self, artwork_id, bid, version, previous=None):
+        """Apply an accepted bid (bid_id, user_id, amount, created_at) that moved the
+        lot from `previous` (version - 1 unless given) to `version`"""
+        previous = version - 1 if previous is None else previous
+        with self._lock:
+            lot = self.lots.get(artwork_id)
+            if lot is None:
+                return
+            if lot.version != previous:
+                # Another thread reloaded the lot after the bid was claimed. A
+                # reload at `version` or later already holds the bid; anything
+                # older is missing it and must be loaded again
+                if lot.version < version:
+                    del self.lots[artwork_id]
+                return
+            lot.recent.appendleft(bid)
+            lot.bid_count += 1
+            lot.version = version
+
+    def invalidate(self, artwork_id):
+        with self._lock:
+            self.lots.pop(artwork_id, None)
+
+    def stats(self):
+        return {'lots': len(self.lots), 'hits': self.hits, 'reloads': self.reloads}
@@ -0,0 +1,170 @@
+"""
+Sampling profiler for API requests.
+
+Requests opted in to profiling register their thread; one sampler thread
+wakes every `interval` seconds, reads the registered threads' current Python
+stacks with sys._current_frames() and counts them per route. Unprofiled
+requests cost a dictionary check, and profiled ones are never interrupted.
+
+Counts are periodically written to <root>/<route>.<pid>.collapsed, so every
+worker process contributes and the files survive restarts. They are served in
+Brendan Gregg's collapsed-stack format (flamegraph.pl, speedscope, inferno)
+or as a speedscope JSON document.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+ROUTE_NAME = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def frame_name(code):
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def collapse(frame):
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    def __init__(self, root, interval=0.005, dump_interval=10.0):
+        self.root = root
+        self.interval = interval
+        self.dump_interval = dump_interval
+        self.samples = {}  # route -> Counter of collapsed stacks
+        self.requests = Counter()
+        self._active = {}  # thread id -> route
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._dirty = False
+
+    def begin(self, route):
+        with self._lock:
+            self._active[threading.get_ident()] = route
+            self.requests[route] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def end(self):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+
+    def _run(self):
+        last_dump = time.monotonic()
+        while True:
+            if not self._active:
+                self._wakeup.wait(self.dump_interval)
+                self._wakeup.clear()
+            else:
+                time.sleep(self.interval)
+
+            with self._lock:
+                active = dict(self._active)
+            if active:
+                frames = sys._current_frames()
+                stacks = [(route, collapse(frames[tid])) for tid, route in active.items() if tid in frames]
+                with self._lock:
+                    for route, stack in stacks:
+                        self.samples.setdefault(route, Counter())[stack] += 1
+                    self._dirty = self._dirty or bool(stacks)
+
+            if self._dirty and time.monotonic() - last_dump >= self.dump_interval:
+                try:
+                    self.dump()
+                except OSError:
+                    pass
+                last_dump = time.monotonic()
+
+    def path_for(self, route, pid=None):
+        return os.path.join(self.root, f'{route}.{pid or os.getpid()}.collapsed')
+
+    def dump(self):
+        """Write this process's counts, one file per route"""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            snapshot = {route: dict(counts) for route, counts in self.samples.items()}
+            self._dirty = False
+        for route, counts in snapshot.items():
+            path = self.path_for(route)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                for stack, count in counts.items():
+                    f.write(f'{stack} {count}\n')
+            os.replace(path + '.tmp', path)
+
+    def merged(self, route):
+        """Counts for a route across every process that has written them"""
+        if not ROUTE_NAME.match(route):
+            return Counter()
+        self.dump()
+        counts = Counter()
+        prefix = f'{route}.'
+        for name in os.listdir(self.root):
+            rest = name[len(prefix):]
+            if not name.startswith(prefix) or not rest.endswith('.collapsed') or not rest[:-len('.collapsed')].isdigit():
+                continue
+            with open(os.path.join(self.root, name), encoding='utf-8') as f:
+                for line in f:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack:
+                        counts[stack] += int(count)
+        return counts
+
+    def routes(self):
+        """Sample totals per route across processes"""
+        self.dump()
+        names = {name.split('.', 1)[0] for name in os.listdir(self.root) if name.endswith('.collapsed')}
+        return {route: sum(self.merged(route).values()) for route in sorted(names)}
+
+    def collapsed(self, route):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.merged(route).most_common())
+
+    def speedscope(self, route):
+        frames, index = [], {}
+        samples, weights = [], []
+        for stack, count in self.merged(route).most_common():
+            sample = []
+            for name in stack.split(';'):
+                if name not in index:
+                    index[name] = len(frames)
+                    function, _, location = name.rpartition(' (')
+                    file, _, line = location.rstrip(')').rpartition(':')
+                    frames.append({'name': function, 'file': file, 'line': int(line) if line.isdigit() else None})
+                sample.append(index[name])
+            samples.append(sample)
+            weights.append(count * self.interval * 1000)
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': route,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights
+            }],
+            'name': f'{route} (sampled every {self.interval * 1000:g} ms)',
+            'exporter': 'kunsthaus profiler'
+        }
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+            self.requests.clear()
+            self._dirty = False
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith('.collapsed'):
+                    os.remove(os.path.join(self.root, name))
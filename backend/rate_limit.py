@@ -0,0 +1,140 @@
+"""
+Token-bucket rate limiting and concurrency admission control for the API
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+
+
+class MemoryBucketStore:
+    """Keeps token buckets in process memory (one store per worker)"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated, rate, burst), least recently used first
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now=None):
+        """Take one token from the bucket. Returns (allowed, retry_after_seconds)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated, _, _ = self._buckets.pop(key, (burst, now, rate, burst))
+            tokens = min(burst, tokens + (now - updated) * rate)
+
+            if tokens >= 1:
+                tokens, allowed, retry_after = tokens - 1, True, 0
+            else:
+                allowed, retry_after = False, (1 - tokens) / rate
+            self._buckets[key] = (tokens, now, rate, burst)
+
+            if len(self._buckets) > self.max_keys:
+                self._evict(now)
+
+        return allowed, retry_after
+
+    def _evict(self, now, scan=8):
+        # Among the least recently used few, prefer a bucket that has refilled
+        # completely (by its own budget), as it carries no state worth keeping
+        for key, (tokens, updated, rate, burst) in islice(self._buckets.items(), scan):
+            if tokens + (now - updated) * rate >= burst:
+                del self._buckets[key]
+                return
+        self._buckets.popitem(last=False)
+
+
+class RedisBucketStore:
+    """Keeps token buckets in a Redis-compatible server shared by all workers"""
+
+    SCRIPT = """
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local tokens = tonumber(bucket[1]) or burst
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url, prefix='ratelimit:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._script = self.client.register_script(self.SCRIPT)
+
+    def take(self, key, rate, burst, now=None):
+        now = time.time() if now is None else now
+        allowed, tokens = self._script(keys=[self.prefix + key], args=[rate, burst, now])
+        if allowed:
+            return True, 0
+        return False, (1 - float(tokens)) / rate
+
+
+def create_bucket_store(url=None):
+    """Build a bucket store from a storage URL ('memory://' or 'redis://...')"""
+    if not url or url.startswith('memory://'):
+        return MemoryBucketStore()
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisBucketStore(url)
+    raise ValueError(f'Unsupported rate limit storage: {url}')
+
+
+class RateLimiter:
+    """Applies per-route (rate, burst) budgets on top of a bucket store"""
+
+    def __init__(self, store, budgets, default_budget=None):
+        self.store = store
+        self.budgets = budgets
+        self.default_budget = default_budget
+
+    def budget_for(self, route):
+        return self.budgets.get(route, self.default_budget)
+
+    def hit(self, route, client_key):
+        """Returns None if the request may proceed, otherwise whole seconds to wait"""
+        budget = self.budget_for(route)
+        if not budget:
+            return None
+
+        rate, burst = budget
+        allowed, retry_after = self.store.take(f'{route}:{client_key}', rate, burst)
+        if allowed:
+            return None
+        return max(1, math.ceil(retry_after))
+
+
+class AdmissionController:
+    """Caps the number of requests in flight so excess load is shed early"""
+
+    def __init__(self, max_in_flight, queue_timeout=0.05):
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    def acquire(self):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
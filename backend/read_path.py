@@ -0,0 +1,185 @@
+"""
+Read-only data access for the hot listing endpoints.
+
+ORM queries build a tracked instance per row (identity map entry, attribute
+state, change history) that the listing routes only copy into dicts. The
+routes in app.py instead select just the columns a response needs with
+SQLAlchemy Core and wrap each result row in one of the __slots__ records
+below. Records use the model's attribute names, so helpers such as
+artwork_image_url and get_lot accept either.
+
+A FieldSet describes what a listing can return, so a request can ask for
+some fields only (`fields=id,title` or a named view such as `card`). Columns
+no requested field reads are selected as NULL, which keeps the record
+shapes fixed while the database never reads them.
+"""
+
+from math import ceil
+
+from sqlalchemy import func, select
+
+
+class ArtworkRow:
+    __slots__ = ('id', 'title', 'description', 'category', 'price', 'image_url', 'image_hash',
+                 'image_variants', 'image_width', 'image_height', 'image_blurhash', 'created_at',
+                 'artist_name')
+
+    def __init__(self, id, title, description, category, price, image_url, image_hash,
+                 image_variants, image_width, image_height, image_blurhash, created_at, artist_name):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.category = category
+        self.price = price
+        self.image_url = image_url
+        self.image_hash = image_hash
+        self.image_variants = image_variants
+        self.image_width = image_width
+        self.image_height = image_height
+        self.image_blurhash = image_blurhash
+        self.created_at = created_at
+        self.artist_name = artist_name
+
+
+class AuctionRow:
+    __slots__ = ('id', 'title', 'description', 'category', 'price', 'image_url', 'image_hash',
+                 'image_variants', 'image_blurhash', 'status', 'ends_at', 'bid_version',
+                 'change_version', 'artist_name')
+
+    def __init__(self, id, title, description, category, price, image_url, image_hash,
+                 image_variants, image_blurhash, status, ends_at, bid_version, change_version, artist_name):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.category = category
+        self.price = price
+        self.image_url = image_url
+        self.image_hash = image_hash
+        self.image_variants = image_variants
+        self.image_blurhash = image_blurhash
+        self.status = status
+        self.ends_at = ends_at
+        self.bid_version = bid_version
+        self.change_version = change_version
+        self.artist_name = artist_name
+
+
+class ArtistRow:
+    __slots__ = ('id', 'name', 'bio', 'specialty', 'profile_image', 'featured', 'artwork_count',
+                 'total_sales', 'last_activity_at', 'created_at')
+
+    def __init__(self, id, name, bio, specialty, profile_image, featured, artwork_count,
+                 total_sales, last_activity_at, created_at):
+        self.id = id
+        self.name = name
+        self.bio = bio
+        self.specialty = specialty
+        self.profile_image = profile_image
+        self.featured = featured
+        self.artwork_count = artwork_count
+        self.total_sales = total_sales
+        self.last_activity_at = last_activity_at
+        self.created_at = created_at
+
+
+class BidRow:
+    __slots__ = ('id', 'amount', 'created_at', 'bidder_name')
+
+    def __init__(self, id, amount, created_at, bidder_name):
+        self.id = id
+        self.amount = amount
+        self.created_at = created_at
+        self.bidder_name = bidder_name
+
+
+class Projection:
+    __slots__ = ('names', 'columns', 'plan')
+
+    def __init__(self, names, columns, plan):
+        self.names = names
+        self.columns = columns  # Record attributes the requested fields read
+        self.plan = plan  # (parent or None, key, render) per field
+
+    def render(self, record, options=None):
+        out = {}
+        for parent, key, render in self.plan:
+            if parent is None:
+                out[key] = render(record, options)
+            else:
+                out.setdefault(parent, {})[key] = render(record, options)
+        return out
+
+
+class FieldSet:
+    """
+    Fields of a listing response: name -> (record attributes it reads,
+    render(record, options)). Dotted names ('artwork.title') render into
+    nested objects, and the parent ('artwork') stands for all its children.
+    Views name tuples of fields.
+    """
+
+    def __init__(self, fields, views):
+        self.fields = fields
+        self.views = dict(views, detail=tuple(fields))
+        self._projections = {}
+
+    def expand(self, name):
+        if name in self.views:
+            return self.views[name]
+        if name in self.fields:
+            return (name,)
+        children = tuple(field for field in self.fields if field.startswith(name + '.'))
+        if children:
+            return children
+        raise ValueError(f'Unknown field: {name}')
+
+    def projection(self, fields=None, view=None, default='detail'):
+        """Projection for a comma-separated `fields` list and/or a view, else the default view"""
+        key = (fields, view, default)
+        projection = self._projections.get(key)
+        if projection is not None:
+            return projection
+
+        if view and view not in self.views:
+            raise ValueError(f"view must be one of: {', '.join(self.views)}")
+        requested = [name.strip() for name in (fields or '').split(',') if name.strip()]
+        if view:
+            requested.append(view)
+        if not requested:
+            requested = [default]
+
+        names = []
+        for name in requested:
+            names.extend(field for field in self.expand(name) if field not in names)
+        columns = set()
+        plan = []
+        for name in names:
+            field_columns, render = self.fields[name]
+            columns.update(field_columns)
+            parent, _, key = name.rpartition('.')
+            plan.append((parent or None, key, render))
+        projection = Projection(tuple(names), frozenset(columns), tuple(plan))
+
+        # Keys come from query strings, so only a bounded number is kept
+        if len(self._projections) < 256:
+            self._projections[key] = projection
+        return projection
+
+
+def fetch(session, statement, record):
+    """Run a Core select and wrap every row, whose columns are in the record's __slots__ order"""
+    return [record(*row) for row in session.execute(statement)]
+
+
+def paginate(session, statement, record, page, per_page):
+    """(records, pagination dict) with the same page clamping as Flask-SQLAlchemy's paginate"""
+    page = max(page, 1)
+    per_page = per_page if per_page >= 1 else 20
+    total = session.execute(select(func.count()).select_from(statement.order_by(None).subquery())).scalar()
+    records = fetch(session, statement.limit(per_page).offset((page - 1) * per_page), record)
+    return records, {
+        'page': page,
+        'pages': ceil(total / per_page) if total else 0,
+        'per_page': per_page,
+        'total': total
+    }
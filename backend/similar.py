@@ -0,0 +1,419 @@
+"""
+"Similar artworks" index over text and co-bidding signals.
+
+Every artwork is one fixed-width float32 row: a TF-IDF vector of its title,
+description, category and artist specialty, hashed into `text_dim` columns,
+followed by the set of users who bid on it, hashed into `bid_dim` columns
+(prolific bidders count for less, like frequent words). Both halves are unit
+length and scaled so a dot product is a weighted sum of the two cosines.
+
+A build writes the rows to <root>/gen-<n>/vectors.f32 and the artwork ids to
+ids.i64, then points <root>/CURRENT at the new generation. Readers map the
+files and score queries in batches of rows, so one query is a few matrix
+products and several queries can share a pass over the matrix. New artworks
+are appended to the current generation under a file lock; every process sees
+them on its next query. Without numpy the same files are scored in pure
+Python, which is only meant for small catalogs.
+"""
+
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from operator import mul
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    import numpy as np
+except ImportError:  # Scored in pure Python
+    np = None
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on path, shared by every process on the machine"""
+    with open(path, 'w') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+            return
+        # Locks the first byte; LK_LOCK retries for about 10 seconds before raising
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+HASH_BITS = 20  # Document frequencies are kept per hashed token
+HASH_MASK = (1 << HASH_BITS) - 1
+WORD = re.compile(r'[^\W\d_]{2,}')
+STOPWORDS = frozenset('an and are as at be by for from in into is it its of on or the this to with'.split())
+BATCH_ROWS = 65536
+
+
+def text_features(*fields):
+    """Token hash -> term count for the given text fields"""
+    words = WORD.findall(' '.join(field for field in fields if field).lower())
+    return Counter(zlib.crc32(word.encode('utf-8')) for word in words if word not in STOPWORDS)
+
+
+def bidder_hash(user_id):
+    return zlib.crc32(b'user:%d' % user_id)
+
+
+class SimilarIndex:
+    def __init__(self, root, text_dim=192, bid_dim=64, bid_weight=0.3, cache_size=1024):
+        self.root = root
+        self.text_dim = text_dim
+        self.bid_dim = bid_dim
+        self.bid_weight = bid_weight
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self._generation = None
+        self._rows = 0
+        self._ids = None
+        self._vectors = None
+        self._row_index = {}  # id -> row for ids the sorted search cannot find (all of them without numpy)
+        self._built_rows = 0
+        self._df = None
+        self._docs = 0
+
+    @property
+    def dim(self):
+        return self.text_dim + self.bid_dim
+
+    # Vectors
+
+    def _idf(self, df, docs):
+        if np is not None:
+            return (np.log((1 + docs) / (1 + df.astype(np.float64))) + 1).astype(np.float32)
+        return [math.log((1 + docs) / (1 + count)) + 1 for count in df]
+
+    def _vector(self, features, bidders, idf, bidder_weights=None):
+        """One row as a list of floats, for appends and the pure-Python build. idf(hashed token) -> weight"""
+        text = [0.0] * self.text_dim
+        for h, count in features.items():
+            text[(h >> 8) % self.text_dim] += (-1 if h >> 31 else 1) * (1 + math.log(count)) * idf(h & HASH_MASK)
+        bids = [0.0] * self.bid_dim
+        for user_id in bidders:
+            h = bidder_hash(user_id)
+            bids[h % self.bid_dim] += (-1 if h >> 31 else 1) * (bidder_weights or {}).get(user_id, 1.0)
+        row = []
+        for part, weight in ((text, 1 - self.bid_weight), (bids, self.bid_weight)):
+            norm = math.sqrt(sum(x * x for x in part))
+            scale = math.sqrt(weight) / norm if norm else 0.0
+            row.extend(x * scale for x in part)
+        return row
+
+    # Building
+
+    def build(self, documents, bids=()):
+        """Write a new generation from (artwork_id, text fields) and (artwork_id, user_id) pairs.
+
+        Documents must come in ascending artwork id order.
+        """
+        started = time.perf_counter()
+        ids, lengths, hashes, counts = array('q'), array('I'), array('I'), array('H')
+        for artwork_id, fields in documents:
+            features = text_features(*fields)
+            ids.append(artwork_id)
+            lengths.append(len(features))
+            hashes.extend(features.keys())
+            counts.extend(min(count, 65535) for count in features.values())
+
+        bidders_by_artwork, lots_per_bidder = {}, Counter()
+        for artwork_id, user_id in set(bids):
+            bidders_by_artwork.setdefault(artwork_id, []).append(user_id)
+            lots_per_bidder[user_id] += 1
+        bidder_weights = {user_id: 1 / math.sqrt(lots) for user_id, lots in lots_per_bidder.items()}
+
+        generation = f'gen-{time.time_ns()}'
+        path = os.path.join(self.root, generation)
+        os.makedirs(path)
+        if np is not None:
+            df = self._build_numpy(path, ids, lengths, hashes, counts, bidders_by_artwork, bidder_weights)
+        else:
+            df = self._build_python(path, ids, lengths, hashes, counts, bidders_by_artwork, bidder_weights)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'text_dim': self.text_dim, 'bid_dim': self.bid_dim, 'bid_weight': self.bid_weight,
+                       'documents': len(ids), 'built_at': time.time()}, f)
+        with open(os.path.join(path, 'df.i32'), 'wb') as f:
+            df.tofile(f)
+        # Written last: readers count rows from it
+        with open(os.path.join(path, 'ids.i64'), 'wb') as f:
+            ids.tofile(f)
+
+        with open(os.path.join(self.root, 'CURRENT.tmp'), 'w') as f:
+            f.write(generation)
+        os.replace(os.path.join(self.root, 'CURRENT.tmp'), os.path.join(self.root, 'CURRENT'))
+        # Keep the previous generation for readers that have not switched yet
+        old = sorted(name for name in os.listdir(self.root) if name.startswith('gen-') and name != generation)
+        for name in old[:-1]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+        self.refresh()
+        return {'artworks': len(ids), 'bidders': len(lots_per_bidder),
+                'seconds': round(time.perf_counter() - started, 3)}
+
+    def _build_numpy(self, path, ids, lengths, hashes, counts, bidders_by_artwork, bidder_weights):
+        hashes = np.frombuffer(hashes, dtype=np.uint32).astype(np.int64)
+        counts = np.frombuffer(counts, dtype=np.uint16)
+        lengths = np.frombuffer(lengths, dtype=np.uint32)
+        df = np.bincount(hashes & HASH_MASK, minlength=HASH_MASK + 1).astype(np.int32)
+        idf = self._idf(df, len(ids))
+
+        columns = (hashes >> 8) % self.text_dim
+        weights = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32) * (1 + np.log(counts.astype(np.float32))) \
+            * idf[hashes & HASH_MASK]
+        offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+
+        bid_rows, bid_columns, bid_values = [], [], []
+        row_of = {artwork_id: row for row, artwork_id in enumerate(ids)}
+        for artwork_id, users in bidders_by_artwork.items():
+            row = row_of.get(artwork_id)
+            if row is None:
+                continue
+            for user_id in users:
+                h = bidder_hash(user_id)
+                bid_rows.append(row)
+                bid_columns.append(h % self.bid_dim)
+                bid_values.append((-1 if h >> 31 else 1) * bidder_weights[user_id])
+        order = np.argsort(np.asarray(bid_rows, dtype=np.int64), kind='stable')
+        bid_rows = np.asarray(bid_rows, dtype=np.int64)[order]
+        bid_columns = np.asarray(bid_columns, dtype=np.int64)[order]
+        bid_values = np.asarray(bid_values, dtype=np.float32)[order]
+
+        if not len(ids):
+            open(os.path.join(path, 'vectors.f32'), 'wb').close()
+            return df
+        vectors = np.memmap(os.path.join(path, 'vectors.f32'), dtype=np.float32, mode='w+',
+                            shape=(len(ids), self.dim))
+        for start in range(0, len(ids), BATCH_ROWS):
+            end = min(start + BATCH_ROWS, len(ids))
+            lo, hi = offsets[start], offsets[end]
+            rows = np.repeat(np.arange(end - start), lengths[start:end])
+            text = np.bincount(rows * self.text_dim + columns[lo:hi], weights=weights[lo:hi],
+                               minlength=(end - start) * self.text_dim).reshape(end - start, self.text_dim)
+
+            b_lo, b_hi = np.searchsorted(bid_rows, [start, end])
+            bid_block = np.bincount((bid_rows[b_lo:b_hi] - start) * self.bid_dim + bid_columns[b_lo:b_hi],
+                                    weights=bid_values[b_lo:b_hi],
+                                    minlength=(end - start) * self.bid_dim).reshape(end - start, self.bid_dim)
+
+            for block, weight, columns_slice in ((text, 1 - self.bid_weight, slice(0, self.text_dim)),
+                                                 (bid_block, self.bid_weight, slice(self.text_dim, None))):
+                norms = np.linalg.norm(block, axis=1, keepdims=True)
+                np.divide(block * math.sqrt(weight), norms, out=block, where=norms > 0)
+                vectors[start:end, columns_slice] = block
+        vectors.flush()
+        del vectors
+        return df
+
+    def _build_python(self, path, ids, lengths, hashes, counts, bidders_by_artwork, bidder_weights):
+        df = array('i', bytes(4 * (HASH_MASK + 1)))
+        for h in hashes:
+            df[h & HASH_MASK] += 1
+        idf = self._idf(df, len(ids))
+        with open(os.path.join(path, 'vectors.f32'), 'wb') as f:
+            offset = 0
+            for row, artwork_id in enumerate(ids):
+                end = offset + lengths[row]
+                features = dict(zip(hashes[offset:end], counts[offset:end]))
+                offset = end
+                vector = self._vector(features, bidders_by_artwork.get(artwork_id, ()), idf.__getitem__,
+                                      bidder_weights)
+                array('f', vector).tofile(f)
+        return df
+
+    # Reading
+
+    def _current(self):
+        try:
+            with open(os.path.join(self.root, 'CURRENT')) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def refresh(self):
+        """Pick up a new generation or rows appended by any process. Returns False if nothing is built"""
+        generation = self._current()
+        if generation is None:
+            return False
+        path = os.path.join(self.root, generation)
+        try:
+            rows = os.path.getsize(os.path.join(path, 'ids.i64')) // 8
+        except FileNotFoundError:
+            return self._generation is not None  # Replaced under us, keep the mapped one
+        with self._lock:
+            if generation == self._generation and rows == self._rows:
+                return True
+            if generation != self._generation:
+                with open(os.path.join(path, 'meta.json')) as f:
+                    meta = json.load(f)
+                self.text_dim, self.bid_dim, self.bid_weight = meta['text_dim'], meta['bid_dim'], meta['bid_weight']
+                self._docs = meta['documents']
+                self._df = self._load(os.path.join(path, 'df.i32'), 'i')
+            if np is not None:
+                # Mapped rather than read, so picking up one appended row stays cheap
+                self._ids = np.memmap(os.path.join(path, 'ids.i64'), dtype=np.int64, mode='r', shape=(rows,)) \
+                    if rows else np.zeros(0, np.int64)
+                self._vectors = np.memmap(os.path.join(path, 'vectors.f32'), dtype=np.float32, mode='r',
+                                          shape=(rows, self.dim)) if rows else np.zeros((0, self.dim), np.float32)
+                # Built rows are sorted by id; appends usually are too
+                if generation != self._generation:
+                    self._built_rows = meta['documents']
+                self._row_index = {int(self._ids[row]): row for row in range(self._built_rows, rows)
+                                   if row and self._ids[row] <= self._ids[row - 1]}
+            else:
+                self._ids = self._load(os.path.join(path, 'ids.i64'), 'q', rows)
+                self._vectors = self._load(os.path.join(path, 'vectors.f32'), 'f', rows * self.dim)
+                self._row_index = {artwork_id: row for row, artwork_id in enumerate(self._ids)}
+            self._generation, self._rows = generation, rows
+            self._cache.clear()
+        return True
+
+    def _load(self, path, typecode, count=None):
+        if np is not None:
+            return np.fromfile(path, dtype={'i': np.int32, 'q': np.int64}[typecode], count=-1 if count is None else count)
+        values = array(typecode)
+        with open(path, 'rb') as f:
+            values.frombytes(f.read() if count is None else f.read(count * values.itemsize))
+        return values
+
+    def _row(self, artwork_id):
+        if np is not None:
+            row = int(np.searchsorted(self._ids, artwork_id))
+            if row < self._rows and self._ids[row] == artwork_id:
+                return row
+        return self._row_index.get(artwork_id)
+
+    def __contains__(self, artwork_id):
+        return self.refresh() and self._row(artwork_id) is not None
+
+    # Updates
+
+    def add(self, artwork_id, fields, bidders=()):
+        """Append an artwork to the current generation, scored with its document frequencies"""
+        return self.add_many([(artwork_id, fields, bidders)]) == 1
+
+    def add_many(self, items):
+        """Append (artwork_id, fields, bidders) items in one write. Returns how many were added"""
+        if not self.refresh():
+            return 0
+        items = [item for item in items if item[0] not in self]
+        if not items:
+            return 0
+        with self._lock:
+            df, docs = self._df, self._docs
+            idf = lambda h: math.log((1 + docs) / (1 + int(df[h]))) + 1
+            vectors, ids = array('f'), array('q')
+            for artwork_id, fields, bidders in items:
+                vectors.extend(self._vector(text_features(*fields), bidders, idf))
+                ids.append(artwork_id)
+            path = os.path.join(self.root, self._generation)
+            with file_lock(os.path.join(path, 'append.lock')):
+                rows = os.path.getsize(os.path.join(path, 'ids.i64')) // 8
+                # Rows are counted from ids.i64, so the vectors must land first
+                with open(os.path.join(path, 'vectors.f32'), 'r+b') as f:
+                    f.seek(rows * self.dim * 4)
+                    f.write(vectors.tobytes())
+                with open(os.path.join(path, 'ids.i64'), 'ab') as f:
+                    f.write(ids.tobytes())
+        self.refresh()
+        return len(items)
+
+    # Queries
+
+    def similar(self, artwork_id, k=10):
+        """[(artwork_id, score)] of the k best matches, best first"""
+        if not self.refresh():
+            return []
+        key = (artwork_id, k)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        result = self.similar_many([artwork_id], k)[0]
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def similar_many(self, artwork_ids, k=10):
+        """Score several artworks in one pass over the matrix"""
+        if not self.refresh():
+            return [[] for _ in artwork_ids]
+        with self._lock:
+            ids, vectors, total = self._ids, self._vectors, self._rows
+            rows = [self._row(artwork_id) for artwork_id in artwork_ids]
+        known = [row for row in rows if row is not None]
+        if not known:
+            return [[] for _ in artwork_ids]
+        if np is not None:
+            found = self._top_numpy(ids, vectors, total, known, k)
+        else:
+            found = self._top_python(ids, vectors, known, k)
+        results = iter(found)
+        return [next(results) if row is not None else [] for row in rows]
+
+    def _top_numpy(self, ids, vectors, total, rows, k):
+        queries = np.asarray(vectors[rows], dtype=np.float32)
+        best_scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(rows), k), -1, dtype=np.int64)
+        query_rows = np.asarray(rows)
+        for start in range(0, total, BATCH_ROWS):
+            block = np.asarray(vectors[start:start + BATCH_ROWS])
+            scores = queries @ block.T
+            inside = (query_rows >= start) & (query_rows < start + len(block))
+            scores[inside, query_rows[inside] - start] = -np.inf  # Not similar to itself
+            if scores.shape[1] > k:
+                top = np.argpartition(scores, -k, axis=1)[:, -k:]
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            candidate_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, axis=1)], axis=1)
+            candidate_rows = np.concatenate([best_rows, top + start], axis=1)
+            keep = np.argpartition(candidate_scores, -k, axis=1)[:, -k:]
+            best_scores = np.take_along_axis(candidate_scores, keep, axis=1)
+            best_rows = np.take_along_axis(candidate_rows, keep, axis=1)
+
+        results = []
+        for scores, found in zip(best_scores, best_rows):
+            order = np.argsort(-scores)
+            results.append([(int(ids[found[i]]), round(float(scores[i]), 4))
+                            for i in order if found[i] >= 0 and scores[i] > 0])
+        return results
+
+    def _top_python(self, ids, vectors, rows, k):
+        dim = self.dim
+        results = []
+        for row in rows:
+            query = vectors[row * dim:(row + 1) * dim]
+            scored = []
+            for other in range(len(ids)):
+                if other != row:
+                    score = sum(map(mul, query, vectors[other * dim:(other + 1) * dim]))
+                    if score > 0:
+                        scored.append((score, other))
+            scored.sort(reverse=True)
+            results.append([(ids[other], round(score, 4)) for score, other in scored[:k]])
+        return results
+
+    def stats(self):
+        built = self.refresh()
+        return {'built': built, 'generation': self._generation, 'artworks': self._rows,
+                'dim': self.dim, 'backend': 'numpy' if np is not None else 'python'}
@@ -0,0 +1,131 @@
+"""
+Build-free static asset pipeline for the frontend.
+
+At startup every file under the frontend folder is read into memory, content
+hashed and (for text types) precompressed with gzip and, when the brotli
+package is installed, brotli. Each asset is also reachable under a
+fingerprinted name such as js/gallery.3f9a1c2b7d.js that is cached forever;
+HTML pages are rewritten to reference those names and are themselves served
+with ETag revalidation.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+
+from werkzeug.wrappers import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_EXTENSIONS = ('.html', '.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.webp', '.json', '.txt', '.woff', '.woff2')
+COMPRESSIBLE_EXTENSIONS = ('.html', '.css', '.js', '.svg', '.json', '.txt')
+ASSET_REFERENCE = re.compile(r'''(\b(?:src|href)=["'])(?!https?:|//|#|data:|mailto:)([^"'#?]+)(["'])''')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class Asset:
+    __slots__ = ('path', 'fingerprinted', 'mimetype', 'mtime', 'body', 'gzip', 'br', 'etag')
+
+    def __init__(self, path, body, mtime):
+        self.path = path
+        self.mtime = mtime
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.set_body(body)
+
+    def set_body(self, body):
+        self.body = body
+        digest = hashlib.sha256(body).hexdigest()
+        self.etag = digest[:16]
+        stem, extension = posixpath.splitext(self.path)
+        self.fingerprinted = f'{stem}.{digest[:10]}{extension}'
+
+        self.gzip = self.br = None
+        if self.path.endswith(COMPRESSIBLE_EXTENSIONS) and len(body) > 512:
+            self.gzip = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.br = brotli.compress(body, quality=11)
+
+
+class StaticAssets:
+    def __init__(self, root):
+        self.root = root
+        self.assets = {}
+        self.fingerprints = {}
+
+    def load(self):
+        assets = {}
+        for directory, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+            for filename in filenames:
+                if filename.startswith('.') or not filename.lower().endswith(STATIC_EXTENSIONS):
+                    continue
+                full_path = os.path.join(directory, filename)
+                path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                with open(full_path, 'rb') as f:
+                    assets[path] = Asset(path, f.read(), os.path.getmtime(full_path))
+
+        # Pages can only point at fingerprinted names once those are known
+        for asset in assets.values():
+            if asset.path.endswith('.html'):
+                asset.set_body(self._rewrite_references(asset, assets))
+
+        self.assets = assets
+        self.fingerprints = {asset.fingerprinted: asset for asset in assets.values()}
+        return len(assets)
+
+    def reload_if_changed(self):
+        """Re-read everything if a file was added, removed or modified (development mode)"""
+        for asset in self.assets.values():
+            full_path = os.path.join(self.root, asset.path)
+            if not os.path.exists(full_path) or os.path.getmtime(full_path) != asset.mtime:
+                return self.load()
+        return None
+
+    def _rewrite_references(self, page, assets):
+        base = posixpath.dirname(page.path)
+
+        def replace(match):
+            reference = match.group(2)
+            if reference.startswith('/'):
+                target = posixpath.normpath(reference.lstrip('/'))
+            else:
+                target = posixpath.normpath(posixpath.join(base, reference))
+            asset = assets.get(target)
+            if not asset or asset.path.endswith('.html'):
+                return match.group(0)
+            url = '/' + asset.fingerprinted if reference.startswith('/') else posixpath.relpath(asset.fingerprinted, base or '.')
+            return match.group(1) + url + match.group(3)
+
+        return ASSET_REFERENCE.sub(replace, page.body.decode('utf-8')).encode('utf-8')
+
+    def lookup(self, path):
+        """Returns (asset, immutable) for a plain or fingerprinted path"""
+        if path in self.fingerprints:
+            return self.fingerprints[path], True
+        return self.assets.get(path), False
+
+    def response(self, asset, request, immutable=False):
+        body, encoding, etag = asset.body, None, asset.etag
+        accepted = request.accept_encodings
+        if asset.br is not None and accepted['br']:
+            body, encoding, etag = asset.br, 'br', asset.etag + '-br'
+        elif asset.gzip is not None and accepted['gzip']:
+            body, encoding, etag = asset.gzip, 'gzip', asset.etag + '-gz'
+
+        headers = {
+            'ETag': f'"{etag}"',
+            'Cache-Control': IMMUTABLE if immutable else 'no-cache',
+            'Vary': 'Accept-Encoding',
+        }
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers=headers)
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        return Response(body, mimetype=asset.mimetype, headers=headers)
@@ -0,0 +1,194 @@
+"""
+In-memory type-ahead index for artwork titles, artist names and specialties.
+
+Every label is stored under a normalized key for each of its word starts
+("sunset dreams" is found by "sun" and by "dre") in one sorted array, so a
+prefix is a contiguous range found by binary search. Ranges small enough to
+scan are ranked on the fly; for the heavy prefixes (short ones like "a")
+the top-k list is precomputed at build time and patched on every insert, so
+no query scans more than `scan_limit` keys. Inserts go to a small sorted
+side array that is merged into the main one once it outgrows `merge_size`,
+so adding an item does not shift millions of keys.
+"""
+
+import bisect
+import heapq
+import threading
+import unicodedata
+from operator import attrgetter
+
+MAX_WORDS = 6
+END = '\uffff'
+by_weight = attrgetter('weight')
+
+
+class Suggestion:
+    __slots__ = ('kind', 'id', 'label', 'weight')
+
+    def __init__(self, kind, id, label, weight):
+        self.kind = kind
+        self.id = id
+        self.label = label
+        self.weight = weight
+
+    def to_dict(self):
+        return {'type': self.kind, 'id': self.id, 'label': self.label}
+
+
+def normalize(text):
+    """Casefold, strip accents and turn punctuation into single spaces"""
+    text = unicodedata.normalize('NFKD', text or '').casefold()
+    text = ''.join(c if c.isalnum() else ' ' for c in text if not unicodedata.combining(c))
+    return ' '.join(text.split())
+
+
+def keys_for(label):
+    words = normalize(label).split()[:MAX_WORDS]
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+class SuggestIndex:
+    def __init__(self, k=10, scan_limit=256, merge_size=4096):
+        self.k = k
+        self.scan_limit = scan_limit
+        self.merge_size = merge_size
+        self._keys = []
+        self._entries = []  # Suggestion for each key, parallel to _keys
+        self._new_keys = []  # Recent inserts, merged into _keys in bulk
+        self._new_entries = []
+        self._items = {}  # (kind, id) -> Suggestion
+        self._top = {}  # heavy prefix -> top-k Suggestions, or None once stale
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def _rank(self, entries):
+        # A label can sit under several keys of one range, so over-fetch and dedupe
+        ranked, seen = [], set()
+        for entry in heapq.nlargest(self.k * 2, entries, key=by_weight):
+            if id(entry) not in seen:
+                seen.add(id(entry))
+                ranked.append(entry)
+                if len(ranked) == self.k:
+                    break
+        return ranked
+
+    def _heavy_prefixes(self, keys, entries):
+        top = {}
+        stack = [('', 0, len(keys))]
+        while stack:
+            prefix, lo, hi = stack.pop()
+            if hi - lo <= self.scan_limit:
+                continue
+            if prefix:
+                top[prefix] = self._rank(entries[lo:hi])
+            depth = len(prefix)
+            i = lo
+            while i < hi:
+                if len(keys[i]) <= depth:
+                    i += 1
+                    continue
+                child = prefix + keys[i][depth]
+                j = bisect.bisect_left(keys, child + END, i, hi)
+                stack.append((child, i, j))
+                i = j
+        return top
+
+    def build(self, items):
+        """Replace the index with (kind, id, label, weight) items"""
+        pairs, by_item = [], {}
+        for kind, item_id, label, weight in items:
+            entry = Suggestion(kind, item_id, label, weight)
+            by_item[(kind, item_id)] = entry
+            pairs.extend((key, entry) for key in keys_for(label))
+        pairs.sort(key=lambda pair: pair[0])
+        keys = [key for key, _ in pairs]
+        entries = [entry for _, entry in pairs]
+        top = self._heavy_prefixes(keys, entries)
+        with self._lock:
+            self._keys, self._entries, self._items, self._top = keys, entries, by_item, top
+            self._new_keys, self._new_entries = [], []
+
+    def suggest(self, text, limit=None):
+        prefix = normalize(text)
+        if not prefix:
+            return []
+        limit = min(limit or self.k, self.k)
+        with self._lock:
+            if prefix in self._top and self._top[prefix] is not None:
+                return self._top[prefix][:limit]
+            lo = bisect.bisect_left(self._keys, prefix)
+            hi = bisect.bisect_left(self._keys, prefix + END, lo)
+            new_lo = bisect.bisect_left(self._new_keys, prefix)
+            new_hi = bisect.bisect_left(self._new_keys, prefix + END, new_lo)
+            ranked = self._rank(self._entries[lo:hi] + self._new_entries[new_lo:new_hi])
+            if prefix in self._top:
+                self._top[prefix] = ranked
+            return ranked[:limit]
+
+    def add(self, kind, item_id, label, weight):
+        """Insert or update an item"""
+        with self._lock:
+            self._remove(kind, item_id)
+            entry = Suggestion(kind, item_id, label, weight)
+            self._items[(kind, item_id)] = entry
+            for key in keys_for(label):
+                i = bisect.bisect_right(self._new_keys, key)
+                self._new_keys.insert(i, key)
+                self._new_entries.insert(i, entry)
+                for length in range(1, len(key) + 1):
+                    top = self._top.get(key[:length])
+                    if top is not None and entry not in top and (len(top) < self.k or weight > top[-1].weight):
+                        top.append(entry)
+                        top.sort(key=by_weight, reverse=True)
+                        del top[self.k:]
+            # Merging is linear in the index size, so let big indexes buffer more
+            if len(self._new_keys) >= max(self.merge_size, len(self._keys) // 64):
+                self._merge()
+
+    def _merge(self):
+        pairs = heapq.merge(zip(self._keys, self._entries), zip(self._new_keys, self._new_entries),
+                            key=lambda pair: pair[0])
+        keys, entries = [], []
+        for key, entry in pairs:
+            keys.append(key)
+            entries.append(entry)
+        self._keys, self._entries = keys, entries
+        self._new_keys, self._new_entries = [], []
+
+    def bump(self, kind, item_id, label, delta=1):
+        """Add delta to an item's weight, inserting it if missing"""
+        entry = self._items.get((kind, item_id))
+        self.add(kind, item_id, label, (entry.weight if entry else 0) + delta)
+
+    def remove(self, kind, item_id):
+        with self._lock:
+            self._remove(kind, item_id)
+
+    def _remove(self, kind, item_id):
+        entry = self._items.pop((kind, item_id), None)
+        if entry is None:
+            return
+        for key in keys_for(entry.label):
+            self._remove_key(self._new_keys, self._new_entries, key, entry) or \
+                self._remove_key(self._keys, self._entries, key, entry)
+            for length in range(1, len(key) + 1):
+                top = self._top.get(key[:length])
+                if top is not None and entry in top:
+                    # Re-ranked from the range on the next query
+                    self._top[key[:length]] = None
+
+    @staticmethod
+    def _remove_key(keys, entries, key, entry):
+        i = bisect.bisect_left(keys, key)
+        while i < len(keys) and keys[i] == key:
+            if entries[i] is entry:
+                del keys[i]
+                del entries[i]
+                return True
+            i += 1
+        return False
@@ -4,6 +4,7 @@ Simple API test script for Kunsthaus Canvas Bids Backend
 """
 
 import requests
+import time
 import json
 
 BASE_URL = 'http://localhost:5000'
@@ -77,7 +78,18 @@ def test_sample_data():
         response = requests.post(f'{BASE_URL}/api/create-sample-data')
         print(f"Sample Data: {response.status_code}")
         print(f"Response: {response.json()}")
-        return response.status_code == 201
+        if response.status_code != 202:
+            return False
+        
+        # Runs as a background job; poll until it finishes
+        status_url = f"{BASE_URL}{response.json()['status_url']}"
+        for _ in range(30):
+            job = requests.get(status_url).json()
+            if job['status'] in ('succeeded', 'failed'):
+                print(f"Job: {job}")
+                return job['status'] == 'succeeded'
+            time.sleep(1)
+        return False
     except Exception as e:
         print(f"Sample data creation failed: {e}")
         return False
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Sparse fieldset tests: `fields=` and `view=` on listing routes must leave
+unrequested columns out of the SQL, not just out of the JSON.
+Run from backend/:
+    python test_fields.py
+"""
+
+import os
+import sys
+
+from sqlalchemy import event
+
+import testkit
+
+backend = testkit.load_app(os.path.join(testkit.work_dir('fields'), 'fields.db'))
+
+client = backend.app.test_client()
+statements = []
+
+
+def record_statement(connection, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+def artwork_selects(url):
+    """Response JSON and the SQL of the artwork selects it ran"""
+    statements.clear()
+    response = client.get(url)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json(), [sql for sql in statements if 'FROM artwork' in sql and 'count(' not in sql]
+
+
+def setup():
+    with backend.app.app_context():
+        event.listen(backend.db.engine, 'before_cursor_execute', record_statement)
+
+    token = testkit.register(client, 'fields_artist', is_artist=True)
+    for i in range(3):
+        client.post('/api/artworks', json={'title': f'Fieldset {i}', 'description': 'A long description ' * 20,
+                                           'starting_price': 100},
+                    headers={'Authorization': f'Bearer {token}'})
+
+
+def test_default_is_unchanged():
+    """Without fields or view, listings return every field"""
+    data, sql = artwork_selects('/api/artworks')
+    assert set(data['artworks'][0]) == set(backend.ARTWORK_FIELDS.fields), data['artworks'][0]
+    assert data['artworks'][0]['description'].startswith('A long description')
+    assert 'artwork.description' in sql[0]
+
+
+def test_fields_project_into_sql():
+    """fields=id,title selects only those columns and skips the artist join"""
+    data, sql = artwork_selects('/api/artworks?fields=id,title')
+    assert [set(artwork) for artwork in data['artworks']] == [{'id', 'title'}] * 3, data['artworks']
+    assert len(sql) == 1, sql
+    assert 'artwork.id' in sql[0] and 'artwork.title' in sql[0], sql[0]
+    for column in ('description', 'category', 'price', 'image_url', 'created_at'):
+        assert f'artwork.{column}' not in sql[0], sql[0]
+    assert 'JOIN artist' not in sql[0], sql[0]
+
+
+def test_card_view():
+    """view=card leaves out the description but keeps what a grid card shows"""
+    data, sql = artwork_selects('/api/artworks?view=card')
+    artwork = data['artworks'][0]
+    assert set(artwork) == set(backend.ARTWORK_FIELDS.views['card']), artwork
+    assert artwork['artist'] == 'fields_artist'
+    assert 'artwork.description' not in sql[0] and 'artist.name' in sql[0], sql[0]
+
+
+def test_auction_fields():
+    """Auction fields nest under artwork, and only read the lot columns when bids are asked for"""
+    data, sql = artwork_selects('/api/auctions?fields=id,artwork.title')
+    assert data['auctions'][0] == {'id': data['auctions'][0]['id'], 'artwork': {'title': 'Fieldset 0'}}, data
+    assert 'artwork.description' not in sql[0] and 'artwork.bid_version' not in sql[0], sql[0]
+
+    data, sql = artwork_selects('/api/auctions?view=card')
+    assert 'description' not in data['auctions'][0]['artwork'] and 'current_bid' in data['auctions'][0]
+    assert 'artwork.description' not in sql[0], sql[0]
+
+
+def test_search_fields():
+    """Search projects its artwork results the same way"""
+    data, sql = artwork_selects('/api/search?q=Fieldset&fields=id,price')
+    assert [set(artwork) for artwork in data['artworks']] == [{'id', 'price', 'type'}] * 3, data['artworks']
+    assert 'artwork.description' not in sql[0].split('WHERE')[0], sql[0]
+
+
+def test_unknown_field():
+    """Unknown fields and views are rejected"""
+    assert client.get('/api/artworks?fields=id,password_hash').status_code == 400
+    assert client.get('/api/auctions?view=huge').status_code == 400
+
+
+def main():
+    setup()
+    tests = [test_default_is_unchanged, test_fields_project_into_sql, test_card_view,
+             test_auction_fields, test_search_fields, test_unknown_field]
+    return testkit.run('Sparse Fieldset Tests', tests)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Idempotency-Key tests: a retried bid or artwork creation must return the
+first response instead of running again.
+Run from backend/:
+    python test_idempotency.py
+"""
+
+import os
+import sys
+import threading
+import time
+
+import testkit
+
+backend = testkit.load_app(os.path.join(testkit.work_dir('idempotency'), 'idempotency.db'))
+
+client = backend.app.test_client()
+tokens = {}
+artwork_id = None
+
+
+def register(username, is_artist=False):
+    tokens[username] = testkit.register(client, username, is_artist)
+
+
+def post(url, body, username, key=None):
+    headers = {'Authorization': f'Bearer {tokens[username]}'}
+    if key is not None:
+        headers['Idempotency-Key'] = key
+    return client.post(url, json=body, headers=headers)
+
+
+def bid_count():
+    return len(client.get(f'/api/bids/artwork/{artwork_id}').get_json()['bids'])
+
+
+def setup():
+    global artwork_id
+    register('idem_artist', is_artist=True)
+    register('idem_bidder')
+    register('idem_rival')
+    artwork_id = post('/api/artworks', {'title': 'Retried', 'starting_price': 100},
+                      'idem_artist').get_json()['artwork']['id']
+
+
+def test_bid_replay():
+    """A retried bid gets the first response and places no second bid"""
+    first = post('/api/bids/', {'artwork_id': artwork_id, 'amount': 200}, 'idem_bidder', key='bid-1')
+    retry = post('/api/bids/', {'artwork_id': artwork_id, 'amount': 200}, 'idem_bidder', key='bid-1')
+    assert first.status_code == 201, first.get_json()
+    assert retry.status_code == 201 and retry.headers.get('Idempotent-Replayed') == 'true', retry.get_json()
+    assert retry.get_json() == first.get_json()
+    assert bid_count() == 1
+
+
+def test_keys_are_per_user():
+    """Another user's request with the same key runs normally"""
+    response = post('/api/bids/', {'artwork_id': artwork_id, 'amount': 300}, 'idem_rival', key='bid-1')
+    assert response.status_code == 201 and 'Idempotent-Replayed' not in response.headers, response.get_json()
+    assert bid_count() == 2
+
+
+def test_artwork_replay_and_mismatch():
+    """A retried artwork creation is replayed, and a different body under the key is rejected"""
+    first = post('/api/artworks', {'title': 'Once', 'starting_price': 50}, 'idem_artist', key='art-1')
+    retry = post('/api/artworks', {'title': 'Once', 'starting_price': 50}, 'idem_artist', key='art-1')
+    assert retry.get_json()['artwork']['id'] == first.get_json()['artwork']['id']
+    other = post('/api/artworks', {'title': 'Twice', 'starting_price': 50}, 'idem_artist', key='art-1')
+    assert other.status_code == 422, other.get_json()
+
+
+def test_concurrent_retry():
+    """A retry arriving while the first request runs gets 409 and places nothing"""
+    get_lot = backend.get_lot
+
+    def slow_get_lot(artwork):
+        time.sleep(0.3)
+        return get_lot(artwork)
+
+    statuses = []
+
+    def send():
+        statuses.append(post('/api/bids/', {'artwork_id': artwork_id, 'amount': 1000}, 'idem_bidder',
+                             key='bid-race').status_code)
+
+    backend.get_lot = slow_get_lot
+    try:
+        threads = [threading.Thread(target=send) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        backend.get_lot = get_lot
+    assert sorted(statuses) == [201, 409], statuses
+    assert bid_count() == 3
+
+
+def main():
+    setup()
+    tests = [test_bid_replay, test_keys_are_per_user, test_artwork_replay_and_mismatch, test_concurrent_retry]
+    return testkit.run('Idempotency Key Tests', tests)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
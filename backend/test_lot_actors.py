@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Per-lot actor tests: a bid that times out must never be applied afterwards,
+and a bid already being applied must not time out.
+Runs LotActors directly, without the app or a database:
+    cd backend
+    python test_lot_actors.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from lot_actors import LotActors
+
+
+class SlowApply:
+    """apply() that records the bids it is given and blocks while the gate is closed"""
+
+    def __init__(self, delay=0):
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.delay = delay
+        self.applied = []
+
+    def __call__(self, bids):
+        self.started.set()
+        self.gate.wait()
+        time.sleep(self.delay)
+        self.applied.extend(bid['amount'] for bid in bids)
+        return [(201, {'amount': bid['amount']}) for bid in bids]
+
+
+def actors(apply, name, socket_dir):
+    instance = LotActors(socket_dir, apply, name=name, refresh_interval=60, timeout=0.3)
+    instance.open()
+    return instance
+
+
+def in_background(call, *args):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(call(*args)))
+    thread.start()
+    return thread, results
+
+
+def test_timed_out_bid_is_cancelled(socket_dir):
+    """A bid that times out in the queue gets TimeoutError and is never applied"""
+    apply = SlowApply()
+    owner = actors(apply, 'owner', socket_dir)
+    try:
+        first, results = in_background(owner.submit_local, {'artwork_id': 1, 'amount': 100})
+        apply.started.wait(2)
+        try:
+            owner.submit_local({'artwork_id': 1, 'amount': 200})
+            raise AssertionError('the queued bid did not time out')
+        except TimeoutError:
+            pass
+        apply.gate.set()
+        first.join(2)
+        time.sleep(0.6)  # Give the actor time to (wrongly) pick up the cancelled bid
+        assert results == [(201, {'amount': 100})], results
+        assert apply.applied == [100], apply.applied
+        assert owner.stats()['cancelled'] == 1
+    finally:
+        apply.gate.set()
+        owner.close()
+
+
+def test_taken_bid_waits_for_result(socket_dir):
+    """A bid already in a batch returns its result even when applying outlasts the timeout"""
+    apply = SlowApply(delay=0.6)
+    apply.gate.set()
+    owner = actors(apply, 'owner', socket_dir)
+    try:
+        assert owner.submit_local({'artwork_id': 1, 'amount': 100}) == (201, {'amount': 100})
+        assert apply.applied == [100]
+    finally:
+        owner.close()
+
+
+def test_forwarded_timeout(socket_dir):
+    """A forwarded bid that times out at its owner gets 504 and is never applied"""
+    apply = SlowApply()
+    owner = actors(apply, 'owner', socket_dir)
+    sender = actors(SlowApply(), 'sender', socket_dir)
+    try:
+        owner.refresh()
+        artwork_id = next(i for i in range(1000) if sender.owner(i) == 'owner')
+        first, _ = in_background(sender.submit, {'artwork_id': artwork_id, 'amount': 100})
+        apply.started.wait(2)
+        status, _ = sender.submit({'artwork_id': artwork_id, 'amount': 200})
+        assert status == 504, status
+        apply.gate.set()
+        first.join(2)
+        time.sleep(0.6)
+        assert apply.applied == [100], apply.applied
+    finally:
+        apply.gate.set()
+        sender.close()
+        owner.close()
+
+
+def test_forwarded_slow_apply(socket_dir):
+    """A forwarded bid whose apply outlasts the timeout still gets its result"""
+    apply = SlowApply(delay=0.6)
+    apply.gate.set()
+    owner = actors(apply, 'owner', socket_dir)
+    sender = actors(SlowApply(), 'sender', socket_dir)
+    try:
+        owner.refresh()
+        artwork_id = next(i for i in range(1000) if sender.owner(i) == 'owner')
+        assert sender.submit({'artwork_id': artwork_id, 'amount': 100}) == (201, {'amount': 100})
+        assert apply.applied == [100]
+    finally:
+        sender.close()
+        owner.close()
+
+
+def main():
+    print("=" * 50)
+    print("Kunsthaus Canvas Bids - Lot Actor Tests")
+    print("=" * 50)
+
+    tests = [test_timed_out_bid_is_cancelled, test_taken_bid_waits_for_result,
+             test_forwarded_timeout, test_forwarded_slow_apply]
+    failed = 0
+    for test in tests:
+        socket_dir = tempfile.mkdtemp(prefix='kunsthaus-actors-test-')
+        try:
+            test(socket_dir)
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+        finally:
+            shutil.rmtree(socket_dir, ignore_errors=True)
+
+    print("=" * 50)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Order book tests: concurrent bids must leave each lot's cached leader, count
+and recent bids equal to what the bid table holds.
+Run from backend/:
+    python test_order_book.py
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime
+
+import testkit
+
+from order_book import OrderBook
+
+backend = testkit.load_app(os.path.join(testkit.work_dir('order-book'), 'order_book.db'))
+
+client = backend.app.test_client()
+artwork_id = None
+bidders = []
+
+
+def table_lot(artwork_id):
+    """(bid_count, amounts newest first) straight from the bid table"""
+    with backend.app.app_context():
+        amounts = [amount for (amount,) in backend.db.session.query(backend.Bid.amount)
+                   .filter_by(artwork_id=artwork_id).order_by(backend.Bid.amount.desc())]
+    return len(amounts), amounts
+
+
+def setup():
+    global artwork_id
+    artist = testkit.register(client, 'book_artist', is_artist=True)
+    artwork_id = client.post('/api/artworks', json={'title': 'Contested', 'starting_price': 100},
+                             headers={'Authorization': f'Bearer {artist}'}).get_json()['artwork']['id']
+    bidders.extend(testkit.register(client, f'book_bidder_{i}') for i in range(8))
+
+
+def test_bid_after_reload_is_not_counted_twice():
+    """A bid recorded after another thread reloaded the lot at its version is not added again"""
+    stored = {'count': 1, 'recent': [(1, 7, 200.0, datetime.utcnow())]}
+    book = OrderBook(lambda _: (stored['count'], list(stored['recent'])), lambda: [], depth=5)
+    book.lot(1, 100, 0)
+    # Thread A has claimed version 0 -> 1 and committed, thread B lost its
+    # claim and reloads the lot before A records its bid
+    reloaded = book.lot(1, 100, 1)
+    book.record_bid(1, stored['recent'][0], 1)
+    assert reloaded.bid_count == 1 and len(reloaded.recent) == 1, (reloaded.bid_count, list(reloaded.recent))
+    assert book.lots[1] is reloaded
+
+
+def test_stale_lot_is_dropped():
+    """A bid that skips past the cached version drops the lot instead of patching it"""
+    book = OrderBook(lambda _: (0, []), lambda: [], depth=5)
+    book.lot(1, 100, 3)
+    book.record_bid(1, (9, 7, 200.0, datetime.utcnow()), 6)
+    assert 1 not in book.lots
+
+
+def test_concurrent_bids_match_table():
+    """Bids from many threads leave the order book equal to the bid table"""
+    statuses = []
+
+    def send(slot):
+        headers = {'Authorization': f'Bearer {bidders[slot]}'}
+        for i in range(15):
+            amount = 200 + (i * len(bidders) + slot) * 100
+            response = client.post('/api/bids/', json={'artwork_id': artwork_id, 'amount': amount},
+                                   headers=headers)
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=send, args=(slot,)) for slot in range(len(bidders))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    count, amounts = table_lot(artwork_id)
+    assert statuses.count(201) == count and count > 0, (statuses.count(201), count)
+    assert set(statuses) <= {201, 400, 409}, statuses
+    with backend.app.app_context():
+        lot = backend.get_lot(backend.db.session.get(backend.Artwork, artwork_id))
+        assert lot.bid_count == count, (lot.bid_count, count)
+        assert [bid[2] for bid in lot.recent] == amounts[:len(lot.recent)], (list(lot.recent), amounts)
+
+
+def main():
+    setup()
+    tests = [test_bid_after_reload_is_not_counted_twice, test_stale_lot_is_dropped,
+             test_concurrent_bids_match_table]
+    return testkit.run('Order Book Tests', tests)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
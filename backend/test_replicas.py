@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Read-replica routing tests using a file copy of the SQLite primary as replica.
+Run from backend/:
+    python test_replicas.py
+"""
+
+import os
+import shutil
+import sys
+import time
+
+import testkit
+
+WORK_DIR = testkit.work_dir('replica')
+PRIMARY = os.path.join(WORK_DIR, 'primary.db')
+REPLICA = os.path.join(WORK_DIR, 'replica.db')
+backend = testkit.load_app(PRIMARY, DATABASE_REPLICA_URLS='sqlite:///' + REPLICA)
+
+# The primary pin is a cookie, so only clients that keep cookies are pinned
+client = backend.app.test_client(use_cookies=False)
+backend.replicas.check_interval = 0
+backend.app.config['REPLICA_HEARTBEAT_SECONDS'] = 3600  # Tests write heartbeats by hand
+
+
+def sync_replica():
+    backend.write_heartbeat()
+    shutil.copyfile(PRIMARY, REPLICA)
+
+
+def register(name, is_artist=False):
+    return testkit.register(client, name, is_artist)
+
+
+def artwork_total(token=None, reader=client, headers=None):
+    headers = dict(headers or {})
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    return reader.get('/api/artworks', headers=headers).get_json()['pagination']['total']
+
+
+def create_artwork(token, title, writer=client):
+    response = writer.post('/api/artworks', json={'title': title, 'starting_price': 100},
+                           headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 201, response.get_json()
+    return response
+
+
+def setup():
+    sync_replica()
+
+
+def test_reads_go_to_replica():
+    """A write the replica has not copied yet is invisible to read routes"""
+    artist = register('replica_artist', True)
+    create_artwork(artist, 'Copied')
+    sync_replica()
+
+    with backend.app.app_context():
+        backend.db.session.add(backend.Artwork(title='Not copied', price=100, user_id=1))
+        backend.db.session.commit()
+        primary_total = backend.Artwork.query.count()
+
+    assert artwork_total() == primary_total - 1
+    assert client.get('/api/stats').get_json()['total_artworks'] == primary_total - 1
+
+
+def test_read_your_own_writes():
+    """The writing client is pinned to the primary, everyone else still reads the replica"""
+    artist = register('pinned_artist', True)
+    sync_replica()
+    before = artwork_total()
+
+    writer = backend.app.test_client()
+    pin = create_artwork(artist, 'Fresh', writer=writer).headers['X-Primary-Pin']
+    assert artwork_total(reader=writer) == before + 1
+    # Clients without cookies send the pin back as a header; no process keeps it
+    assert artwork_total(headers={'X-Primary-Pin': pin}) == before + 1
+    assert artwork_total(artist) == before
+    assert artwork_total(headers={'X-Primary-Pin': str(time.time() - 1)}) == before
+
+
+def test_lagging_replica_is_skipped():
+    """A replica whose heartbeat is older than the lag budget is bypassed"""
+    sync_replica()
+    with backend.app.app_context():
+        backend.db.session.add(backend.Artwork(title='Lagging', price=100, user_id=1))
+        backend.db.session.commit()
+        primary_total = backend.Artwork.query.count()
+
+    assert artwork_total() == primary_total - 1
+
+    backend.replicas.max_lag = 0.05
+    time.sleep(0.1)
+    try:
+        assert artwork_total() == primary_total
+        assert backend.replicas.status()[0]['healthy'] is False
+    finally:
+        backend.replicas.max_lag = backend.app.config['REPLICA_MAX_LAG_SECONDS']
+
+
+def test_replica_is_read_only():
+    """Replica connections refuse writes"""
+    with backend.replicas.engines[0].connect() as connection:
+        try:
+            connection.exec_driver_sql("DELETE FROM artwork")
+        except Exception:
+            return
+    raise AssertionError('replica accepted a write')
+
+
+def main():
+    setup()
+    tests = [test_reads_go_to_replica, test_read_your_own_writes,
+             test_lagging_replica_is_skipped, test_replica_is_read_only]
+    return testkit.run('Read Replica Tests', tests)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Shared setup for the in-process test scripts (test_replicas.py, test_fields.py,
+test_idempotency.py, test_order_book.py): a throwaway work directory, the app imported against a
+database in it, and the register helper and result printing they all use.
+No server is needed; run a script from backend/, e.g. `python test_fields.py`.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+
+def work_dir(name):
+    """A temporary directory removed at exit"""
+    path = tempfile.mkdtemp(prefix=f'kunsthaus-{name}-test-')
+    # Bids queue notifications that are flushed at exit, so the database goes last
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def load_app(database, **env):
+    """Import the app against the SQLite file `database` and create its tables"""
+    os.environ['DATABASE_URL'] = 'sqlite:///' + database
+    os.environ['RATELIMIT_ENABLED'] = '0'
+    os.environ.update(env)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import app as backend
+
+    with backend.app.app_context():
+        backend.db.create_all()
+    return backend
+
+
+def register(client, username, is_artist=False):
+    """Register a user and return their access token"""
+    response = client.post('/api/auth/register', json={
+        'username': username,
+        'email': f'{username}@example.com',
+        'password': 'password123',
+        'is_artist': is_artist
+    })
+    return response.get_json()['access_token']
+
+
+def run(title, tests):
+    """Run the tests in order, print a line per test and return the exit status"""
+    print("=" * 50)
+    print(f"Kunsthaus Canvas Bids - {title}")
+    print("=" * 50)
+
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__doc__}: {e}")
+
+    print("=" * 50)
+    return 1 if failed else 0
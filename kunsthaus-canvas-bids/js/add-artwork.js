@@ -6,6 +6,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Initialize form functionality
     initAddArtworkForm();
+    initBulkImport();
     initPreview();
     
     // Initialize Lucide icons
@@ -43,6 +44,56 @@ function initAddArtworkForm() {
     }
 }
 
+function initBulkImport() {
+    const button = document.getElementById('bulk-import-button');
+    if (button) {
+        button.addEventListener('click', handleBulkImport);
+    }
+}
+
+// Sends the whole file to /api/artworks/bulk, which inserts it in batches
+async function handleBulkImport() {
+    const input = document.getElementById('bulk-import-file');
+    const errorList = document.getElementById('bulk-import-errors');
+    const file = input.files[0];
+    if (!file) {
+        showNotification('Choose a JSON or NDJSON file to import', 'error');
+        return;
+    }
+    if (!window.authManager || !window.authManager.isAuthenticated()) {
+        showNotification('Please login to add artwork', 'error');
+        return;
+    }
+    
+    const ndjson = /\.(ndjson|jsonl)$/i.test(file.name);
+    errorList.innerHTML = '';
+    
+    try {
+        const response = await window.authManager.authenticatedFetch('/api/artworks/bulk', {
+            method: 'POST',
+            headers: { 'Content-Type': ndjson ? 'application/x-ndjson' : 'application/json' },
+            body: await file.text()
+        });
+        const result = await response.json().catch(() => ({}));
+        
+        (result.errors || []).forEach(item => {
+            const entry = document.createElement('li');
+            entry.textContent = `Artwork ${item.index + 1}: ${item.error}`;
+            errorList.appendChild(entry);
+        });
+        
+        if (!response.ok) {
+            throw new Error(result.error || result.message || `Import failed (${response.status})`);
+        }
+        showNotification(`${result.message}${result.image_jobs.length ? ', images are being imported' : ''}`,
+                         result.errors.length ? 'info' : 'success');
+        input.value = '';
+    } catch (error) {
+        console.error('Error importing artworks:', error);
+        showNotification(error.message || 'Failed to import artworks', 'error');
+    }
+}
+
 function initPreview() {
     // Update preview when form fields change
     const fields = [
@@ -3,6 +3,7 @@
 let auctionData = [];
 let filteredAuctions = [];
 let modalListenersSetup = false;
+let changesCursor = null; // Position in /api/auctions/changes after the last load
 
 // Initialize when page loads
 document.addEventListener('DOMContentLoaded', function () {
@@ -53,12 +54,72 @@ window.showDebugInfo = function () {
     alert('Debug info logged to console!\n\nTotal Auctions: ' + auctionData.length + '\nCheck browser console for detailed info.');
 };
 
-// Auto-refresh every 30 seconds
+// Auto-refresh every 30 seconds, fetching only the lots that changed
 setInterval(() => {
     console.log('Auto-refreshing auctions...');
-    loadAuctionsFromBackend();
+    loadAuctionChanges();
 }, 30000);
 
+function transformAuction(auction) {
+    return {
+        id: auction.id,
+        title: auction.artwork.title,
+        artist: auction.artwork.artist,
+        currentBid: auction.current_bid,
+        startingBid: auction.starting_bid,
+        image: auction.artwork.image || 'https://images.unsplash.com/photo-1541961017774-22349e4a1262?w=400&h=300&fit=crop',
+        status: auction.status,
+        category: 'abstract',
+        endTime: new Date(auction.end_time),
+        bidCount: auction.bid_count || 0,
+        watchers: Math.floor(Math.random() * 100) + 10,
+        timeRemaining: auction.time_remaining
+    };
+}
+
+async function loadAuctionChanges() {
+    if (!changesCursor) {
+        return loadAuctionsFromBackend();
+    }
+    try {
+        let data;
+        let changedCount = 0;
+        do {
+            const response = await fetch(`/api/auctions/changes?cursor=${changesCursor}`, {
+                method: 'GET',
+                headers: { 'Accept': 'application/json' }
+            });
+            if (!response.ok) {
+                throw new Error('Failed to load auction changes');
+            }
+            data = await response.json();
+
+            const removed = new Set(data.removed.map(lot => lot.id));
+            const changed = new Map(data.auctions.map(auction => [auction.id, transformAuction(auction)]));
+            auctionData = auctionData
+                .filter(auction => !removed.has(auction.id))
+                .map(auction => changed.get(auction.id) || auction);
+            const known = new Set(auctionData.map(auction => auction.id));
+            changed.forEach((auction, id) => {
+                if (!known.has(id)) {
+                    auctionData.push(auction);
+                }
+            });
+
+            changedCount += changed.size + removed.size;
+            changesCursor = data.cursor;
+        } while (data.has_more);
+
+        console.log('Auction changes applied:', changedCount);
+        if (changedCount > 0) {
+            filteredAuctions = [...auctionData];
+            displayAuctions();
+        }
+    } catch (error) {
+        console.error('Error loading auction changes:', error);
+    }
+}
+
 async function loadAuctionsFromBackend(specificArtworkId = null, searchQuery = null) {
     console.log('Loading auctions from backend...');
     try {
@@ -77,22 +138,11 @@ async function loadAuctionsFromBackend(specificArtworkId = null, searchQuery = n
         console.log('Auctions data:', data);
 
         // Transform backend auctions
-        auctionData = data.auctions.map(auction => {
-            return {
-                id: auction.id,
-                title: auction.artwork.title,
-                artist: auction.artwork.artist,
-                currentBid: auction.current_bid,
-                startingBid: auction.starting_bid,
-                image: auction.artwork.image || 'https://images.unsplash.com/photo-1541961017774-22349e4a1262?w=400&h=300&fit=crop',
-                status: auction.status,
-                category: 'abstract',
-                endTime: new Date(auction.end_time),
-                bidCount: auction.bid_count || 0,
-                watchers: Math.floor(Math.random() * 100) + 10,
-                timeRemaining: auction.time_remaining
-            };
-        });
+        auctionData = data.auctions.map(transformAuction);
+
+        // Later refreshes ask only for changes after the newest version seen here
+        const latestVersion = Math.max(0, ...data.auctions.map(auction => auction.version || 0));
+        changesCursor = `${latestVersion}.9.0`;
 
         // Handle highlighting and search notifications
         if (specificArtworkId || searchQuery) {
@@ -747,14 +797,17 @@ async function handleBidSubmit(e) {
         // Get current user
         const currentUser = window.authManager.getCurrentUser();
 
-        // Submit bid to backend using authenticated fetch
-        const response = await window.authManager.authenticatedFetch('/api/bids/', {
+        // Submit bid to backend using authenticated fetch. Resends after a
+        // dropped connection reuse the key, so the bid is placed at most once
+        const idempotencyKey = newIdempotencyKey();
+        const response = await fetchWithRetries(() => window.authManager.authenticatedFetch('/api/bids/', {
             method: 'POST',
+            headers: { 'Idempotency-Key': idempotencyKey },
             body: JSON.stringify({
                 amount: bidAmount,
                 artwork_id: auctionId
             })
-        });
+        }));
 
         if (response.ok) {
             const bidResult = await response.json();
@@ -797,6 +850,27 @@ async function handleBidSubmit(e) {
     }
 }
 
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+async function fetchWithRetries(send, attempts = 3) {
+    for (let attempt = 1; ; attempt++) {
+        try {
+            return await send();
+        } catch (error) {
+            // fetch rejects with a TypeError when no response arrived
+            if (!(error instanceof TypeError) || attempt >= attempts) {
+                throw error;
+            }
+            await new Promise(resolve => setTimeout(resolve, 500 * attempt));
+        }
+    }
+}
+
 function closeBiddingModal() {
     const modal = document.getElementById('bidding-modal');
     if (modal) {
@@ -111,7 +111,6 @@ class EnhancedNavbar {
     }
 
     setupSearch() {
-        // Mobile search toggle only
         const mobileSearchBtn = document.getElementById('mobile-search');
         const searchContainer = document.querySelector('.search-container');
 
@@ -121,6 +120,120 @@ class EnhancedNavbar {
                 this.toggleMobileSearch();
             });
         }
+
+        this.setupSearchSuggestions();
+    }
+
+    setupSearchSuggestions() {
+        const searchInput = document.getElementById('search-input');
+        const searchContainer = document.querySelector('.search-container');
+        const searchSubmit = document.getElementById('search-submit');
+
+        if (!searchInput || !searchContainer) return;
+
+        const list = document.createElement('div');
+        list.className = 'search-suggestions';
+        searchContainer.appendChild(list);
+
+        let debounceTimer = null;
+        let requestId = 0;
+        let selected = -1;
+
+        const hide = () => {
+            list.style.display = 'none';
+            selected = -1;
+        };
+
+        const goToSearch = () => {
+            const query = searchInput.value.trim();
+            if (query) {
+                window.location.href = `auctions.html?search=${encodeURIComponent(query)}`;
+            }
+        };
+
+        const goToSuggestion = (suggestion) => {
+            if (suggestion.type === 'artwork') {
+                window.location.href = `auctions.html?artwork=${suggestion.id}`;
+            } else {
+                window.location.href = `auctions.html?search=${encodeURIComponent(suggestion.label)}`;
+            }
+        };
+
+        const render = (suggestions) => {
+            list.innerHTML = '';
+            selected = -1;
+            suggestions.forEach((suggestion) => {
+                const item = document.createElement('div');
+                item.className = 'search-suggestion';
+                const label = document.createElement('span');
+                label.textContent = suggestion.label;
+                const type = document.createElement('span');
+                type.className = 'search-suggestion-type';
+                type.textContent = suggestion.type;
+                item.append(label, type);
+                // mousedown fires before the input's blur hides the list
+                item.addEventListener('mousedown', (e) => {
+                    e.preventDefault();
+                    goToSuggestion(suggestion);
+                });
+                item.suggestion = suggestion;
+                list.appendChild(item);
+            });
+            list.style.display = suggestions.length ? 'block' : 'none';
+        };
+
+        const fetchSuggestions = async (query) => {
+            const current = ++requestId;
+            try {
+                const response = await fetch(`/api/search/suggest?q=${encodeURIComponent(query)}&limit=8`);
+                if (!response.ok) return;
+                const data = await response.json();
+                // Ignore answers to keystrokes the user has already typed past
+                if (current === requestId) {
+                    render(data.suggestions);
+                }
+            } catch (error) {
+                console.error('Search suggestions failed:', error);
+            }
+        };
+
+        searchInput.addEventListener('input', () => {
+            clearTimeout(debounceTimer);
+            const query = searchInput.value.trim();
+            if (!query) {
+                requestId++;
+                hide();
+                return;
+            }
+            debounceTimer = setTimeout(() => fetchSuggestions(query), 150);
+        });
+
+        searchInput.addEventListener('keydown', (e) => {
+            const items = list.querySelectorAll('.search-suggestion');
+            if ((e.key === 'ArrowDown' || e.key === 'ArrowUp') && items.length && list.style.display === 'block') {
+                e.preventDefault();
+                selected = (selected + (e.key === 'ArrowDown' ? 1 : -1) + items.length + 1) % (items.length + 1) - 1;
+                items.forEach((item, index) => item.classList.toggle('active', index === selected));
+            } else if (e.key === 'Enter') {
+                e.preventDefault();
+                if (selected >= 0 && items[selected]) {
+                    goToSuggestion(items[selected].suggestion);
+                } else {
+                    goToSearch();
+                }
+            } else if (e.key === 'Escape') {
+                hide();
+            }
+        });
+
+        searchInput.addEventListener('blur', hide);
+
+        if (searchSubmit) {
+            searchSubmit.addEventListener('click', (e) => {
+                e.preventDefault();
+                goToSearch();
+            });
+        }
     }
 
     toggleMobileSearch() {
@@ -43,6 +43,7 @@ async function loadArtworksFromBackend() {
                 artist: artwork.artist || 'Unknown Artist',
                 price: artwork.price || 0,
                 image: artwork.image || 'https://images.unsplash.com/photo-1541961017774-22349e4a1262?w=400&h=300&fit=crop',
+                imageSrcset: artwork.image_srcset || '',
                 category: artwork.category || 'abstract',
                 description: artwork.description || 'Beautiful artwork available for bidding.',
                 status: 'active' // Add default status
@@ -122,7 +123,8 @@ function createEnhancedArtworkCard(artwork) {
     
     card.innerHTML = `
         <div class="artwork-status ${statusClass}">${statusText}</div>
-        <img src="${artwork.image}" alt="${artwork.title}" class="artwork-image" loading="lazy" 
+        <img src="${artwork.image}" alt="${artwork.title}" class="artwork-image" loading="lazy"
+             ${artwork.imageSrcset ? `srcset="${artwork.imageSrcset}" sizes="(max-width: 640px) 100vw, 320px"` : ''}
              onerror="this.src='https://images.unsplash.com/photo-1541961017774-22349e4a1262?w=400&h=300&fit=crop'">
         <div class="artwork-info">
             <h3 class="artwork-title">${artwork.title}</h3>
@@ -6,9 +6,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
     
     // Initialize features
-    initLiveAuctionTicker();
-    initArtworkGrid();
-    initArtistGrid();
+    initHomePage();
     initMobileMenu();
     initSmoothScrolling();
     initModals();
@@ -57,83 +55,94 @@ function updateUIBasedOnAuth(isAuthenticated) {
     }
 }
 
+// Home Page: ticker, artworks and artists all come from one cached /api/home response
+async function loadHome() {
+    const response = await fetch('/api/home', {
+        headers: { 'Accept': 'application/json' }
+    });
+    if (!response.ok) throw new Error('Failed to load home page');
+    return response.json();
+}
+
+async function initHomePage() {
+    const artworkGrid = document.getElementById('artwork-grid');
+    const artistGrid = document.getElementById('artist-grid');
+    if (!artworkGrid && !artistGrid && !document.querySelector('.live-ticker')) return;
+    
+    if (artworkGrid) artworkGrid.innerHTML = '<div class="loading">Loading artworks...</div>';
+    if (artistGrid) artistGrid.innerHTML = '<div class="loading">Loading artists...</div>';
+    
+    try {
+        const home = await loadHome();
+        renderArtworkGrid(artworkGrid, home);
+        renderArtistGrid(artistGrid, home.featured_artists);
+        initLiveAuctionTicker(home.ticker, home.refresh_seconds);
+    } catch (error) {
+        console.error('Error loading home page:', error);
+        if (artworkGrid) artworkGrid.innerHTML = '<div class="no-artworks">No artworks available. Please check your connection and try again.</div>';
+        if (artistGrid) artistGrid.innerHTML = '<div class="no-artists">No artists available. Please check your connection and try again.</div>';
+    }
+}
+
 // Live Auction Ticker
-function initLiveAuctionTicker() {
-    const ticker = document.getElementById('live-ticker');
-    if (!ticker) return;
-    
-    const auctionUpdates = [
-        { artwork: "Midnight Dreams", artist: "Sarah Mitchell", action: "bid", amount: 2500 },
-        { artwork: "Urban Symphony", artist: "Marcus Chen", action: "sold", amount: 4200 },
-        { artwork: "Ocean Whispers", artist: "Elena Rodriguez", action: "bid", amount: 1800 }
-    ];
+function initLiveAuctionTicker(updates, refreshSeconds) {
+    const ticker = document.querySelector('.live-ticker .ticker-update');
+    if (!ticker || !updates) return;
     
     let currentIndex = 0;
     
     function updateTicker() {
-        const update = auctionUpdates[currentIndex];
-        const tickerText = ticker.querySelector('.ticker-text');
-        const tickerIcon = ticker.querySelector('i[data-lucide]');
-        
-        tickerText.innerHTML = `
-            <strong>${update.artwork}</strong> by ${update.artist} - 
-            ${update.action === 'bid' ? 'New bid' : 'Sold'}: $${update.amount.toLocaleString()}
-        `;
-        
-        tickerIcon.setAttribute('data-lucide', update.action === "bid" ? 'gavel' : 'trending-up');
-        if (window.lucide && typeof lucide.createIcons === 'function') {
-            lucide.createIcons();
-        }
-        
-        currentIndex = (currentIndex + 1) % auctionUpdates.length;
+        if (updates.length === 0) return;
+        const update = updates[currentIndex % updates.length];
+        ticker.querySelector('.user-name').textContent = update.bidder_name;
+        ticker.querySelector('.amount').textContent = `$${update.amount.toLocaleString()}`;
+        ticker.querySelector('.artwork').textContent = `"${update.artwork}"`;
+        currentIndex = (currentIndex + 1) % updates.length;
     }
     
+    updateTicker();
     setInterval(updateTicker, 4000);
+    
+    // Pick up new bids; the response is cached for refreshSeconds, so this is cheap
+    setInterval(async () => {
+        try {
+            updates = (await loadHome()).ticker;
+        } catch (error) {
+            // Keep showing the last bids
+        }
+    }, (refreshSeconds || 15) * 1000);
 }
 
-// Artwork Grid
-async function initArtworkGrid() {
-    const artworkGrid = document.getElementById('artwork-grid');
+// Artwork Grid: trending lots, then lots ending soon
+function renderArtworkGrid(artworkGrid, home) {
     if (!artworkGrid) return;
     
-    try {
-        artworkGrid.innerHTML = '<div class="loading">Loading artworks...</div>';
-        
-        const response = await fetch('http://127.0.0.1:5000/api/artworks/', {
-            headers: { 'Accept': 'application/json' },
-            credentials: 'include'
-        });
-        
-        if (!response.ok) throw new Error('Failed to load artworks');
-        
-        const data = await response.json();
-        const artworks = data.items || [];
-        
-        artworkGrid.innerHTML = '';
-        
-        if (artworks.length === 0) {
-            artworkGrid.innerHTML = '<div class="no-artworks">No artworks available</div>';
-            return;
-        }
-        
-        artworks.forEach(artwork => {
-            const artworkData = {
-                id: artwork.id,
-                title: artwork.title,
-                artist: artwork.artist ? artwork.artist.name : 'Unknown Artist',
-                price: artwork.starting_price,
-                image: artwork.image_url || "https://images.unsplash.com/photo-1541961017774-22349e4a1262?w=400&h=300&fit=crop",
-                status: "active"
-            };
-            
-            const artworkCard = createArtworkCard(artworkData);
-            artworkGrid.appendChild(artworkCard);
-        });
-        
-    } catch (error) {
-        console.error('Error loading artworks:', error);
-        artworkGrid.innerHTML = '<div class="no-artworks">No artworks available. Please check your connection and try again.</div>';
+    const seen = new Set();
+    const lots = [...home.trending, ...home.ending_soon].filter(lot => {
+        if (seen.has(lot.id)) return false;
+        seen.add(lot.id);
+        return true;
+    });
+    
+    artworkGrid.innerHTML = '';
+    
+    if (lots.length === 0) {
+        artworkGrid.innerHTML = '<div class="no-artworks">No artworks available</div>';
+        return;
     }
+    
+    lots.forEach(lot => {
+        const artworkData = {
+            id: lot.id,
+            title: lot.artwork.title,
+            artist: lot.artwork.artist,
+            price: lot.current_bid,
+            image: lot.artwork.image || "https://images.unsplash.com/photo-1541961017774-22349e4a1262?w=400&h=300&fit=crop",
+            status: lot.status === 'live' ? 'active' : 'sold'
+        };
+        
+        artworkGrid.appendChild(createArtworkCard(artworkData));
+    });
 }
 
 function createArtworkCard(artwork) {
@@ -160,54 +169,34 @@ function createArtworkCard(artwork) {
 }
 
 // Artist Grid
-async function initArtistGrid() {
-    const artistGrid = document.getElementById('artist-grid');
+function renderArtistGrid(artistGrid, artists) {
     if (!artistGrid) return;
     
-    try {
-        artistGrid.innerHTML = '<div class="loading">Loading artists...</div>';
-        
-        const response = await fetch('http://127.0.0.1:5000/api/artists/', {
-            headers: { 'Accept': 'application/json' },
-            credentials: 'include'
-        });
-        
-        if (!response.ok) throw new Error('Failed to load artists');
-        
-        const data = await response.json();
-        const artists = data.items || [];
-        
-        artistGrid.innerHTML = '';
-        
-        if (artists.length === 0) {
-            artistGrid.innerHTML = '<div class="no-artists">No artists available</div>';
-            return;
-        }
-        
-        const defaultAvatars = [
-            "https://images.unsplash.com/photo-1494790108755-2616b612b786?w=150&h=150&fit=crop&crop=face",
-            "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=150&h=150&fit=crop&crop=face",
-            "https://images.unsplash.com/photo-1438761681033-6461ffad8d80?w=150&h=150&fit=crop&crop=face",
-            "https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=150&h=150&fit=crop&crop=face"
-        ];
-        
-        artists.forEach((artist, index) => {
-            const artistData = {
-                id: artist.id,
-                name: artist.name,
-                specialty: artist.bio || "Contemporary Artist",
-                works: artist.artworks ? artist.artworks.length : 0,
-                avatar: defaultAvatars[index % defaultAvatars.length]
-            };
-            
-            const artistCard = createArtistCard(artistData);
-            artistGrid.appendChild(artistCard);
-        });
-        
-    } catch (error) {
-        console.error('Error loading artists:', error);
-        artistGrid.innerHTML = '<div class="no-artists">No artists available. Please check your connection and try again.</div>';
+    artistGrid.innerHTML = '';
+    
+    if (!artists || artists.length === 0) {
+        artistGrid.innerHTML = '<div class="no-artists">No artists available</div>';
+        return;
     }
+    
+    const defaultAvatars = [
+        "https://images.unsplash.com/photo-1494790108755-2616b612b786?w=150&h=150&fit=crop&crop=face",
+        "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=150&h=150&fit=crop&crop=face",
+        "https://images.unsplash.com/photo-1438761681033-6461ffad8d80?w=150&h=150&fit=crop&crop=face",
+        "https://images.unsplash.com/photo-1472099645785-5658abf4ff4e?w=150&h=150&fit=crop&crop=face"
+    ];
+    
+    artists.forEach((artist, index) => {
+        const artistData = {
+            id: artist.id,
+            name: artist.name,
+            specialty: artist.specialty || artist.bio || "Contemporary Artist",
+            works: artist.works || 0,
+            avatar: artist.image || defaultAvatars[index % defaultAvatars.length]
+        };
+        
+        artistGrid.appendChild(createArtistCard(artistData));
+    });
 }
 
 function createArtistCard(artist) {
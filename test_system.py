@@ -30,8 +30,18 @@ def test_create_sample_data():
     """Test creating sample data"""
     try:
         response = requests.post(f'{API_BASE_URL}/create-sample-data', timeout=10)
-        if response.status_code == 201:
-            data = response.json()
+        if response.status_code == 202:
+            # Runs as a background job; poll until it finishes
+            job_id = response.json()['job_id']
+            for _ in range(30):
+                job = requests.get(f'{API_BASE_URL}/jobs/{job_id}', timeout=5).json()
+                if job['status'] in ('succeeded', 'failed'):
+                    break
+                time.sleep(1)
+            if job['status'] != 'succeeded':
+                print(f"❌ Sample data job {job['status']}: {job.get('error')}")
+                return False
+            data = job['result']
             print(f"✅ Sample data created - Users: {data.get('users_created', 0)}, Artworks: {data.get('artworks_created', 0)}")
             return True
         else: